@@ -0,0 +1,121 @@
+# Copyright (C) 2014-2016, A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+
+from django import http
+
+from a10_neutron_lbaas.vthunder import instance_manager as im
+
+from a10_horizon.dashboard.api import a10devices as a10api
+from a10_horizon.dashboard.api import base
+from a10_horizon.dashboard import jobs
+
+LOG = logging.getLogger(__name__)
+
+KIND = "appliance"
+# Row id prefix for appliances still being created, which have no id yet
+PENDING = "job-"
+
+
+def instance_manager_for(request):
+    return im.InstanceManager(
+        base.project_id_for(request),
+        session=base.session_for(request))
+
+
+def start_delete(request, appliance_id):
+    """Deletes an appliance's Nova instance and then its device record in the background.
+
+    The record goes last so the appliance stays listed, with the job's
+    progress, until the whole teardown has finished.
+    """
+    def delete(request, progress):
+        progress("Looking up appliance")
+        appliance = a10api.get_a10_appliance(request, appliance_id)
+
+        progress("Deleting instance %s" % appliance["nova_instance_id"])
+        instance_manager_for(request).delete_instance(appliance["nova_instance_id"])
+
+        progress("Deleting device record")
+        a10api.delete_a10_appliance(request, appliance_id)
+
+    return jobs.submit(request, KIND, delete, object_id=appliance_id)
+
+
+def start_create(request, instance_context, **device_kwargs):
+    """Launches an appliance instance and registers it as a device in the background.
+
+    ``instance_context`` is handed to InstanceManager.create_instance
+    (name, image, flavor and networks); ``device_kwargs`` are the other
+    attributes of the device record.  The job's result is the new record's
+    id.
+    """
+    def create(request, progress):
+        progress("Launching instance")
+        instance = instance_manager_for(request).create_instance(instance_context)
+
+        progress("Registering device %s" % instance["ip_address"])
+        device_kwargs.setdefault("name", instance["name"])
+        appliance = a10api.create_a10_appliance(request,
+                                                host=instance["ip_address"],
+                                                nova_instance_id=instance["nova_instance_id"],
+                                                **device_kwargs)
+        return appliance["id"]
+
+    return jobs.submit(request, KIND, create, label=instance_context.get("name"))
+
+
+def annotate(appliances):
+    """Adds job_status and job_step from each appliance's latest job, if any"""
+    jobs_by_id = jobs.for_objects(KIND, [x["id"] for x in appliances])
+    for appliance in appliances:
+        job = jobs_by_id.get(appliance["id"], {})
+        apidict = appliance.to_dict()
+        apidict["job_status"] = job.get("status", "")
+        apidict["job_step"] = job.get("error") or job.get("step") or ""
+    return appliances
+
+
+def _pending_row(job):
+    return a10api.A10Appliance({
+        "id": PENDING + job["id"],
+        "name": job["label"] or "",
+        "host": "",
+        "api_version": "",
+        "nova_instance_id": None,
+        "job_status": job["status"],
+        "job_step": job.get("error") or job.get("step") or "",
+    })
+
+
+def is_pending(appliance_id):
+    return appliance_id.startswith(PENDING)
+
+
+def pending(request):
+    """Rows for the tenant's appliance creates that haven't registered a device yet"""
+    return [_pending_row(job) for job in jobs.for_tenant(KIND, request.user.tenant_id)
+            if job["status"] != jobs.DONE]
+
+
+def row(request, appliance_id):
+    """The appliance, or pending create, for a table row update"""
+    if not is_pending(appliance_id):
+        return annotate([a10api.get_a10_appliance(request, appliance_id)])[0]
+
+    job = jobs.for_request(request, appliance_id[len(PENDING):])
+    if job is None:
+        raise http.Http404()
+    return _pending_row(job)
@@ -19,17 +19,14 @@ from django.core.urlresolvers import reverse_lazy
 from django.utils.translation import ugettext_lazy as _
 from django.utils.translation import ungettext_lazy
 
+from horizon import messages
 from horizon import tables
 
-
-LOG = logging.getLogger(__name__)
+from a10_horizon.dashboard.a10networks.a10appliances import appliance_jobs
+from a10_horizon.dashboard import jobs
 
 
-#TODO(orchestration) - Move this method to a shareable location.
-def instance_manager_for(request):
-    return im.InstanceManager(
-        base.project_id_for(request),
-        session=base.session_for(request))
+LOG = logging.getLogger(__name__)
 
 
 class AddApplianceAction(tables.LinkAction):
@@ -43,6 +40,7 @@ class AddApplianceAction(tables.LinkAction):
 class DeleteApplianceAction(tables.Action):
     name = "deleteappliance"
     verbose_name = _("Delete Appliance")
+    classes = ("btn-danger",)
     # url = "horizon:project:a10appliances:deleteappliance"
     # icon = "minus"
     # classes = ("ajax-modal", )
@@ -63,31 +61,74 @@ class DeleteApplianceAction(tables.Action):
             count
         )
 
+    def allowed(self, request, datum=None):
+        if datum is None:
+            return True
+        return not appliance_jobs.is_pending(datum["id"]) and \
+            datum.get("job_status") not in jobs.ACTIVE
+
     def handle(self, data_table, request, object_ids):
         for obj_id in object_ids:
-            instance_id = data_table.get_object_by_id(obj_id)["nova_instance_id"]
-            a10api.delete_a10_appliance(request, obj_id)
-            imgr = instance_manager_for(request)
-            imgr.delete_instance(instance_id)
-            # super(DeleteApplianceAction, self).handle(data_table, request, object_ids)
+            appliance_jobs.start_delete(request, obj_id)
+
+        messages.info(request, ungettext_lazy(
+            u"Deleting %d appliance in the background.",
+            u"Deleting %d appliances in the background.",
+            len(object_ids)) % len(object_ids))
 
 
 def get_instance_detail(datum):
+    if not datum["nova_instance_id"]:
+        return None
     return reverse_lazy('horizon:project:instances:detail', args=[datum["nova_instance_id"]])
 
 
+class ApplianceRow(tables.Row):
+    # Rows with a queued or running job poll until it finishes; a deleted
+    # appliance 404s and drops out of the table.  Appliances still being
+    # created show as rows for their create job.
+    ajax = True
+
+    def get_data(self, request, appliance_id):
+        return appliance_jobs.row(request, appliance_id)
+
+
+JOB_STATUS_CHOICES = (
+    (jobs.QUEUED, None),
+    (jobs.RUNNING, None),
+    (jobs.FAILED, False),
+    (jobs.DONE, True),
+    ("", True),
+)
+
+JOB_STATUS_DISPLAY_CHOICES = (
+    (jobs.QUEUED, _("Queued")),
+    (jobs.RUNNING, _("In Progress")),
+    (jobs.FAILED, _("Failed")),
+    (jobs.DONE, _("Done")),
+)
+
+
 class A10ApplianceTable(tables.DataTable):
     id = tables.Column("id", verbose_name=_("ID"), hidden=True)
     name = tables.Column("name", verbose_name=_("Hostname"), hidden=False, link=get_instance_detail)
     ip = tables.Column("host", verbose_name="Management IP")
     api_ver = tables.Column("api_version", verbose_name="API Version")
     nova_instance_id = tables.Column("nova_instance_id", hidden=False, link=get_instance_detail)
+    job_status = tables.Column("job_status", verbose_name=_("Task"), status=True,
+                               status_choices=JOB_STATUS_CHOICES,
+                               display_choices=JOB_STATUS_DISPLAY_CHOICES)
+    job_step = tables.Column("job_step", verbose_name=_("Progress"))
 
     class Meta(object):
         name = "a10appliancestable"
         verbose_name = _("A10 Appliances")
-        table_actions = ()
-        row_actions = ()
+        pagination_param = "a10appliance_marker"
+        prev_pagination_param = "a10appliance_prev_marker"
+        row_class = ApplianceRow
+        status_columns = ["job_status"]
+        table_actions = (AddApplianceAction, DeleteApplianceAction,)
+        row_actions = (DeleteApplianceAction,)
 
 
 def get_instance_detail(datum):
@@ -17,11 +17,13 @@ from django.utils.translation import ugettext_lazy as _
 from horizon import exceptions
 from horizon import tabs
 
+import a10_horizon.dashboard.a10networks.a10appliances.appliance_jobs as appliance_jobs
 import a10_horizon.dashboard.a10networks.a10appliances.tables as p_tables
 import a10_horizon.dashboard.api.a10devices as a10api
+import a10_horizon.dashboard.tabs_base as tabs_base
 
 
-class A10AppliancesTab(tabs.TableTab):
+class A10AppliancesTab(tabs_base.PagedTableTab):
     table_classes = (p_tables.A10ApplianceTable,)
     name = _("A10 Appliances")
     slug = "a10appliancestab"
@@ -32,7 +34,10 @@ class A10AppliancesTab(tabs.TableTab):
         result = []
 
         try:
-            result = a10api.get_a10_appliances(self.request)
+            result = appliance_jobs.annotate(self.page(a10api.get_a10_appliances))
+            if not self._has_prev_data:
+                # Appliances still being created lead the first page
+                result = appliance_jobs.pending(self.request) + result
         except Exception:
             result = []
             exceptions.handle(self.tab_group.request,
@@ -45,7 +50,7 @@ class A10DeviceInstanceTab(tabs.TableTab):
     name = "a10deviceinstancestab"
 
 
-class A10Tabs(tabs.TabGroup):
+class A10Tabs(tabs_base.PrefetchTabGroup):
     slug = "a10tabs"
     tabs = (A10AppliancesTab, )
     sticky = True
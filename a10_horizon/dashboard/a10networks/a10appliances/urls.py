@@ -17,11 +17,14 @@ from django.conf.urls import patterns
 from django.conf.urls import url
 
 from a10_horizon.dashboard.a10networks.a10appliances import views
+from a10_horizon.dashboard import jobs
 
 
 urlpatterns = patterns(
     'a10_horizon.dashboard.a10networks.a10appliances.views',
-    url(r'^$', views.IndexView.as_view(), name='index')
+    url(r'^$', views.IndexView.as_view(), name='index'),
+    url(r'^addappliance$', views.AddApplianceView.as_view(), name='addappliance'),
+    url(r'^jobs/(?P<job_id>[^/]+)$', jobs.JobView.as_view(), name='jobprogress'),
     # url(r'^deleteappliance$', views.DeleteApplianceView.as_view(), name='deleteappliance')
     # url(r'^addimage$', views.AddImageView.as_view(), name="addimage")
 )
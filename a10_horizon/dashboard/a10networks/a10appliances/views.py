@@ -25,3 +25,7 @@ class IndexView(tabs.TabbedTableView):
     tab_group_class = p_tabs.A10Tabs
     template_name = "appliances_tabs.html"
 
+
+class AddApplianceView(workflows.WorkflowView):
+    name = _("Create Appliance")
+    workflow_class = p_workflows.AddApplianceWorkflow
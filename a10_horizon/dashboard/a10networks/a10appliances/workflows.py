@@ -17,13 +17,17 @@ import uuid
 
 from django.utils.translation import ugettext_lazy as _
 
+import horizon.exceptions as exceptions
 import horizon.forms as forms
 import horizon.tables as tables
+from horizon.utils import memoized
 import horizon.workflows as workflows
 import openstack_dashboard.api.glance as glance_api
 import openstack_dashboard.api.neutron as neutron_api
 import openstack_dashboard.api.nova as nova_api
 
+import a10_horizon.dashboard.a10networks.a10appliances.appliance_jobs as appliance_jobs
+
 
 GLANCE_API_VERSION_LIST = 2
 GLANCE_API_VERSION_CREATE = 2
@@ -31,3 +35,83 @@ GLANCE_API_VERSION_UPDATE = 1
 
 LOG = logging.getLogger(__name__)
 
+
+class AddApplianceAction(workflows.Action):
+    name = forms.CharField(label=_("Name"), max_length=255, required=False,
+                           help_text=_("Defaults to a generated a10-<uuid> name"))
+    image = forms.ChoiceField(label=_("Image"), required=True)
+    flavor = forms.ChoiceField(label=_("Flavor"), required=True)
+    management_network = forms.ChoiceField(label=_("Management Network"), required=True)
+    networks = forms.MultipleChoiceField(label=_("Other Networks"), required=False)
+
+    class Meta(object):
+        name = _("Create Appliance")
+        permissions = ("openstack.services.network", "openstack.services.compute")
+        help_text = _("Launches an appliance instance and registers it as a device once it "
+                      "is up.  This carries on in the background; the appliance is listed "
+                      "when it is done.")
+
+    def populate_image_choices(self, request, context):
+        try:
+            images = glance_api.image_list_detailed(request)[0]
+        except Exception:
+            images = []
+            exceptions.handle(request, _("Unable to retrieve images."))
+        return [("", _("Select an image"))] + [(x.id, x.name or x.id) for x in images]
+
+    def populate_flavor_choices(self, request, context):
+        try:
+            flavors = nova_api.flavor_list(request)
+        except Exception:
+            flavors = []
+            exceptions.handle(request, _("Unable to retrieve flavors."))
+        return [("", _("Select a flavor"))] + [(x.id, x.name) for x in flavors]
+
+    @memoized.memoized_method
+    def _network_choices(self, request):
+        try:
+            networks = neutron_api.network_list_for_tenant(request, request.user.tenant_id)
+        except Exception:
+            networks = []
+            exceptions.handle(request, _("Unable to retrieve networks."))
+        return [(x.id, x.name or x.id) for x in networks]
+
+    def populate_management_network_choices(self, request, context):
+        return [("", _("Select a network"))] + self._network_choices(request)
+
+    def populate_networks_choices(self, request, context):
+        return self._network_choices(request)
+
+
+class AddApplianceStep(workflows.Step):
+    action_class = AddApplianceAction
+    contributes = ("name", "image", "flavor", "management_network", "networks")
+
+
+class AddApplianceWorkflow(workflows.Workflow):
+    slug = "addappliance"
+    name = _("Create Appliance")
+    default_steps = (AddApplianceStep, )
+    success_url = "horizon:project:a10appliances:index"
+    finalize_button_name = _("Create Appliance")
+    success_message = _("Creating appliance %s in the background.")
+    failure_message = _("Unable to create appliance %s.")
+
+    def format_status_message(self, message):
+        return message % (self.context.get("name") or _("(unnamed)"))
+
+    def handle(self, request, context):
+        instance_context = {
+            "name": context.get("name") or None,
+            "image": context["image"],
+            "flavor": context["flavor"],
+            # The management network has to come first
+            "networks": [context["management_network"]] +
+                        [x for x in context["networks"] if x != context["management_network"]],
+        }
+        try:
+            appliance_jobs.start_create(request, instance_context)
+        except Exception as ex:
+            LOG.exception(ex)
+            return False
+        return True
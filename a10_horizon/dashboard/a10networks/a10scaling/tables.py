@@ -16,6 +16,7 @@ from constants import OP_DICT
 from constants import UNIT_DICT
 
 from a10_horizon.dashboard.api import scaling as scaling_api
+from a10_horizon.dashboard import bulk
 
 
 LOG = logging.getLogger(__name__)
@@ -69,15 +70,8 @@ class DeleteScalingPolicyAction(tables.DeleteAction):
         )
 
     def handle(self, data_table, request, object_ids):
-        for obj_id in object_ids:
-            try:
-                scaling_api.delete_a10_scaling_policy(request, obj_id)
-                redirect = reverse(self.redirect_url)
-            except Exception as ex:
-                msg = _("Failed to delete scaling policy")
-                LOG.exception(ex)
-                exceptions.handle(request, msg, redirect=self.redirect_url)
-
+        bulk.delete_all(request, scaling_api.delete_a10_scaling_policy, object_ids,
+                        _("Scaling Policy"), _("Scaling Policies"))
         return redirect(URL_PREFIX + "index")
 
     def allowed(self, request, obj):
@@ -132,20 +126,9 @@ class DeleteAlarmLink(tables.DeleteAction):
         )
 
     def handle(self, data_table, request, object_ids):
-        for obj_id in object_ids:
-            try:
-                scaling_api.delete_a10_scaling_alarm(request, obj_id)
-                redirect = reverse(self.redirect_url)
-            except Exception as ex:
-                msg = self.failure_message
-                LOG.exception(ex)
-                exceptions.handle(request, msg, redirect=self.redirect_url)
-
-            self.success_url = self.redirect_url
-            msg = _('Scaling Action deleted.')
-            LOG.debug(msg)
-            messages.success(request, msg)
-
+        bulk.delete_all(request, scaling_api.delete_a10_scaling_alarm, object_ids,
+                        _("Scaling Alarm"), _("Scaling Alarms"))
+        self.success_url = self.redirect_url
         return redirect(self.redirect_url)
 
     def allowed(self, request, obj):
@@ -197,19 +180,9 @@ class DeleteActionLink(tables.DeleteAction):
         )
 
     def handle(self, data_table, request, object_ids):
-        for obj_id in object_ids:
-            try:
-                scaling_api.delete_a10_scaling_action(request, obj_id)
-                redirect = reverse(self.redirect_url)
-            except Exception as ex:
-                msg = self.failure_message
-                LOG.exception(ex)
-                exceptions.handle(request, msg, redirect=self.redirect_url)
-
-            self.success_url = self.redirect_url
-            msg = _('Scaling Action deleted.')
-            messages.success(request, msg)
-
+        bulk.delete_all(request, scaling_api.delete_a10_scaling_action, object_ids,
+                        _("Scaling Action"), _("Scaling Actions"))
+        self.success_url = self.redirect_url
         return redirect(self.redirect_url)
 
     def allowed(self, request, obj):
@@ -255,71 +228,16 @@ class DeleteReactionLink(tables.DeleteAction):
             count
         )
 
-    def _remove_deleted(self, reactions, object_ids):
-        rv = reactions
-        if len(reactions) > 0:
-                position = 0
-                for reaction in reactions:
-                    reaction["position"] = int(position)
-                    position += 1
-
-                for obj_id in object_ids:
-                    reaction = None
-                    try:
-                        reaction = reactions[int(obj_id)]
-                    except Exception as ex:
-                        LOG.exception(ex)
-
-                    if reaction:
-                        del reactions[int(obj_id)]
-
-        return rv
-
     def handle(self, data_table, request, obj_ids):
         scaling_policy_id = data_table.kwargs.get("scaling_policy_id", None)
         self.redirect_url = reverse(self._redirect_url,
                                     kwargs={"scaling_policy_id": scaling_policy_id})
         self.success_url = self.redirect_url
-        reaction = None
-
-        try:
-            existing_policy = scaling_api.get_a10_scaling_policy(request, scaling_policy_id)
-            reactions = self._remove_deleted(existing_policy.reactions, obj_ids)
-
-            if len(reactions) > 0:
-                position = 0
-                for reaction in reactions:
-                    reaction["position"] = int(position)
-                    position += 1
-
-                reaction = None
-                for obj_id in obj_ids:
-                    try:
-                        reaction = reactions[int(obj_id)]
-                    except Exception as ex:
-                        pass
-                    if reaction:
-                        del reactions[int(obj_id)]
-
-        except Exception as ex:
-            msg = self.failure_message
-            LOG.exception(ex)
-            # redirect = self.redirect_url
-            exceptions.handle(request, msg, redirect=redirect)
-
-        existing_policy = existing_policy.to_dict()
-        existing_policy["reactions"] = map(lambda x:
-                                           {
-                                               "alarm_id": x["alarm_id"],
-                                               "action_id": x["action_id"]
-                                           },
-                                           reactions)
-        del existing_policy["tenant_id"]
 
         try:
-            scaling_api.update_a10_scaling_policy(request, **existing_policy)
-            self.success_url = self.redirect_url
-            # redirect = self.success_url
+            # Row ids are reaction ids, which still name the same reactions if
+            # the policy has changed since the page was rendered
+            scaling_api.remove_a10_scaling_reactions(request, scaling_policy_id, obj_ids)
             msg = _('Reaction deleted.')
             LOG.debug(msg)
             messages.success(request, msg)
@@ -327,7 +245,6 @@ class DeleteReactionLink(tables.DeleteAction):
         except Exception as ex:
             msg = self.failure_message
             LOG.exception(ex)
-            # redirect = self.redirect_url
             exceptions.handle(request, msg, redirect=self.redirect_url)
 
         return redirect(str(self.success_url))
@@ -336,6 +253,33 @@ class DeleteReactionLink(tables.DeleteAction):
         return True
 
 
+class MoveReactionUpAction(tables.Action):
+    name = "movereactionup"
+    verbose_name = _("Move Up")
+    icon = "arrow-up"
+    requires_input = False
+    failure_message = _('Failed to move reaction')
+
+    def allowed(self, request, datum=None):
+        return datum is None or datum["position"] > 0
+
+    def single(self, data_table, request, object_id):
+        scaling_policy_id = data_table.kwargs.get("scaling_policy_id", None)
+        redirect_url = reverse(URL_PREFIX + "scalingpolicydetail",
+                               kwargs={"scaling_policy_id": scaling_policy_id})
+        order = [data_table.get_object_id(x) for x in data_table.data]
+        i = order.index(object_id)
+        order[i - 1], order[i] = order[i], order[i - 1]
+
+        try:
+            scaling_api.reorder_a10_scaling_reactions(request, scaling_policy_id, order)
+        except Exception as ex:
+            LOG.exception(ex)
+            exceptions.handle(request, self.failure_message, redirect=redirect_url)
+
+        return redirect(redirect_url)
+
+
 def get_group_detail_link(datum):
     return reverse_lazy(URL_PREFIX + "scalinggroupdetail", kwargs={"scaling_group_id": datum["id"]})
 
@@ -351,6 +295,8 @@ class A10ScalingGroupTable(tables.DataTable):
     class Meta(object):
         name = "a10scalinggrouptable"
         verbose_name = _("Scaling Groups")
+        pagination_param = "a10scalinggroup_marker"
+        prev_pagination_param = "a10scalinggroup_prev_marker"
         table_actions = ()
         row_actions = ()
 
@@ -435,13 +381,13 @@ class UpdatePolicyReactionTable(tables.DataTable):
                             verbose_name=_("Summary"))
 
     def get_object_id(self, datum):
-        return datum['position']
+        return datum['reaction_id']
 
     class Meta(object):
         name = "updatepolicyreactiontable"
         verbose_name = _("Scaling Policy Reactions")
         table_actions = (AddReactionLink,)
-        row_actions = (DeleteReactionLink, )
+        row_actions = (DeleteReactionLink, MoveReactionUpAction)
 
 
 class A10ScalingAlarmTable(tables.DataTable):
@@ -460,6 +406,8 @@ class A10ScalingAlarmTable(tables.DataTable):
     class Meta(object):
         name = "a10scalingalarmtable"
         verbose_name = _("Scaling Alarms")
+        pagination_param = "a10scalingalarm_marker"
+        prev_pagination_param = "a10scalingalarm_prev_marker"
         table_actions = (AddAlarmLink, DeleteAlarmLink)
         row_actions = (UpdateAlarmLink, DeleteAlarmLink)
 
@@ -6,14 +6,16 @@ from django.utils.translation import ugettext_lazy as _
 from horizon import tabs
 from horizon import exceptions
 
+from a10_horizon.dashboard.api import base as api_base
 from a10_horizon.dashboard.api import scaling as scaling_api
+from a10_horizon.dashboard import tabs_base
 import tables
 
 
 LOG = logging.getLogger(__name__)
 
 
-class A10ScalingGroupsTab(tabs.TableTab):
+class A10ScalingGroupsTab(tabs_base.PagedTableTab):
     table_classes = (tables.A10ScalingGroupTable,)
     name = _("Scaling Groups")
     slug = "a10scalinggroups"
@@ -25,8 +27,7 @@ class A10ScalingGroupsTab(tabs.TableTab):
             rv = []
             tenant_id = self.request.user.tenant_id
 
-            rv = scaling_api.get_a10_scaling_groups(self.tab_group.request,
-                                                    tenant_id=tenant_id)
+            rv = self.page(scaling_api.get_a10_scaling_groups, tenant_id=tenant_id)
         except Exception as ex:
             rv = []
             errmsg = "Unable to retrieve scaling group list"
@@ -69,7 +70,9 @@ class A10ScalingPoliciesTab(tabs.TableTab):
         try:
             tenant_id = self.request.user.tenant_id
             rv = []
-            rv = scaling_api.get_a10_scaling_policies(self.tab_group.request, tenant_id=tenant_id)
+            rv = scaling_api.get_a10_scaling_policies(
+                self.tab_group.request, tenant_id=tenant_id,
+                fields=api_base.fields_for(tables.A10ScalingPolicyTable))
         except Exception as ex:
             rv = []
             LOG.exception(ex)
@@ -85,12 +88,16 @@ class A10ScalingActionTab(tabs.TableTab):
     slug = "a10scalingactions"
     template_name = "horizon/common/_detail_table.html"
     preload = False
+    # A single small tenant list, so it is loaded along with the active tab
+    prefetch = True
 
     def get_a10scalingactiontable_data(self):
         try:
             tenant_id = self.request.user.tenant_id
             rv = []
-            rv = scaling_api.get_a10_scaling_actions(self.tab_group.request, tenant_id=tenant_id)
+            rv = scaling_api.get_a10_scaling_actions(
+                self.tab_group.request, tenant_id=tenant_id,
+                fields=api_base.fields_for(tables.A10ScalingActionTable))
         except Exception as ex:
             rv = []
             LOG.exception(ex)
@@ -100,18 +107,20 @@ class A10ScalingActionTab(tabs.TableTab):
         return rv
 
 
-class A10ScalingAlarmTab(tabs.TableTab):
+class A10ScalingAlarmTab(tabs_base.PagedTableTab):
     table_classes = (tables.A10ScalingAlarmTable,)
     name = _("Scaling Alarms")
     slug = "a10scalingalarms"
     template_name = "horizon/common/_detail_table.html"
     preload = False
+    # One page of a small tenant list, so it is loaded along with the active tab
+    prefetch = True
 
     def get_a10scalingalarmtable_data(self):
         try:
             tenant_id = self.request.user.tenant_id
             rv = []
-            rv = scaling_api.get_a10_scaling_alarms(self.tab_group.request, tenant_id=tenant_id)
+            rv = self.page(scaling_api.get_a10_scaling_alarms, tenant_id=tenant_id)
         except Exception as ex:
             rv = []
             LOG.exception(ex)
@@ -121,10 +130,11 @@ class A10ScalingAlarmTab(tabs.TableTab):
         return rv
 
 
-class A10ScalingTabs(tabs.TabGroup):
+class A10ScalingTabs(tabs_base.PrefetchTabGroup):
     slug = "a10scalingtabs"
     tabs = (A10ScalingGroupsTab,
             A10ScalingPoliciesTab,
             A10ScalingActionTab,
             A10ScalingAlarmTab)
     sticky = True
+    prefetch = True
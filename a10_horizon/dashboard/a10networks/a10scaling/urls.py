@@ -30,6 +30,9 @@ urlpatterns = patterns("a10_horizon.dashboard.a10networks.a10scaling.views",
                        url(r'^scalingpolicy/(?P<scaling_policy_id>[^/]*)/addreaction$',
                            views.AddReactionView.as_view(),
                            name='addreaction'),
+                       url(r'^scalingpolicy/choices/(?P<resource>alarm|action)$',
+                           views.ReactionChoicesView.as_view(),
+                           name='reactionchoices'),
                        url(r'^scalingpolicy/(?P<scaling_policy_id>[^/]*)/detail$',
                            views.PolicyDetailView.as_view(),
                            name='scalingpolicydetail'),
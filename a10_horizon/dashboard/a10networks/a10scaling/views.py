@@ -15,6 +15,8 @@ from horizon import workflows
 import re
 
 from a10_horizon.dashboard.api import scaling as api
+from a10_horizon.dashboard import bulk
+from a10_horizon.dashboard import choices
 
 import forms as project_forms
 import tables as project_tables
@@ -63,16 +65,8 @@ class IndexView(tabs.TabView):
 
         if m in self.delete_actions:
             delete_action = self.delete_actions[m]
-            for obj_id in obj_ids:
-                success_msg = "Deleted {0} {1}".format(delete_action[NOUN], obj_id)
-                failure_msg = "Unable to delete {0} {1}".format(delete_action[NOUN], obj_id)
-
-                try:
-                    delete_action[ACTION](request, obj_id)
-                    messages.success(request, success_msg)
-                except Exception as ex:
-                    exceptions.handle(request, failure_msg)
-                    LOG.exception(ex)
+            bulk.delete_all(request, delete_action[ACTION], obj_ids,
+                            delete_action[NOUN], delete_action[PLURAL])
 
         return self.get(request, *args, **kwargs)
 
@@ -135,8 +129,9 @@ class PolicyDetailView(tables.MultiTableView):
             exceptions.handle(self.request, msg, redirect=redirect)
 
         position = 0
-        for reaction in reactions:
+        for reaction, reaction_id in zip(reactions, api.reaction_ids(reactions)):
             reaction['position'] = position
+            reaction['reaction_id'] = reaction_id
             position += 1
 
         return reactions
@@ -258,6 +253,13 @@ class AddReactionView(workflows.WorkflowView):
     #     return super(AddReactionView, self).post(request, *args, **kwargs)
 
 
+class ReactionChoicesView(choices.ChoicesView):
+    providers = {
+        "alarm": api.get_a10_scaling_alarms,
+        "action": api.get_a10_scaling_actions,
+    }
+
+
 class GroupDetailView(tables.MultiTableView):
     name = _("Scaling Group Overview")
     table_classes = (project_tables.A10ScalingGroupMemberTable,)
@@ -285,7 +287,8 @@ class GroupDetailView(tables.MultiTableView):
     def _get_data(self):
         try:
             id = self.kwargs['scaling_group_id']
-            group = api.get_a10_scaling_group_with_children(self.request, id)
+            group = api.get_a10_scaling_group_with_children(self.request, id,
+                                                            include=("policy", "alarms"))
         except Exception:
             msg = _('Unable to retrieve details for scaling group "%s".') \
                 % (id)
@@ -297,6 +300,10 @@ class GroupDetailView(tables.MultiTableView):
         context = super(GroupDetailView, self).get_context_data(**kwargs)
         group = self._get_data()
 
+        for child in group.get("unavailable", []):
+            messages.warning(self.request,
+                             _("Unable to retrieve %s for this scaling group.") % child)
+
         context["scaling_group"] = group
         context["url"] = self.get_redirect_url()
 
@@ -2,6 +2,7 @@
 
 import logging
 
+from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
 from django.shortcuts import redirect
 from django.utils.translation import ugettext_lazy as _
@@ -14,6 +15,7 @@ from horizon import workflows
 # a10_horizon.dashboard.api.client.Client extends neutron.api.client.Client
 from a10_neutronclient.resources import a10_scaling_group as scaling_resources
 from a10_horizon.dashboard.api import scaling as api
+from a10_horizon.dashboard import choices
 
 
 LOG = logging.getLogger(__name__)
@@ -223,69 +225,38 @@ class AddReactionAction(workflows.Action):
     alarm_id = forms.ChoiceField(label=_("Alarm"))
     action_id = forms.ChoiceField(label=_("Action"))
     detail_url = "horizon:project:a10scaling:scalingpolicydetail"
+    choices_url = "horizon:project:a10scaling:reactionchoices"
 
     def __init__(self, request, *args, **kwargs):
-        alarms = []
-        actions = []
         # Make it so we don't have to pull this out of the tuples arg.
         policy_id = args[0]["scaling_policy_id"]
 
-        alarm_choices = [('', _('Select an alarm'))]
-        action_choices = [('', _('Select an action'))]
         super(AddReactionAction, self).__init__(request, *args, **kwargs)
 
-        try:
-            alarms = api.get_a10_scaling_alarms(request)
-        except Exception as ex:
-            LOG.exception(ex)
-            exceptions.handle(request, _("Unable to retrieve scaling alarms"))
-
-        try:
-            actions = api.get_a10_scaling_actions(request)
-        except Exception as ex:
-            LOG.exception(ex)
-            exceptions.handle(request, _("Unable to retrieve scaling alarms"))
+        results = choices.load(request, {
+            "alarm": api.get_a10_scaling_alarms,
+            "action": api.get_a10_scaling_actions,
+        })
 
-        choice_map = lambda x: (x["id"], x["name"])
+        for resource, empty_label in (("alarm", _("Select an alarm")),
+                                      ("action", _("Select an action"))):
+            objs, ex = results[resource]
+            if ex is not None:
+                LOG.exception(ex)
+                exceptions.handle(request, _("Unable to retrieve scaling %ss") % resource)
+                objs = []
 
-        map(alarm_choices.append, map(choice_map, alarms))
-        map(action_choices.append, map(choice_map, actions))
+            url = reverse(self.choices_url, kwargs={"resource": resource})
+            choices.populate(self.fields[resource + "_id"], objs, empty_label, url)
 
         self.fields["scaling_policy_id"].value = policy_id
-        self.fields["alarm_id"].choices = alarm_choices
-        self.fields["action_id"].choices = action_choices
         self.success_url = reverse_lazy(self.detail_url,
                                         kwargs={"scaling_policy_id": policy_id})
 
-    def _convert_reactions(self, reactions):
-        """Extracts action/alarm IDs from reactions retrieved via Neutron API"""
-        return map(lambda x: {"alarm_id": x["alarm_id"],
-                              "action_id": x["action_id"]}, reactions)
-
     def handle(self, request, context):
-        policy_id = context["scaling_policy_id"]
-
         try:
-            policy = api.get_a10_scaling_policy(request, policy_id)
-            reactions = self._convert_reactions(policy.reactions)
-        except Exception as ex:
-            LOG.exception(ex)
-            exceptions.handle(request, _("Unable to retrieve existing policy."))
-            return False
-
-        try:
-            # Extract the IDs from the reactions since that's all we need
-            map(reactions.append, self._convert_reactions([context]))
-
-            # convert to dictioary for API
-            policy = policy.to_dict()
-            policy["reactions"] = reactions
-
-            # read only attribute, this should probably go in clean()
-            del policy["tenant_id"]
-
-            api.update_a10_scaling_policy(request, **policy)
-
+            api.add_a10_scaling_reaction(request, context["scaling_policy_id"],
+                                         context["alarm_id"], context["action_id"])
         except Exception as ex:
             LOG.exception(ex)
             exceptions.handle(request, _("Unable to update policy."))
@@ -301,6 +272,7 @@ class AddReactionAction(workflows.Action):
 
 class AddReactionStep(workflows.Step):
     action_class = AddReactionAction
+    template_name = "reaction/_step.html"
     contributes = ("scaling_policy_id", "alarm_id", "action_id")
 
 
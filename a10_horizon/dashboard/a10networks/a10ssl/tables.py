@@ -74,6 +74,8 @@ class CertificatesTable(tables.DataTable):
     class Meta(object):
         name = "certificatestable"
         verbose_name = _("Certificates")
+        pagination_param = "certificate_marker"
+        prev_pagination_param = "certificate_prev_marker"
         table_actions = (AddCertificateLink, DeleteCertificateLink)
         row_actions = (UpdateCertificateLink, )
 
@@ -10,24 +10,26 @@ from horizon import exceptions
 
 import tables
 from a10_horizon.dashboard.api import certificates as cert_api
+from a10_horizon.dashboard import tabs_base
 
 
 LOG = LOG = logging.getLogger(__name__)
 
 
-class CertificatesTab(tabs.TableTab):
+class CertificatesTab(tabs_base.PagedTableTab):
     table_classes = (tables.CertificatesTable,)
     name = _("Certificates")
     slug = "certificates"
     template_name = "certificates/_certificates_tab.html"
     preload = False
+    # One page of the tenant's certificates, so it is loaded along with the active tab
+    prefetch = True
 
     def get_certificatestable_data(self):
         try:
             tenant_id = self.request.user.tenant_id
             certificates = []
-            certificates = cert_api.certificate_list(self.tab_group.request,
-                                                     tenant_id=tenant_id)
+            certificates = self.page(cert_api.certificate_list, tenant_id=tenant_id)
         except Exception as ex:
             certificates = []
             exceptions.handle(self.tab_group.request,
@@ -41,13 +43,16 @@ class CertificateBindingsTab(tabs.TableTab):
     name = _("Certificate Associations")
     slug = "certificatebindings"
     template_name = "certificates/_certificatebindings_tab.html"
+    preload = False
+    # Three concurrent calls, two of them cached, so it is loaded along with the active tab
+    prefetch = True
 
     def get_certificatebindingtable_data(self):
         try:
             tenant_id = self.request.user.tenant_id
             bindings = []
-            bindings = cert_api.certificate_bindings_list(self.tab_group.request,
-                                                          tenant_id=tenant_id)
+            bindings = cert_api.certificate_bindings_list_with_names(self.tab_group.request,
+                                                                     tenant_id=tenant_id)
         except Exception as ex:
             bindings = []
             exceptions.handle(self.tab_group.request, _("Unable to retrieve certificate "
@@ -57,9 +62,10 @@ class CertificateBindingsTab(tabs.TableTab):
         return bindings
 
 
-class A10SSLTabs(tabs.TabGroup):
+class A10SSLTabs(tabs_base.PrefetchTabGroup):
     slug = "a10ssltabs"
     tabs = (CertificatesTab,
             CertificateBindingsTab
             )
     sticky = True
+    prefetch = True
@@ -6,12 +6,12 @@ from django.utils.translation import ugettext_lazy as _
 from horizon import exceptions
 from horizon import forms
 from horizon.utils import memoized
-from horizon import messages
 from horizon import tabs
 from horizon import workflows
 import logging
 
 from a10_horizon.dashboard.api import certificates as cert_api
+from a10_horizon.dashboard import bulk
 import forms as project_forms
 import workflows as project_workflows
 import tabs as project_tabs
@@ -52,16 +52,8 @@ class IndexView(tabs.TabView):
 
         if m in self.delete_actions:
             delete_action = self.delete_actions[m]
-            for obj_id in obj_ids:
-                success_msg = "Deleted {0} {1}".format(delete_action[NOUN], obj_id)
-                failure_msg = "Unable to delete {0} {1}".format(delete_action[NOUN], obj_id)
-
-                try:
-                    delete_action[ACTION](request, obj_id)
-                    messages.success(request, success_msg)
-                except Exception as ex:
-                    exceptions.handle(request, failure_msg)
-                    LOG.exception(ex)
+            bulk.delete_all(request, delete_action[ACTION], obj_ids,
+                            delete_action[NOUN], delete_action[PLURAL])
 
         return self.get(request, *args, **kwargs)
 
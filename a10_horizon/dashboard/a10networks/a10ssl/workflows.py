@@ -10,7 +10,7 @@ from horizon import workflows
 
 # a10_horizon.dashboard.api.client.Client extends neutron.api.client.Client
 from a10_horizon.dashboard.api import certificates as api
-from openstack_dashboard.api import lbaas as lbaas_api
+from a10_horizon.dashboard import choices
 
 # TODO(Pull these from A10 constants)
 AVAILABLE_PROTOCOLS = ('HTTP', 'HTTPS', 'TCP')
@@ -90,39 +90,28 @@ class AddCertificateBindingAction(workflows.Action):
     certificate_id = forms.ChoiceField(label=_("Certificate"))
 
     def __init__(self, request, *args, **kwargs):
-        certificates = []
-        vips = []
         super(AddCertificateBindingAction, self).__init__(request, *args, **kwargs)
 
-        tenant_id = request.user.tenant_id
+        results = choices.load(request, {
+            "vip": api.https_vip_list,
+            "certificate": api.certificate_list,
+        })
 
-        vip_id_choices = [('', _("Select a VIP"))]
-        certificate_id_choices = [('', _("Select a Certificate"))]
-
-        try:
-            kwargs["tenant_id"] = tenant_id
-            vips = lbaas_api.vip_list(request, **kwargs)
-        except Exception as ex:
-            LOG.error("Could not add certificate. ERROR=%s" % ex)
+        vips, ex = results["vip"]
+        if ex is not None:
+            LOG.error("Could not retrieve VIP list. ERROR=%s" % ex)
             exceptions.handle(request, _("Unable to retrieve VIPs list"))
+            vips = []
 
-        try:
-            certificates = api.certificate_list(request, **kwargs)
+        certificates, ex = results["certificate"]
         # TODO(mdurrant) narrow exception handling
-        except Exception as ex:
+        if ex is not None:
             LOG.error("Could retrieve certificate list. ERROR=%s" % ex)
             exceptions.handle(request, _("Unable to retrieve Certificates"))
+            certificates = []
 
-        for v in vips:
-            # we only care about HTTPS connections
-            if (v.protocol == "HTTPS"):
-                vip_id_choices.append((v.id, v.name))
-
-        for c in certificates:
-            certificate_id_choices.append((c.id, c.name))
-
-        self.fields['vip_id'].choices = vip_id_choices
-        self.fields['certificate_id'].choices = certificate_id_choices
+        choices.populate(self.fields['vip_id'], vips, _("Select a VIP"))
+        choices.populate(self.fields['certificate_id'], certificates, _("Select a Certificate"))
 
     def clean(self):
         cleaned_data = super(AddCertificateBindingAction, self).clean()
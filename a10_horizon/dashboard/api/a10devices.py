@@ -20,6 +20,11 @@ from openstack_dashboard.api.neutron import neutronclient
 
 from a10_neutronclient.resources import a10_device_instance
 
+from a10_horizon.dashboard.api import base
+from a10_horizon.dashboard.api import breaker
+from a10_horizon.dashboard.api import cache
+from a10_horizon.dashboard.api import metrics
+
 LOG = logging.getLogger(__name__)
 
 
@@ -29,27 +34,46 @@ class A10Appliance(NeutronAPIDictWrapper):
         super(A10Appliance, self).__init__(apiresource)
 
 
-def get_a10_appliances(request, **kwargs):
-    rv = neutronclient(request).list_a10_device_instances(**kwargs).get(a10_device_instance.RESOURCES)
+@metrics.instrumented
+@breaker.guarded
+def get_a10_appliances(request, paginate=False, **kwargs):
+    client = neutronclient(request)
+    if paginate:
+        rv, has_more_data, has_prev_data = base.paged_list(
+            request, client.list_a10_device_instances, a10_device_instance.RESOURCES, **kwargs)
+        return map(A10Appliance, rv), has_more_data, has_prev_data
+
+    rv = client.list_a10_device_instances(**kwargs).get(a10_device_instance.RESOURCES)
     return map(A10Appliance, rv)
 
 
+@metrics.instrumented
+@cache.request_cached(a10_device_instance.RESOURCE)
+@breaker.guarded
 def get_a10_appliance(request, id, **params):
     rv = neutronclient(request).show_a10_device_instance(id).get(a10_device_instance.RESOURCE)
     return A10Appliance(rv)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def delete_a10_appliance(request, id):
     neutronclient(request).delete_a10_device_instances(id)
+    cache.forget(request, a10_device_instance.RESOURCE, id)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def create_a10_appliance(request, **kwargs):
     body = {a10_device_instance.RESOURCE: kwargs}
     rv = neutronclient(request).create_a10_device_instances(body=body).get(a10_device_instance.RESOURCE)
     return A10Appliance(rv)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def update_a10_appliance(request, id, **kwargs):
     body = {a10_device_instance.RESOURCE: kwargs}
     rv = neutronclient(request).update_a10_device_instances(id, body=body).get(a10_device_instance.RESOURCE)
+    cache.forget(request, a10_device_instance.RESOURCE, id)
     return A10Appliance(rv)
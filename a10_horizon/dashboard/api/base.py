@@ -12,10 +12,42 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from horizon.utils import functions as utils
 from keystoneclient.auth.identity import generic as auth_plugin
 from keystoneclient import session as keystone_session
 from openstack_dashboard.api import base
 
+from a10_horizon.dashboard.api import cache
+
+_session_cache = cache.LRUCache(maxsize=getattr(settings, 'A10_KEYSTONE_SESSION_CACHE_SIZE', 128))
+
+
+class _DetachedUser(object):
+    def __init__(self, user):
+        self.id = user.id
+        self.tenant_id = user.tenant_id
+        self.is_superuser = getattr(user, "is_superuser", False)
+        self.token = user.token
+        self.service_catalog = user.service_catalog
+        self.services_region = user.services_region
+
+
+class DetachedRequest(object):
+    """Stands in for a request in work that outlives it.
+
+    Holds only the user's token, project and service catalog, which is
+    what the API functions need to build a client or session.  Background
+    work given one neither keeps the request alive nor sees its
+    per-request state.
+    """
+
+    def __init__(self, request):
+        self.user = _DetachedUser(request.user)
+
 
 def token_for(request):
     auth_url = base.url_for(request, 'identity')
@@ -27,10 +59,96 @@ def token_for(request):
 
 
 def session_for(request):
-    token = token_for(request)
-    session = keystone_session.Session(auth=token)
+    """Returns an authenticated keystone session for the request's user and project.
+
+    Sessions are shared between requests and worker threads until the
+    user's token expires, so the authentication and the session's
+    connection pool are reused instead of being rebuilt for every caller.
+    """
+    key = (request.user.token.unscoped_token,
+           request.user.token.project["id"],
+           base.url_for(request, 'identity'))
+
+    session = _session_cache.get(key)
+    if session is None:
+        token = token_for(request)
+        session = keystone_session.Session(auth=token)
+        _session_cache.set(key, session, ttl=token_expires_in(request))
     return session
 
 
 def project_id_for(request):
     return request.user.token.project["id"]
+
+
+def token_expires_in(request):
+    """Seconds until the user's token expires, or None if it is unknown."""
+    expires = getattr(request.user.token, "expires", None)
+    if expires is None:
+        return None
+
+    if timezone.is_naive(expires):
+        now = datetime.datetime.utcnow()
+    else:
+        now = timezone.now()
+    return max((expires - now).total_seconds(), 0)
+
+
+def fields_for(table):
+    """Returns the neutron ``fields`` a table's columns need, or None.
+
+    Lets list views ask neutron for only the attributes they display.
+    Tables whose columns compute their value from the whole object can't
+    be projected, so None is returned for them and the full object is
+    fetched.
+    """
+    fields = set(["id"])
+    for column in table.base_columns.values():
+        if column.auto:
+            continue
+        if callable(column.transform):
+            return None
+        fields.add(column.transform)
+    return sorted(fields)
+
+
+def paged_list(request, list_call, collection, marker=None, sort_dir="desc", page_size=None,
+               **params):
+    """Fetches a single page of a neutron collection using limit/marker.
+
+    Follows the convention of Horizon's image_list_detailed: returns a
+    tuple of (items, has_more_data, has_prev_data).  To walk backwards,
+    pass the first id of the current page as ``marker`` with
+    sort_dir="asc"; items always come back in descending id order.
+    Pages hold the user's page size unless ``page_size`` is given.
+    """
+    if page_size is None:
+        page_size = utils.get_page_size(request)
+    params.update(limit=page_size + 1, sort_key="id", sort_dir=sort_dir)
+    if marker is not None:
+        params["marker"] = marker
+
+    # Don't let neutronclient follow the "next" links; we only want one page.
+    pages = list_call(retrieve_all=False, **params)
+    items = list(next(iter(pages), {}).get(collection, []))
+
+    has_more_data = False
+    has_prev_data = False
+    # first and middle page condition
+    if len(items) > page_size:
+        items = items[:page_size]
+        has_more_data = True
+        # middle page condition
+        if marker is not None:
+            has_prev_data = True
+    # first page condition when reached via prev back
+    elif sort_dir == "asc" and marker is not None:
+        has_more_data = True
+    # last page condition
+    elif marker is not None:
+        has_prev_data = True
+
+    if sort_dir == "asc":
+        items.reverse()
+
+    return items, has_more_data, has_prev_data
@@ -0,0 +1,214 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from __future__ import absolute_import
+
+import functools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.utils.translation import ugettext_lazy as _
+from horizon import exceptions
+from keystoneclient import exceptions as keystone_exceptions
+from neutronclient.common import exceptions as neutron_exceptions
+from openstack_dashboard.api import base
+
+from a10_horizon.dashboard.api import executor
+
+LOG = logging.getLogger(__name__)
+
+# Consecutive failures that open an endpoint's breaker
+BREAKER_FAILURES = getattr(settings, 'A10_BREAKER_FAILURES', 5)
+# Seconds an open breaker waits before letting a trial call through
+BREAKER_RESET_TIMEOUT = getattr(settings, 'A10_BREAKER_RESET_TIMEOUT', 30)
+# Seconds every request gets for all of its API calls; see ApiDeadlineMiddleware
+API_REQUEST_DEADLINE = getattr(settings, 'A10_API_REQUEST_DEADLINE', 10)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+_OUTAGES = (neutron_exceptions.ConnectionFailed,
+            keystone_exceptions.ConnectionError,
+            keystone_exceptions.RequestTimeout,
+            executor.CallTimeout)
+
+
+class NeutronUnavailable(exceptions.NotAvailable):
+    """Raised instead of calling Neutron while it is known to be unhealthy"""
+    pass
+
+
+class CircuitBreaker(object):
+    """Fails calls to an endpoint fast once it has failed repeatedly.
+
+    After ``failures`` outages in a row the breaker opens and calls are
+    refused.  Once ``reset_timeout`` seconds have passed a single trial
+    call is let through (half-open); its success closes the breaker and
+    its failure opens it again.
+    """
+
+    def __init__(self, endpoint, failures=None, reset_timeout=None):
+        self.endpoint = endpoint
+        self.failures = failures or BREAKER_FAILURES
+        self.reset_timeout = reset_timeout or BREAKER_RESET_TIMEOUT
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.time() - self.opened_at >= self.reset_timeout:
+                LOG.info("Trying %s again after %d seconds", self.endpoint, self.reset_timeout)
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def is_open(self):
+        """Whether calls would be refused now; False once a trial call is due"""
+        with self._lock:
+            if self.state == OPEN:
+                return time.time() - self.opened_at < self.reset_timeout
+            return self.state == HALF_OPEN
+
+    def succeeded(self):
+        with self._lock:
+            if self.state != CLOSED:
+                LOG.info("%s is answering again; closing its breaker", self.endpoint)
+            self.state = CLOSED
+            self.consecutive_failures = 0
+
+    def cancelled(self):
+        """The call allow() just let through was not made after all"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                # Leave opened_at alone, so the next call is the trial
+                self.state = OPEN
+
+    def failed(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failures:
+                if self.state != OPEN:
+                    LOG.warning("%s failed %d times in a row; refusing calls for %d seconds",
+                                self.endpoint, self.consecutive_failures, self.reset_timeout)
+                self.state = OPEN
+                self.opened_at = time.time()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(endpoint):
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+def _endpoint(request):
+    return base.url_for(request, 'network')
+
+
+def is_outage(ex):
+    """Whether ex says the endpoint is unhealthy, rather than the call being refused"""
+    if isinstance(ex, _OUTAGES):
+        return True
+    status = getattr(ex, "status_code", None) or getattr(ex, "http_status", None)
+    return isinstance(status, int) and status >= 500
+
+
+def unavailable(request):
+    """Why calls for this request would be refused right now, or None"""
+    if breaker_for(_endpoint(request)).is_open():
+        return _("Neutron is not responding; its calls are paused for a few seconds.")
+    if executor.time_left() == 0:
+        return _("Neutron did not answer in time for this page.")
+    return None
+
+
+def _guard(fn, abandon):
+    name = "%s.%s" % (fn.__module__.rsplit(".", 1)[-1], fn.__name__)
+
+    @functools.wraps(fn)
+    def wrapped(request, *args, **kwargs):
+        timeout = executor.time_left() if abandon else None
+        if timeout == 0:
+            raise NeutronUnavailable(_("The request's time for Neutron calls is spent; "
+                                       "%s was not called.") % name)
+
+        ctx = executor.context()
+        if "a10_guarded" in ctx:
+            return fn(request, *args, **kwargs)
+
+        breaker = breaker_for(_endpoint(request))
+        if not breaker.allow():
+            raise NeutronUnavailable(_("Neutron is not responding; %s was not called.") % name)
+
+        ctx["a10_guarded"] = name
+        try:
+            rv, ex = executor.call(functools.partial(fn, request, *args, **kwargs),
+                                   timeout=timeout, name=name)
+        finally:
+            ctx.pop("a10_guarded", None)
+
+        if ex is None:
+            breaker.succeeded()
+            return rv
+        if isinstance(ex, NeutronUnavailable):
+            raise ex
+        if isinstance(ex, executor.PoolExhausted):
+            breaker.cancelled()
+            raise NeutronUnavailable(_("Too many Neutron calls are still waiting for an "
+                                       "answer; %s was not called.") % name)
+        if is_outage(ex):
+            breaker.failed()
+            if isinstance(ex, executor.CallTimeout):
+                raise NeutronUnavailable(_("%s did not answer within the request's time.")
+                                         % name)
+        else:
+            # Neutron answered, even if it was to refuse the call
+            breaker.succeeded()
+        raise ex
+    return wrapped
+
+
+def guarded(fn):
+    """Refuses the call while Neutron's breaker is open or the deadline is spent.
+
+    The wrapped function must take the request as its first argument.
+    Refused calls raise NeutronUnavailable.  Under a deadline the
+    outermost call runs on executor.call()'s bounded pool and is cut off
+    when the request's time runs out; when that pool is full it is refused
+    straight away.  Calls it makes in turn share its time and don't count
+    separately towards the breaker.
+    """
+    return _guard(fn, abandon=True)
+
+
+def guarded_write(fn):
+    """Like guarded(), for calls that change something in Neutron.
+
+    Writes are refused while the breaker is open, but one that has been
+    sent is never abandoned: it runs inline, ignoring the deadline, so the
+    caller always learns whether the change was made.
+    """
+    return _guard(fn, abandon=False)
@@ -0,0 +1,134 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from __future__ import absolute_import
+
+import collections
+import contextlib
+import logging
+import threading
+
+from django.conf import settings
+
+from a10_horizon.dashboard.api import cache
+
+LOG = logging.getLogger(__name__)
+
+# view name -> maximum API calls per request, e.g.
+# {"horizon:project:a10scaling:index": 8}
+API_CALL_BUDGETS = getattr(settings, 'A10_API_CALL_BUDGETS', {})
+API_CALL_BUDGET_DEFAULT = getattr(settings, 'A10_API_CALL_BUDGET_DEFAULT', None)
+
+# Lists collecting every call made anywhere in the process, for tests
+_collectors = []
+_collectors_lock = threading.Lock()
+
+
+def _call_key(name, args, kwargs):
+    key = (name, cache._freeze(args), cache._freeze(kwargs))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return (name, repr(args), repr(kwargs))
+
+
+def note(request, name, args, kwargs):
+    """Called by metrics.instrumented for each call the page code makes"""
+    key = _call_key(name, args, kwargs)
+    calls = getattr(request, "_a10_api_calls", None)
+    if calls is not None:
+        calls.append(key)
+    with _collectors_lock:
+        for collector in _collectors:
+            collector.append(key)
+
+
+def start(request):
+    """Starts counting the API calls made on behalf of request"""
+    request._a10_api_calls = []
+
+
+def calls(request):
+    return getattr(request, "_a10_api_calls", [])
+
+
+def duplicates(calls):
+    """(call, times) for every call made more than once with the same arguments"""
+    return [(key, n) for key, n in collections.Counter(calls).most_common() if n > 1]
+
+
+def report(calls):
+    """One line per distinct call, most repeated first"""
+    return "\n".join("  %dx %s args=%s kwargs=%s" % (n, key[0], key[1], key[2])
+                     for key, n in collections.Counter(calls).most_common())
+
+
+def budget_for(view_name):
+    return API_CALL_BUDGETS.get(view_name, API_CALL_BUDGET_DEFAULT)
+
+
+def check(request, view_name):
+    """Logs repeated calls and calls over the view's budget for a finished request.
+
+    Returns the view's budget if the request went over it, else None.  The
+    page has already been rendered by now, so nothing is raised.
+    """
+    made = calls(request)
+    repeated = duplicates(made)
+    if repeated:
+        LOG.warning("%s repeated %d API calls with the same arguments (possible N+1):\n%s",
+                    view_name, len(repeated), report([k for k, n in repeated for i in range(n)]))
+
+    budget = budget_for(view_name)
+    if budget is None or len(made) <= budget:
+        LOG.debug("%s made %d API calls", view_name, len(made))
+        return None
+
+    LOG.warning("%s made %d API calls, over its budget of %d:\n%s",
+                view_name, len(made), budget, report(made))
+    return budget
+
+
+@contextlib.contextmanager
+def collect():
+    """Collects every API call made, from any thread, while the block runs"""
+    collected = []
+    with _collectors_lock:
+        _collectors.append(collected)
+    try:
+        yield collected
+    finally:
+        with _collectors_lock:
+            _collectors[:] = [c for c in _collectors if c is not collected]
+
+
+@contextlib.contextmanager
+def assert_max_api_calls(max_calls, label=None):
+    """Fails with AssertionError if the block makes more than max_calls API calls.
+
+    Meant for tests of panel views, e.g.::
+
+        with assert_max_api_calls(4, "scaling index"):
+            client.get(reverse("horizon:project:a10scaling:index"))
+
+    Calls from every thread are counted, including the executor's pool.
+    Yields the list the calls are collected in.
+    """
+    with collect() as collected:
+        yield collected
+
+    if len(collected) > max_calls:
+        raise AssertionError("%s made %d API calls, expected at most %d:\n%s" % (
+            label or "Block", len(collected), max_calls, report(collected)))
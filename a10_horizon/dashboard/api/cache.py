@@ -0,0 +1,630 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from __future__ import absolute_import
+
+import collections
+import copy
+import functools
+import hashlib
+import json
+import logging
+from multiprocessing.pool import ThreadPool
+import os
+import threading
+import time
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from a10_horizon.dashboard.api import executor
+
+LOG = logging.getLogger(__name__)
+
+API_CACHE_SIZE = getattr(settings, 'A10_API_CACHE_SIZE', 256)
+API_CACHE_TTL = getattr(settings, 'A10_API_CACHE_TTL', 30)
+# How long past API_CACHE_TTL a result is kept to serve while Neutron can't be reached
+API_CACHE_STALE_TTL = getattr(settings, 'A10_API_CACHE_STALE_TTL', 600)
+# Seconds to wait after a failed background refresh before trying again
+API_CACHE_REFRESH_BACKOFF = getattr(settings, 'A10_API_CACHE_REFRESH_BACKOFF', 5)
+# Threads for background refreshes, kept apart from the pool pages fan out on;
+# a stale result waits for the next request when they are all busy
+API_CACHE_REFRESH_POOL_SIZE = getattr(settings, 'A10_API_CACHE_REFRESH_POOL_SIZE', 2)
+# Seconds a background refresh has for its calls, as a page has A10_API_REQUEST_DEADLINE
+API_CACHE_REFRESH_TIMEOUT = getattr(settings, 'A10_API_CACHE_REFRESH_TIMEOUT', 10)
+# Name of a Django cache (in CACHES) to share results between processes in,
+# or None to keep them in each process
+API_CACHE_BACKEND = getattr(settings, 'A10_API_CACHE_BACKEND', None)
+# With a shared backend, also have processes wait for each other's identical calls
+API_CACHE_LOCK = getattr(settings, 'A10_API_CACHE_LOCK', False)
+API_CACHE_LOCK_TTL = getattr(settings, 'A10_API_CACHE_LOCK_TTL', 30)
+# Longest a caller waits on an identical call already in flight before making its own
+API_CACHE_WAIT = getattr(settings, 'A10_API_CACHE_WAIT', 30)
+
+
+class LRUCache(object):
+    """Thread-safe, size-bounded LRU mapping with per-entry expiry.
+
+    Entries are dropped when they fall off the end of the LRU or when their
+    ttl (in seconds) runs out.  A ttl of None means the entry only leaves the
+    cache through eviction.
+    """
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def _expired(self, expires_at, now):
+        return expires_at is not None and expires_at <= now
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if self._expired(expires_at, now):
+                return default
+            # Re-insert to mark as most recently used
+            self._data[key] = entry
+            return value
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            ttl = self.ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, expires_at)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[0] if entry is not None else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+# Tenant-scoped caching of API list calls.  Each (tenant, resource) pair has
+# a version number that every cached result is stamped with; writes bump the
+# version so results from before them are fetched again rather than served.
+# Results are kept for API_CACHE_STALE_TTL so the last good one can stand in
+# while Neutron is failing.
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+_refresh_pool = None
+_refresh_pool_pid = None
+
+
+class StaleList(list):
+    """A cached result served past its time; ``stale_since`` is when it was fetched"""
+
+    def __init__(self, items, stale_since):
+        super(StaleList, self).__init__(items)
+        self.stale_since = stale_since
+
+
+class _Entry(object):
+    def __init__(self, value, version, fetched_at=None, failed_at=None):
+        self.value = value
+        self.version = version
+        self.fetched_at = fetched_at or time.time()
+        self.failed_at = failed_at
+
+
+class LocalStore(object):
+    """Results and versions kept in this process only"""
+
+    def __init__(self):
+        self._results = LRUCache(maxsize=API_CACHE_SIZE, ttl=API_CACHE_TTL + API_CACHE_STALE_TTL)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def version(self, tenant_id, resource):
+        with self._lock:
+            return self._versions.get((tenant_id, resource), 0)
+
+    def bump(self, tenant_id, resource):
+        with self._lock:
+            self._versions[(tenant_id, resource)] = self._versions.get((tenant_id, resource), 0) + 1
+
+    def get(self, key):
+        return self._results.get(key)
+
+    def set(self, key, entry):
+        self._results.set(key, entry)
+
+    def mark_failed(self, key):
+        entry = self._results.get(key)
+        if entry is not None:
+            entry.failed_at = time.time()
+
+    # Calls are only coalesced across processes by a shared store
+    def lock(self, key, version):
+        return True
+
+    def locked(self, key, version):
+        return False
+
+    def unlock(self, key, version):
+        pass
+
+
+_wrapper_classes = {}
+
+
+def _wrapper_class(path):
+    cls = _wrapper_classes.get(path)
+    if cls is None:
+        cls = _wrapper_classes[path] = import_string(path)
+    return cls
+
+
+def _dump(value):
+    """A result as compressed JSON of its API dicts, or as is if it isn't one"""
+    items = value[0] if isinstance(value, tuple) else value
+    classes = set(type(x) for x in items)
+    cls = classes.pop() if len(classes) == 1 else None
+    if items and (cls is None or not (cls is dict or hasattr(cls, "to_dict"))):
+        return ("raw", value)
+
+    path = None if cls in (None, dict) else "%s.%s" % (cls.__module__, cls.__name__)
+    doc = {"class": path,
+           "items": [x if path is None else x.to_dict() for x in items],
+           "paged": list(value[1:]) if isinstance(value, tuple) else None}
+    try:
+        return ("json", zlib.compress(json.dumps(doc, separators=(",", ":")).encode("utf-8")))
+    except (TypeError, ValueError):
+        return ("raw", value)
+
+
+def _load(dumped):
+    kind, data = dumped
+    if kind == "raw":
+        return data
+    doc = json.loads(zlib.decompress(data).decode("utf-8"))
+    items = doc["items"]
+    if doc["class"] is not None:
+        cls = _wrapper_class(doc["class"])
+        items = [cls(x) for x in items]
+    if doc["paged"] is not None:
+        return (items,) + tuple(doc["paged"])
+    return items
+
+
+class DjangoStore(object):
+    """Results and versions kept in a Django cache, shared by every process using it.
+
+    A write in any process bumps the shared version, so all of them stop
+    serving the results from before it.  Keys are hashed to suit
+    memcached, and results of API dict wrappers are stored as compressed
+    JSON of the dicts rather than pickled wrappers.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def _cache(self):
+        return caches[self.alias]
+
+    def _version_key(self, tenant_id, resource):
+        return "a10:api:version:%s:%s" % (tenant_id, resource)
+
+    def _result_key(self, key):
+        return "a10:api:result:%s" % hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+    def _first_version(self):
+        # Versions that were evicted start again from the clock, so they never
+        # come back as a number results from before a write were stamped with.
+        return int(time.time() * 1000)
+
+    def version(self, tenant_id, resource):
+        key = self._version_key(tenant_id, resource)
+        version = self._cache.get(key)
+        if version is None:
+            self._cache.add(key, self._first_version(), None)
+            version = self._cache.get(key, 0)
+        return version
+
+    def bump(self, tenant_id, resource):
+        key = self._version_key(tenant_id, resource)
+        try:
+            self._cache.incr(key)
+        except ValueError:
+            self._cache.set(key, self._first_version(), None)
+
+    def get(self, key):
+        stored = self._cache.get(self._result_key(key))
+        if stored is None:
+            return None
+        version, fetched_at, failed_at, dumped = stored
+        return _Entry(_load(dumped), version, fetched_at, failed_at)
+
+    def _set(self, key, version, fetched_at, failed_at, dumped):
+        timeout = fetched_at + API_CACHE_TTL + API_CACHE_STALE_TTL - time.time()
+        if timeout > 0:
+            self._cache.set(self._result_key(key), (version, fetched_at, failed_at, dumped),
+                            timeout)
+
+    def set(self, key, entry):
+        self._set(key, entry.version, entry.fetched_at, entry.failed_at, _dump(entry.value))
+
+    def mark_failed(self, key):
+        stored = self._cache.get(self._result_key(key))
+        if stored is not None:
+            version, fetched_at, failed_at, dumped = stored
+            self._set(key, version, fetched_at, time.time(), dumped)
+
+    def _lock_key(self, key, version):
+        return "%s:lock:%s" % (self._result_key(key), version)
+
+    def lock(self, key, version):
+        """Claims the call for key at version; False if another process has it"""
+        return self._cache.add(self._lock_key(key, version), 1, API_CACHE_LOCK_TTL)
+
+    def locked(self, key, version):
+        return self._cache.get(self._lock_key(key, version)) is not None
+
+    def unlock(self, key, version):
+        self._cache.delete(self._lock_key(key, version))
+
+
+_results = DjangoStore(API_CACHE_BACKEND) if API_CACHE_BACKEND else LocalStore()
+
+
+def _version(tenant_id, resource):
+    return _results.version(tenant_id, resource)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def invalidate(request, *resources):
+    """Drops the request tenant's cached lists of the named resources"""
+    tenant_id = request.user.tenant_id
+    for resource in resources:
+        _results.bump(tenant_id, resource)
+
+
+def _copy_item(item):
+    if hasattr(item, "to_dict"):
+        return type(item)(copy.deepcopy(item.to_dict()))
+    return copy.deepcopy(item)
+
+
+def _copy(rv, stale_since=None):
+    # Callers are free to modify what they get back, down to the API dicts
+    # inside the wrappers, without touching the cached copy.
+    if stale_since is None:
+        make = list
+    else:
+        make = functools.partial(StaleList, stale_since=stale_since)
+    # Paged calls return (items, has_more_data, has_prev_data)
+    if isinstance(rv, tuple):
+        return (make(_copy_item(x) for x in rv[0]),) + rv[1:]
+    return make(_copy_item(x) for x in rv)
+
+
+def _save(key, version, rv):
+    entry = _Entry(_copy(rv), version)
+    _results.set(key, entry)
+    return entry
+
+
+def _get_refresh_pool():
+    """Returns the pool background refreshes run on, as executor.get_pool() does"""
+    global _refresh_pool, _refresh_pool_pid
+
+    with _refreshing_lock:
+        if _refresh_pool is None or _refresh_pool_pid != os.getpid():
+            _refresh_pool = ThreadPool(API_CACHE_REFRESH_POOL_SIZE)
+            _refresh_pool_pid = os.getpid()
+        return _refresh_pool
+
+
+def _refresh(fn, request, kwargs, key, version):
+    # Refresh threads are reused, so each refresh starts from an empty
+    # context with a deadline of its own; guarded calls that overrun it are
+    # abandoned rather than holding the thread.
+    executor.context().clear()
+    executor.set_deadline(API_CACHE_REFRESH_TIMEOUT)
+    try:
+        rv = fn(request, **kwargs)
+        if _version(key[0], key[2]) == version:
+            _save(key, version, rv)
+    except Exception as ex:
+        _results.mark_failed(key)
+        LOG.warning("Unable to refresh %s, still serving the cached copy: %s", fn.__name__, ex)
+    finally:
+        executor.context().clear()
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _schedule_refresh(fn, request, kwargs, key, entry):
+    if entry.failed_at is not None and time.time() - entry.failed_at < API_CACHE_REFRESH_BACKOFF:
+        return
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        if len(_refreshing) >= API_CACHE_REFRESH_POOL_SIZE:
+            LOG.debug("All refresh threads are busy; not refreshing %s yet", fn.__name__)
+            return
+        _refreshing.add(key)
+
+    # api.base imports this module, so it can't be imported at the top
+    from a10_horizon.dashboard.api import base
+
+    # The refresh outlives the request; it only gets the user's credentials
+    _get_refresh_pool().apply_async(_refresh, (fn, base.DetachedRequest(request), kwargs,
+                                               key, entry.version))
+
+
+# Single flight: a miss that an identical call is already fetching waits for
+# that call instead of making its own, so a crowd opening the same page costs
+# Neutron one call per list.
+
+_flights = {}
+_flights_lock = threading.Lock()
+_flight_stats = {"leaders": 0, "coalesced": 0}
+
+
+class _Flight(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def single_flight_stats():
+    """Process-wide count of misses that led a call, and of those that shared another's"""
+    with _flights_lock:
+        return dict(_flight_stats)
+
+
+def _wait_timeout():
+    left = executor.time_left()
+    return API_CACHE_WAIT if left is None else min(API_CACHE_WAIT, left)
+
+
+def _fetch(fn, request, kwargs, key, version):
+    """Makes the call and caches its result, or waits for another process making it"""
+    if API_CACHE_LOCK and not _results.lock(key, version):
+        deadline = time.time() + _wait_timeout()
+        while _results.locked(key, version) and time.time() < deadline:
+            time.sleep(0.05)
+        entry = _results.get(key)
+        if entry is not None and entry.version == version and entry.failed_at is None:
+            with _flights_lock:
+                _flight_stats["coalesced"] += 1
+            return entry.value
+        LOG.debug("No result from the process calling %s; calling it here", fn.__name__)
+        return _save(key, version, fn(request, **kwargs)).value
+
+    try:
+        return _save(key, version, fn(request, **kwargs)).value
+    finally:
+        if API_CACHE_LOCK:
+            _results.unlock(key, version)
+
+
+def _call_once(fn, request, kwargs, key, version):
+    flight_key = (key, version)
+    with _flights_lock:
+        flight = _flights.get(flight_key)
+        leader = flight is None
+        if leader:
+            flight = _flights[flight_key] = _Flight()
+            _flight_stats["leaders"] += 1
+
+    if not leader:
+        if not flight.done.wait(_wait_timeout()):
+            LOG.warning("Gave up waiting for an identical %s call; calling it again",
+                        fn.__name__)
+            return _save(key, version, fn(request, **kwargs)).value
+        if flight.error is not None and _refused(flight.error):
+            # The leader ran out of its own time, or was turned away while the
+            # breaker was open; this caller's time may still allow the call.
+            LOG.debug("An identical %s call was refused; trying it again", fn.__name__)
+            return _call_once(fn, request, kwargs, key, version)
+        with _flights_lock:
+            _flight_stats["coalesced"] += 1
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    try:
+        flight.value = _fetch(fn, request, kwargs, key, version)
+        return flight.value
+    except Exception as ex:
+        flight.error = ex
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(flight_key, None)
+        flight.done.set()
+
+
+def _hit():
+    executor.context()["a10_cache_hit"] = True
+
+
+def served_from_cache():
+    """Whether the last cached call made on this thread was answered from a cache.
+
+    Clears the answer, so callers ask once before a call to forget any
+    earlier one and once after it.
+    """
+    return executor.context().pop("a10_cache_hit", False)
+
+
+def _refused(ex):
+    # Imported here; breaker needs Horizon and the clients, this module only Django
+    from a10_horizon.dashboard.api import breaker
+    return isinstance(ex, breaker.NeutronUnavailable)
+
+
+def _is_outage(ex):
+    from a10_horizon.dashboard.api import breaker
+    return _refused(ex) or breaker.is_outage(ex)
+
+
+def _served_stale(request, entry):
+    since = getattr(request, "_a10_stale_since", None)
+    if since is None or entry.fetched_at < since:
+        request._a10_stale_since = entry.fetched_at
+
+
+def stale_since(request):
+    """When the oldest result that stood in for a failing call was fetched, or None"""
+    return getattr(request, "_a10_stale_since", None)
+
+
+def cached(resource):
+    """Caches a list call per tenant and keyword arguments.
+
+    The wrapped function must take the request as its only positional
+    argument.  Results are fresh for A10_API_CACHE_TTL seconds or until
+    invalidate() is called for ``resource``.  After that the old result is
+    still returned straight away, as a StaleList, while one background
+    call per key refreshes it.  If a call fails because Neutron is
+    unavailable, the last good result (up to A10_API_CACHE_STALE_TTL old)
+    is returned in its place and noted for stale_since().
+
+    Identical calls that miss while one is in flight wait for it and share
+    its result, or its exception, rather than calling Neutron themselves.
+    If it was refused for want of time or by the breaker, they try again
+    under their own deadlines.
+    With A10_API_CACHE_LOCK and a shared A10_API_CACHE_BACKEND, calls in
+    other processes are waited for too, through a lock key in the cache.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapped(request, **kwargs):
+            tenant_id = request.user.tenant_id
+            # Admins can see other tenants' objects, so never share their results.
+            is_admin = bool(getattr(request.user, "is_superuser", False))
+            key = (tenant_id, is_admin, resource, fn.__name__, _freeze(kwargs))
+            version = _version(tenant_id, resource)
+
+            entry = _results.get(key)
+            if entry is not None and entry.version == version:
+                _hit()
+                if time.time() - entry.fetched_at <= API_CACHE_TTL:
+                    return _copy(entry.value)
+                _schedule_refresh(fn, request, kwargs, key, entry)
+                if entry.failed_at is not None:
+                    _served_stale(request, entry)
+                return _copy(entry.value, entry.fetched_at)
+
+            try:
+                value = _call_once(fn, request, kwargs, key, version)
+            except Exception as ex:
+                if entry is None or not _is_outage(ex):
+                    raise
+                LOG.warning("%s failed, serving the copy fetched at %s: %s", fn.__name__,
+                            time.ctime(entry.fetched_at), ex)
+                _hit()
+                _served_stale(request, entry)
+                return _copy(entry.value, entry.fetched_at)
+
+            return _copy(value)
+        return wrapped
+    return decorator
+
+
+# Request-scoped identity map for get calls.  Detail views tend to fetch the
+# same object from several methods while rendering one page; within a single
+# request every get for the same id is answered with the first result.
+
+_identity_stats = {"hits": 0, "misses": 0}
+_identity_stats_lock = threading.Lock()
+
+
+def _count(stat):
+    with _identity_stats_lock:
+        _identity_stats[stat] += 1
+
+
+def identity_map_stats():
+    """Process-wide count of get calls served from (hits) or added to (misses) identity maps"""
+    with _identity_stats_lock:
+        return dict(_identity_stats)
+
+
+def _identity_map(request):
+    identity_map = getattr(request, "_a10_identity_map", None)
+    if identity_map is None:
+        identity_map = request._a10_identity_map = {}
+        request._a10_identity_hits = 0
+    return identity_map
+
+
+def forget(request, resource, id):
+    """Drops every cached get of ``id`` from the request's identity map"""
+    identity_map = _identity_map(request)
+    for key in [k for k in identity_map.keys() if k[:2] == (resource, id)]:
+        identity_map.pop(key, None)
+
+
+def request_cached(resource):
+    """Memoizes a get call by id for the life of the request.
+
+    The wrapped function must be called as ``fn(request, id, **kwargs)``.
+    Writes should call forget() so the request sees its own changes.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapped(request, id, **kwargs):
+            identity_map = _identity_map(request)
+            key = (resource, id, fn.__name__, _freeze(kwargs))
+
+            if key in identity_map:
+                _hit()
+                _count("hits")
+                request._a10_identity_hits += 1
+                LOG.debug("%s %s served from the request identity map (%d calls avoided)",
+                          resource, id, request._a10_identity_hits)
+                return identity_map[key]
+
+            _count("misses")
+            rv = fn(request, id, **kwargs)
+            identity_map[key] = rv
+            return rv
+        return wrapped
+    return decorator
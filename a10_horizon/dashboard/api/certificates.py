@@ -7,15 +7,29 @@ import logging
 from django.conf import settings
 
 from horizon.utils.memoized import memoized  # noqa
+from keystoneclient.auth import token_endpoint
+from keystoneclient import session as keystone_session
 
 from openstack_dashboard.api import base
+from openstack_dashboard.api import lbaas as lbaas_api
 
 from openstack_dashboard.api.neutron import NeutronAPIDictWrapper
 # a10 client that extends neutronclient.v2_0.client.Client
 from a10_openstack.neutron_ext.api import client as neutron_client
 
+from a10_horizon.dashboard.api import base as a10_base
+from a10_horizon.dashboard.api import breaker
+from a10_horizon.dashboard.api import cache
+from a10_horizon.dashboard.api import executor
+from a10_horizon.dashboard.api import metrics
+
 LOG = logging.getLogger(__name__)
 
+# Just enough of a certificate or VIP to show it by name
+NAME_FIELDS = ["id", "name"]
+
+_client_pool = cache.LRUCache(maxsize=getattr(settings, 'A10_NEUTRON_CLIENT_POOL_SIZE', 64))
+
 
 class Certificate(NeutronAPIDictWrapper):
     """Wrapper for neutron Certificates"""
@@ -30,27 +44,49 @@ class CertificateBinding(NeutronAPIDictWrapper):
 
 
 def neutronclient(request):
+    """Returns a pooled neutron client for the request's token and endpoint.
+
+    Clients are built on a keystone session so the underlying HTTP
+    connections are kept alive and shared by every call made with the
+    same token.  Entries expire along with the token.
+    """
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
-    LOG.debug('neutronclient connection created using token "%s" and url "%s"'
-              % (request.user.token.id, base.url_for(request, 'network')))
-    LOG.debug('user_id=%(user)s, tenant_id=%(tenant)s' %
-              {'user': request.user.id, 'tenant': request.user.tenant_id})
-    c = neutron_client.Client(token=request.user.token.id,
-                              auth_url=base.url_for(request, 'identity'),
-                              endpoint_url=base.url_for(request, 'network'),
-                              insecure=insecure,
-                              ca_cert=cacert)
+    endpoint_url = base.url_for(request, 'network')
+    key = (request.user.token.id, endpoint_url, insecure, cacert)
+
+    c = _client_pool.get(key)
+    if c is None:
+        LOG.debug('neutronclient connection created using token "%s" and url "%s"',
+                  request.user.token.id, endpoint_url)
+        LOG.debug('user_id=%s, tenant_id=%s', request.user.id, request.user.tenant_id)
+        verify = False if insecure else (cacert or True)
+        auth = token_endpoint.Token(endpoint_url, request.user.token.id)
+        session = keystone_session.Session(auth=auth, verify=verify)
+        c = neutron_client.Client(session=session)
+        _client_pool.set(key, c, ttl=a10_base.token_expires_in(request))
     return c
 
 
-def certificate_list(request, **params):
+@metrics.instrumented
+@cache.cached("certificates")
+@breaker.guarded
+def certificate_list(request, paginate=False, **params):
     LOG.debug("certificates_list(): params=%s" % (params))
     certificates = []
-    certificates = neutronclient(request).list_certificates(**params).get('certificates')
+    client = neutronclient(request)
+    if paginate:
+        certificates, has_more_data, has_prev_data = a10_base.paged_list(
+            request, client.list_certificates, 'certificates', **params)
+        return map(Certificate, certificates), has_more_data, has_prev_data
+
+    certificates = client.list_certificates(**params).get('certificates')
     return map(Certificate, certificates)
 
 
+@metrics.instrumented
+@cache.request_cached("certificate")
+@breaker.guarded
 def certificate_get(request, certificate_id, **params):
     # TODO(mdurrant): Add option to get bindings w/ cert.
     LOG.debug("certificate_get(): certificate_id=%s, params=%s" % (certificate_id, params))
@@ -59,27 +95,59 @@ def certificate_get(request, certificate_id, **params):
     return Certificate(certificate)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def certificate_create(request, **kwargs):
     """Create specified Certificate"""
     body = {"certificate": kwargs}
     LOG.debug("certificate_create(): kwargs=%s,body=%s" % (kwargs, body))
     certificate = neutronclient(request).create_certificate(body=body).get('certificate')
+    cache.invalidate(request, "certificates")
     return Certificate(certificate)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def certificate_update(request, **kwargs):
     body = {"certificate": kwargs}
     LOG.debug("certificate_update(): kwargs=%s", (kwargs))
     certificate = neutronclient(request).update_certificate(body=body).get('certificate')
+    cache.forget(request, "certificate", kwargs.get("id"))
+    cache.invalidate(request, "certificates")
     return Certificate(certificate)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def certificate_delete(request, certificate_id):
     LOG.debug("certificate_delete(): certificiate_id:%s" % certificate_id)
     # TODO(mmd): Should this return status or do we assume it always works?
     neutronclient(request).delete_certificate(certificate_id)
+    cache.forget(request, "certificate", certificate_id)
+    cache.invalidate(request, "certificates")
+
+
+@metrics.instrumented
+@cache.cached("vips")
+@breaker.guarded
+def vip_list(request, **params):
+    """Lists VIPs, filtered by Neutron on any attribute passed in params.
+
+    VIPs are written through the LBaaS panels rather than this module, so
+    cached lists only expire with A10_API_CACHE_TTL.
+    """
+    return lbaas_api.vip_list(request, **params)
+
+
+@metrics.instrumented
+@breaker.guarded
+def https_vip_list(request, **params):
+    """VIPs that can be bound to a certificate, cached per tenant and protocol"""
+    return vip_list(request, protocol="HTTPS", **params)
 
 
+@metrics.instrumented
+@breaker.guarded
 def certificate_bindings_list(request, **params):
     LOG.debug("certificate_bindings_list(): params={}".format(params))
 
@@ -88,6 +156,53 @@ def certificate_bindings_list(request, **params):
     return map(CertificateBinding, bindings)
 
 
+def _name_index(objs):
+    return dict((x["id"], x.get("name")) for x in objs)
+
+
+@metrics.instrumented
+@breaker.guarded
+def certificate_bindings_list_with_names(request, **params):
+    """Lists bindings with vip_name and certificate_name filled in.
+
+    The bindings, the tenant's certificates and its VIPs are fetched with
+    three concurrent calls, whatever the number of bindings; the two name
+    lists come from the tenant cache.  Names the backend already joined
+    are left alone, and ids that can't be resolved fall back to the id.
+    """
+    tenant_id = request.user.tenant_id
+    results = executor.gather({
+        "bindings": lambda: certificate_bindings_list(request, **params),
+        "certificates": lambda: certificate_list(request, tenant_id=tenant_id,
+                                                 fields=NAME_FIELDS),
+        "vips": lambda: vip_list(request, tenant_id=tenant_id, fields=NAME_FIELDS),
+    })
+
+    bindings, ex = results["bindings"]
+    if ex is not None:
+        raise ex
+
+    indexes = {}
+    for resource in ("certificates", "vips"):
+        objs, ex = results[resource]
+        if ex is not None:
+            LOG.warning("Unable to resolve %s names for certificate bindings: %s", resource, ex)
+            objs = []
+        indexes[resource] = _name_index(objs)
+
+    for binding in bindings:
+        apidict = binding.to_dict()
+        if not apidict.get("certificate_name"):
+            apidict["certificate_name"] = indexes["certificates"].get(
+                binding["certificate_id"], binding["certificate_id"])
+        if not apidict.get("vip_name"):
+            apidict["vip_name"] = indexes["vips"].get(binding["vip_id"], binding["vip_id"])
+
+    return bindings
+
+
+@metrics.instrumented
+@breaker.guarded
 def certificate_binding_get(request, binding_id, **params):
     LOG.debug("certificate_binding_get(): binding_id=%s, params=%s" % (binding_id, params))
     binding = neutronclient(request).show_certificate_binding(binding_id,
@@ -95,6 +210,8 @@ def certificate_binding_get(request, binding_id, **params):
     return CertificateBinding(binding)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def certificate_binding_create(request, **kwargs):
     """Binding specified Certificate ID to specified VIP ID"""
     LOG.debug("certificate_binding_create(): request=%s, kwargs=%s" % (request, kwargs))
@@ -105,6 +222,8 @@ def certificate_binding_create(request, **kwargs):
     return CertificateBinding(binding)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def certificate_binding_delete(request, binding_id):
     LOG.debug("certificate_binding_delete(): binding_id=%s" % binding_id)
     neutronclient(request).delete_certificate_binding(binding_id)
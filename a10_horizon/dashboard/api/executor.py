@@ -0,0 +1,293 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from __future__ import absolute_import
+
+import functools
+import logging
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+import os
+import threading
+import time
+
+from django.conf import settings
+
+LOG = logging.getLogger(__name__)
+
+POOL_SIZE = getattr(settings, 'A10_API_POOL_SIZE', 8)
+CALL_TIMEOUT = getattr(settings, 'A10_API_CALL_TIMEOUT', 30)
+# Threads for call(); abandoned calls hold theirs until Neutron answers
+CALL_POOL_SIZE = getattr(settings, 'A10_API_CALL_POOL_SIZE', 16)
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_call_pool = None
+_call_slots = None
+_call_pool_pid = None
+_local = threading.local()
+
+
+class CallTimeout(Exception):
+    """Raised in place of a result when a call doesn't finish in time"""
+    pass
+
+
+class PoolExhausted(Exception):
+    """Raised in place of a result when every thread call() may use is busy"""
+    pass
+
+
+def get_pool():
+    """Returns the process-wide thread pool used for API fan-out.
+
+    The pool is created lazily and re-created after a fork, since worker
+    threads don't survive into child processes.
+    """
+    global _pool, _pool_pid
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPool(POOL_SIZE)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def context():
+    """Per-thread dict that gather() and run_each() carry into their pool threads"""
+    ctx = getattr(_local, "context", None)
+    if ctx is None:
+        ctx = _local.context = {}
+    return ctx
+
+
+def set_deadline(seconds):
+    """Gives calls made from this thread, and the pool threads it fans out to,
+    ``seconds`` in total to finish; None removes the deadline"""
+    if seconds is None:
+        context().pop("a10_deadline", None)
+    else:
+        context()["a10_deadline"] = time.time() + seconds
+
+
+def time_left():
+    """Seconds left before this thread's deadline, or None if it has none"""
+    deadline = context().get("a10_deadline")
+    if deadline is None:
+        return None
+    return max(deadline - time.time(), 0)
+
+
+def _timeout(timeout):
+    if timeout is None:
+        timeout = CALL_TIMEOUT
+    left = time_left()
+    return timeout if left is None else min(timeout, left)
+
+
+def _run(fn, ctx=None):
+    in_pool = getattr(_local, "in_pool", False)
+    prev_ctx = getattr(_local, "context", None)
+    _local.in_pool = True
+    if ctx is not None:
+        _local.context = ctx
+    try:
+        return (fn(), None)
+    except Exception as ex:
+        return (None, ex)
+    finally:
+        _local.in_pool = in_pool
+        _local.context = prev_ctx
+
+
+def submit(fn):
+    """Runs ``fn()`` on the pool in the background, outside any request's context.
+
+    Nothing waits for the result, so fn should handle and log its own
+    errors.
+    """
+    return get_pool().apply_async(_run, (fn, {}))
+
+
+def gather(calls, timeout=None):
+    """Runs the zero-argument callables in ``calls`` concurrently.
+
+    ``calls`` maps a name to a callable.  Returns a dict mapping the same
+    names to ``(result, exception)`` tuples; exactly one of the two is None
+    unless the callable itself returned None.  A call that is still running
+    once ``timeout`` seconds (A10_API_CALL_TIMEOUT by default, and never past
+    the thread's deadline) have passed gets a CallTimeout exception.
+    Failures never propagate, so callers can use whatever partial results
+    came back.
+    """
+    timeout = _timeout(timeout)
+
+    # Calls made from a pool thread run inline; waiting on the pool from
+    # inside it can deadlock once every worker is doing the same.
+    if getattr(_local, "in_pool", False) or len(calls) < 2:
+        return dict((name, _run(fn)) for name, fn in calls.items())
+
+    pool = get_pool()
+    pending = dict((name, pool.apply_async(_run, (fn, dict(context()))))
+                   for name, fn in calls.items())
+    deadline = time.time() + timeout
+    rv = {}
+
+    for name, async_result in pending.items():
+        try:
+            rv[name] = async_result.get(max(deadline - time.time(), 0))
+        except Exception:
+            LOG.warning("%s did not complete within %s seconds", name, timeout)
+            rv[name] = (None, CallTimeout(name))
+
+    return rv
+
+
+class _Slots(object):
+    """Counting semaphore whose acquire() takes a timeout, which Python 2's lacks"""
+
+    def __init__(self, value):
+        self._value = value
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._value == 0:
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                left = deadline - time.time()
+                if left <= 0:
+                    return False
+                self._cond.wait(left)
+            self._value -= 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self._value += 1
+            self._cond.notify()
+
+
+def run_each(fn, items, limit=None, timeout=None, abandon=True):
+    """Calls ``fn(item)`` for every item with at most ``limit`` calls in flight.
+
+    Returns a list of ``(item, result, exception)`` tuples in the order of
+    ``items``.  As with gather(), failures and timeouts are returned rather
+    than raised; ``timeout`` covers the whole run, so items still waiting
+    for a free slot when it runs out are not called and get a CallTimeout.
+    With ``abandon=False`` there is no timeout, nor deadline: every item
+    is called and waited for, as writes must be.
+    """
+    items = list(items)
+    timeout = _timeout(timeout) if abandon else None
+    if limit is None:
+        limit = POOL_SIZE
+
+    if getattr(_local, "in_pool", False) or limit < 2 or len(items) < 2:
+        return [(item,) + _run(functools.partial(fn, item)) for item in items]
+
+    # A slot is taken here and given back by the worker, so it is the
+    # caller that waits for one rather than a pool thread.
+    slots = _Slots(limit)
+    ctx = context()
+
+    def release_after(item):
+        try:
+            return _run(functools.partial(fn, item), dict(ctx))
+        finally:
+            slots.release()
+
+    def left():
+        return None if deadline is None else max(deadline - time.time(), 0)
+
+    pool = get_pool()
+    deadline = None if timeout is None else time.time() + timeout
+    pending = []
+    for i, item in enumerate(items):
+        if not slots.acquire(left()):
+            LOG.warning("Out of time after %s seconds; %d of %d items were not called",
+                        timeout, len(items) - i, len(items))
+            pending.extend((x, None) for x in items[i:])
+            break
+        pending.append((item, pool.apply_async(release_after, (item,))))
+
+    rv = []
+    for item, async_result in pending:
+        if async_result is None:
+            rv.append((item, None, CallTimeout(item)))
+            continue
+        try:
+            rv.append((item,) + async_result.get(left()))
+        except Exception:
+            LOG.warning("Call for %s did not complete within %s seconds", item, timeout)
+            rv.append((item, None, CallTimeout(item)))
+
+    return rv
+
+
+def _get_call_pool():
+    """Returns call()'s thread pool and the slots bounding it, as get_pool() does"""
+    global _call_pool, _call_slots, _call_pool_pid
+
+    with _pool_lock:
+        if _call_pool is None or _call_pool_pid != os.getpid():
+            _call_pool = ThreadPool(CALL_POOL_SIZE)
+            _call_slots = _Slots(CALL_POOL_SIZE)
+            _call_pool_pid = os.getpid()
+        return _call_pool, _call_slots
+
+
+def call(fn, timeout=None, name=None):
+    """Calls ``fn()``, waiting at most ``timeout`` seconds for it to return.
+
+    Returns ``(result, exception)`` like gather().  With a timeout, fn runs
+    on a pool of A10_API_CALL_POOL_SIZE threads of its own, and is left to
+    finish there if it overruns; the caller gets a CallTimeout and can move
+    on.  If every one of those threads is still busy, fn is not called and
+    the caller gets a PoolExhausted straight away.  Without a timeout, or
+    from a pool thread whose caller is already waiting with a timeout, fn
+    runs inline.
+    """
+    if timeout is None or getattr(_local, "in_pool", False):
+        try:
+            return (fn(), None)
+        except Exception as ex:
+            return (None, ex)
+
+    pool, slots = _get_call_pool()
+    if not slots.acquire(0):
+        LOG.warning("All %d call threads are busy; %s was not called",
+                    CALL_POOL_SIZE, name or fn)
+        return (None, PoolExhausted(name or fn))
+
+    ctx = dict(context())
+
+    def run():
+        _local.context = ctx
+        try:
+            return (fn(), None)
+        except Exception as ex:
+            return (None, ex)
+        finally:
+            _local.context = None
+            slots.release()
+
+    try:
+        return pool.apply_async(run).get(timeout)
+    except multiprocessing.TimeoutError:
+        LOG.warning("%s did not complete within %s seconds", name or fn, timeout)
+        return (None, CallTimeout(name or fn))
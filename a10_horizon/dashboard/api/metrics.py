@@ -0,0 +1,309 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from __future__ import absolute_import
+
+import bisect
+import functools
+import json
+import logging
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django import http
+from django.utils.module_loading import import_string
+
+from a10_horizon.dashboard.api import budget
+from a10_horizon.dashboard.api import cache
+from a10_horizon.dashboard.api import executor
+
+LOG = logging.getLogger(__name__)
+
+# Names from SINKS below or dotted paths to sink classes
+METRICS_SINKS = getattr(settings, 'A10_METRICS_SINKS', [])
+# Estimate each result's size in bytes; costs a JSON encoding of a few rows per call
+METRICS_PAYLOAD_BYTES = getattr(settings, 'A10_METRICS_PAYLOAD_BYTES', False)
+# Rows encoded to estimate a list result's size from
+METRICS_PAYLOAD_SAMPLE_ROWS = getattr(settings, 'A10_METRICS_PAYLOAD_SAMPLE_ROWS', 5)
+METRICS_STATSD_HOST = getattr(settings, 'A10_METRICS_STATSD_HOST', "127.0.0.1")
+METRICS_STATSD_PORT = getattr(settings, 'A10_METRICS_STATSD_PORT', 8125)
+METRICS_STATSD_PREFIX = getattr(settings, 'A10_METRICS_STATSD_PREFIX', "a10_horizon")
+# Shared secret for metrics_view; None leaves it to Horizon's login
+METRICS_TOKEN = getattr(settings, 'A10_METRICS_TOKEN', None)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+
+
+class Sample(object):
+    """One instrumented API call"""
+
+    def __init__(self, name, view, latency, payload_bytes, count, error):
+        self.name = name
+        self.view = view
+        self.latency = latency
+        self.payload_bytes = payload_bytes
+        self.count = count
+        self.error = error
+
+    def __repr__(self):
+        return "<Sample %s>" % self.__dict__
+
+
+class Histogram(object):
+    """Cumulative bucket counts plus sum and count, as Prometheus keeps them"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, count) pairs ending with ("+Inf", total)"""
+        rv = []
+        total = 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            rv.append((bound, total))
+        return rv
+
+
+class Registry(object):
+    """In-process histograms keyed by (function, view, error class)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def record(self, sample):
+        key = (sample.name, sample.view or "", sample.error or "")
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "latency_seconds": Histogram(LATENCY_BUCKETS),
+                    "payload_bytes": Histogram(BYTES_BUCKETS),
+                    "result_count": Histogram(COUNT_BUCKETS),
+                }
+            series["latency_seconds"].observe(sample.latency)
+            if sample.payload_bytes is not None:
+                series["payload_bytes"].observe(sample.payload_bytes)
+            series["result_count"].observe(sample.count)
+
+    def snapshot(self):
+        with self._lock:
+            return sorted(self._series.items())
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+registry = Registry()
+
+
+# Sinks are handed every sample as it is recorded.  The Prometheus endpoint
+# reads the registry instead, so it needs no sink.
+
+class LogSink(object):
+    def record(self, sample):
+        LOG.info("%s view=%s latency=%.3fs bytes=%s count=%d error=%s", sample.name,
+                 sample.view, sample.latency, sample.payload_bytes, sample.count, sample.error)
+
+
+class StatsdSink(object):
+    """Sends timers and counters to a statsd daemon over UDP"""
+
+    def __init__(self, host=None, port=None, prefix=None):
+        self.address = (host or METRICS_STATSD_HOST, port or METRICS_STATSD_PORT)
+        self.prefix = prefix or METRICS_STATSD_PREFIX
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def record(self, sample):
+        name = "%s.%s" % (self.prefix, sample.name)
+        lines = ["%s.latency:%d|ms" % (name, sample.latency * 1000),
+                 "%s.count:%d|h" % (name, sample.count),
+                 "%s.calls:1|c" % name]
+        if sample.payload_bytes is not None:
+            lines.append("%s.bytes:%d|h" % (name, sample.payload_bytes))
+        if sample.error:
+            lines.append("%s.errors.%s:1|c" % (name, sample.error))
+        try:
+            self._socket.sendto("\n".join(lines).encode("utf-8"), self.address)
+        except socket.error as ex:
+            # Metrics must never break a page
+            LOG.debug("Unable to send metrics to %s:%s: %s", self.address[0], self.address[1], ex)
+
+
+SINKS = {
+    "log": LogSink,
+    "statsd": StatsdSink,
+}
+
+_sinks = None
+_sinks_lock = threading.Lock()
+
+
+def get_sinks():
+    global _sinks
+
+    with _sinks_lock:
+        if _sinks is None:
+            _sinks = []
+            for name in METRICS_SINKS:
+                try:
+                    _sinks.append((SINKS.get(name) or import_string(name))())
+                except Exception as ex:
+                    LOG.error("Unable to load metrics sink %s: %s", name, ex)
+        return _sinks
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return getattr(match, "view_name", None) or getattr(request, "path", None)
+
+
+def _items(rv):
+    # Paged list calls return (items, has_more_data, has_prev_data)
+    return rv[0] if isinstance(rv, tuple) else rv
+
+
+def _count(rv):
+    items = _items(rv)
+    if items is None:
+        return 0
+    if isinstance(items, list):
+        return len(items)
+    return 1
+
+
+def _to_dict(value):
+    return value.to_dict() if hasattr(value, "to_dict") else str(value)
+
+
+def _payload_bytes(rv):
+    # The size of the decoded result re-encoded as JSON, which is close to
+    # what came over the wire.  Only a few rows are encoded and the size
+    # scaled up to the row count.
+    if not METRICS_PAYLOAD_BYTES or rv is None:
+        return None
+    items = _items(rv)
+    if not isinstance(items, list):
+        items = [items]
+    if not items:
+        return 2
+    rows = items[:METRICS_PAYLOAD_SAMPLE_ROWS]
+    try:
+        return len(json.dumps(rows, default=_to_dict)) * len(items) // len(rows)
+    except Exception:
+        return None
+
+
+def record(sample):
+    registry.record(sample)
+    for sink in get_sinks():
+        try:
+            sink.record(sample)
+        except Exception as ex:
+            LOG.debug("Metrics sink %s failed: %s", sink, ex)
+
+
+def instrumented(fn):
+    """Records latency, payload size, result count and errors of an API call.
+
+    The wrapped function must take the request as its first argument; it
+    is used to find the calling view.  Apply this outermost so cache hits
+    are measured too, though their payload size isn't, as nothing came
+    over the wire.  Calls the page code makes directly, rather than from
+    inside another instrumented call, are also counted against the
+    request's API call budget.
+    """
+    name = "%s.%s" % (fn.__module__.rsplit(".", 1)[-1], fn.__name__)
+
+    @functools.wraps(fn)
+    def wrapped(request, *args, **kwargs):
+        # Calls made from inside another instrumented call (including from
+        # the pool threads it fans out to) are part of that call as far as
+        # per-request counting goes.
+        ctx = executor.context()
+        outermost = "a10_api_call" not in ctx
+        if outermost:
+            ctx["a10_api_call"] = name
+            budget.note(request, name, args, kwargs)
+
+        start = time.time()
+        rv = None
+        error = None
+        cache.served_from_cache()
+        try:
+            rv = fn(request, *args, **kwargs)
+            return rv
+        except Exception as ex:
+            error = ex.__class__.__name__
+            raise
+        finally:
+            if outermost:
+                ctx.pop("a10_api_call", None)
+            payload_bytes = None if cache.served_from_cache() else _payload_bytes(rv)
+            record(Sample(name, _view_name(request), time.time() - start,
+                          payload_bytes, _count(rv), error))
+    return wrapped
+
+
+def _labels(**labels):
+    return ",".join('%s="%s"' % (k, str(v).replace('"', '\\"'))
+                    for k, v in sorted(labels.items()))
+
+
+def render_prometheus():
+    """The registry in Prometheus text exposition format"""
+    lines = []
+    for metric in ("latency_seconds", "payload_bytes", "result_count"):
+        full_name = "a10_horizon_api_%s" % metric
+        lines.append("# TYPE %s histogram" % full_name)
+        for (name, view, error), series in registry.snapshot():
+            histogram = series[metric]
+            if not histogram.count:
+                continue
+            labels = dict(call=name, view=view, error=error)
+            for bound, count in histogram.cumulative():
+                lines.append("%s_bucket{%s} %d" % (full_name, _labels(le=bound, **labels), count))
+            lines.append("%s_sum{%s} %s" % (full_name, _labels(**labels), histogram.sum))
+            lines.append("%s_count{%s} %d" % (full_name, _labels(**labels), histogram.count))
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint for this process's API call histograms.
+
+    Not routed by the plugin; see the README for adding it to Horizon's
+    URLconf.  With A10_METRICS_TOKEN set, scrapers must send it as a
+    bearer token.
+    """
+    if METRICS_TOKEN is not None:
+        if request.META.get("HTTP_AUTHORIZATION") != "Bearer %s" % METRICS_TOKEN:
+            return http.HttpResponseForbidden()
+    elif not getattr(request.user, "is_superuser", False):
+        return http.HttpResponseForbidden()
+
+    return http.HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4")
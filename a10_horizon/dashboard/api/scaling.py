@@ -13,17 +13,28 @@
 #    under the License.
 from __future__ import absolute_import
 
+import collections
 import logging
+
+from django.conf import settings
 from openstack_dashboard.api import neutron
 
 from a10_neutronclient.resources import a10_scaling_group
 
+from a10_horizon.dashboard.api import base
+from a10_horizon.dashboard.api import breaker
+from a10_horizon.dashboard.api import cache
+from a10_horizon.dashboard.api import executor
+from a10_horizon.dashboard.api import metrics
+
 neutronclient = neutron.neutronclient
 NeutronAPIDictWrapper = neutron.NeutronAPIDictWrapper
 
 
 LOG = logging.getLogger(__name__)
 
+REACTION_UPDATE_RETRIES = getattr(settings, 'A10_REACTION_UPDATE_RETRIES', 3)
+
 
 class A10ScalingGroup(NeutronAPIDictWrapper):
     """Wrapper for a10_scaling_group dictionary"""
@@ -63,96 +74,308 @@ class A10ScalingAlarm(NeutronAPIDictWrapper):
 
 # Scaling Groups
 
-def get_a10_scaling_groups(request, **kwargs):
-    rv = neutronclient(request)\
-        .list_a10_scaling_groups(**kwargs)\
-        .get(a10_scaling_group.SCALING_GROUPS)
+@metrics.instrumented
+@cache.cached(a10_scaling_group.SCALING_GROUPS)
+@breaker.guarded
+def get_a10_scaling_groups(request, paginate=False, **kwargs):
+    client = neutronclient(request)
+    if paginate:
+        rv, has_more_data, has_prev_data = base.paged_list(
+            request, client.list_a10_scaling_groups, a10_scaling_group.SCALING_GROUPS, **kwargs)
+        return map(A10ScalingGroup, rv), has_more_data, has_prev_data
+
+    rv = client.list_a10_scaling_groups(**kwargs).get(a10_scaling_group.SCALING_GROUPS)
     return map(A10ScalingGroup, rv)
 
 
+@metrics.instrumented
+@cache.request_cached(a10_scaling_group.SCALING_GROUP)
+@breaker.guarded
 def get_a10_scaling_group(request, id, **params):
     rv = neutronclient(request).show_a10_scaling_group(id).get(a10_scaling_group.SCALING_GROUP)
     return A10ScalingGroup(rv)
 
 
-def get_a10_scaling_group_with_children(request, id, **params):
-    group = neutronclient(request).show_a10_scaling_group(id).get(a10_scaling_group.SCALING_GROUP)
+@metrics.instrumented
+@cache.request_cached(a10_scaling_group.SCALING_GROUP)
+@breaker.guarded
+def get_a10_scaling_group_with_children(request, id, include=(), **params):
+    """Fetches a scaling group along with its workers.
+
+    The group and its workers are fetched concurrently.  ``include`` may
+    name "policy" to also attach the group's scaling policy and "alarms" to
+    attach the alarms referenced by that policy's reactions.  A child that
+    can't be fetched is left empty and its name is added to the group's
+    "unavailable" list; only a failure to fetch the group itself raises.
+    """
+    client = neutronclient(request)
     worker_filter = {
         "scaling_group_id": id
     }
 
-    workers = neutronclient(request)\
-        .list_a10_scaling_group_workers(filters=worker_filter)\
-        .get(a10_scaling_group.SCALING_GROUP_WORKERS)
+    def get_group():
+        return client.show_a10_scaling_group(id).get(a10_scaling_group.SCALING_GROUP)
+
+    def get_workers():
+        return client.list_a10_scaling_group_workers(filters=worker_filter)\
+            .get(a10_scaling_group.SCALING_GROUP_WORKERS)
+
+    results = executor.gather({"group": get_group, "workers": get_workers})
+
+    group, ex = results["group"]
+    if ex is not None:
+        raise ex
+
+    unavailable = []
+    workers, ex = results["workers"]
+    if ex is not None:
+        LOG.warning("Unable to retrieve workers for scaling group %s: %s", id, ex)
+        unavailable.append("workers")
+        workers = []
     group["workers"] = map(A10ScalingGroupMember, workers)
-    # group["workers"] = workers
+
+    # The policy can only be looked up once the group says which one it is.
+    if ("policy" in include or "alarms" in include) and group.get("scaling_policy_id"):
+        try:
+            policy = get_a10_scaling_policy(request, group["scaling_policy_id"])
+            group["policy"] = policy
+            if "alarms" in include:
+                reactions = policy.get("reactions") or []
+                group["alarms"] = [A10ScalingAlarm(x["alarm"]) for x in reactions
+                                   if x.get("alarm")]
+        except Exception as ex:
+            LOG.warning("Unable to retrieve policy for scaling group %s: %s", id, ex)
+            unavailable.append("policy")
+
+    group["unavailable"] = unavailable
     rv = A10ScalingGroup(group)
     return rv
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def delete_a10_scaling_group(request, id):
     neutronclient(request).delete_a10_scaling_group(id)
+    cache.forget(request, a10_scaling_group.SCALING_GROUP, id)
+    cache.invalidate(request, a10_scaling_group.SCALING_GROUPS)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def create_a10_scaling_group(request, **kwargs):
     body = {a10_scaling_group.SCALING_GROUP: kwargs}
     rv = neutronclient(request)\
         .create_a10_scaling_group(body=body)\
         .get(a10_scaling_group.SCALING_GROUP)
+    cache.invalidate(request, a10_scaling_group.SCALING_GROUPS)
     return A10ScalingGroup(rv)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def update_a10_scaling_group(request, id, **kwargs):
     body = {a10_scaling_group.SCALING_GROUP: kwargs}
     rv = neutronclient(request)\
         .update_a10_scaling_group(id, body=body)\
         .get(a10_scaling_group.SCALING_GROUP)
+    cache.forget(request, a10_scaling_group.SCALING_GROUP, id)
+    cache.invalidate(request, a10_scaling_group.SCALING_GROUPS)
     return A10ScalingGroup(rv)
 
 
 # Scaling Policy
 
-def get_a10_scaling_policies(request, **kwargs):
-    rv = neutronclient(request)\
-        .list_a10_scaling_policies(**kwargs)\
-        .get(a10_scaling_group.SCALING_POLICIES)
+@metrics.instrumented
+@cache.cached(a10_scaling_group.SCALING_POLICIES)
+@breaker.guarded
+def get_a10_scaling_policies(request, paginate=False, **kwargs):
+    client = neutronclient(request)
+    if paginate:
+        rv, has_more_data, has_prev_data = base.paged_list(
+            request, client.list_a10_scaling_policies, a10_scaling_group.SCALING_POLICIES, **kwargs)
+        return map(A10ScalingPolicy, rv), has_more_data, has_prev_data
+
+    rv = client.list_a10_scaling_policies(**kwargs).get(a10_scaling_group.SCALING_POLICIES)
     return map(A10ScalingPolicy, rv)
 
 
+@metrics.instrumented
+@cache.request_cached(a10_scaling_group.SCALING_POLICY)
+@breaker.guarded
 def get_a10_scaling_policy(request, id, **params):
     rv = neutronclient(request).show_a10_scaling_policy(id).get(a10_scaling_group.SCALING_POLICY)
     return A10ScalingPolicy(rv)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def delete_a10_scaling_policy(request, id):
     neutronclient(request).delete_a10_scaling_policy(id)
+    cache.forget(request, a10_scaling_group.SCALING_POLICY, id)
+    cache.invalidate(request, a10_scaling_group.SCALING_POLICIES, a10_scaling_group.SCALING_GROUPS)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def create_a10_scaling_policy(request, **kwargs):
     body = {a10_scaling_group.SCALING_POLICY: kwargs}
     rv = neutronclient(request)\
         .create_a10_scaling_policy(body=body)\
         .get(a10_scaling_group.SCALING_POLICY)
+    cache.invalidate(request, a10_scaling_group.SCALING_POLICIES)
     return A10ScalingPolicy(rv)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def update_a10_scaling_policy(request, id, **kwargs):
     body = {a10_scaling_group.SCALING_POLICY: kwargs}
     rv = neutronclient(request)\
         .update_a10_scaling_policy(id, body=body)\
         .get(a10_scaling_group.SCALING_POLICY)
+    cache.forget(request, a10_scaling_group.SCALING_POLICY, id)
+    cache.invalidate(request, a10_scaling_group.SCALING_POLICIES)
     return A10ScalingPolicy(rv)
 
 
+# Scaling Policy Reactions
+#
+# The API has no reaction resource, so these PUT just the policy's
+# reactions list.  When the server reports a revision_number the PUT is
+# made conditional on it, and a 409/412 (someone else changed the policy
+# since it was read) re-reads the policy and re-applies the change.
+# Without a revision_number there is nothing to make the PUT conditional
+# on, and the last writer wins.
+#
+# Changes name reactions by reaction_ids() rather than by position, so a
+# change re-applied after a conflict still touches the reactions the user
+# picked even if others were added or removed in between.
+
+class ReactionConflict(Exception):
+    """Raised when a reaction change keeps losing to concurrent updates"""
+    pass
+
+
+def reaction_ids(reactions):
+    """Ids for the reactions, in order, that don't depend on their positions.
+
+    An id is "<alarm_id>:<action_id>:<n>", where n counts the reactions
+    before it with the same alarm and action.
+    """
+    seen = collections.Counter()
+    rv = []
+    for x in reactions:
+        pair = (x["alarm_id"], x["action_id"])
+        rv.append("%s:%s:%d" % (pair[0], pair[1], seen[pair]))
+        seen[pair] += 1
+    return rv
+
+
+def _reaction_refs(reactions):
+    return [{"alarm_id": x["alarm_id"], "action_id": x["action_id"]} for x in reactions]
+
+
+def _is_conflict(ex):
+    return getattr(ex, "status_code", None) in (409, 412)
+
+
+def _put_reactions(client, policy, reactions):
+    body = {a10_scaling_group.SCALING_POLICY: {"reactions": reactions}}
+    headers = None
+    revision = policy.get("revision_number")
+    if revision is not None:
+        headers = {"If-Match": "revision_number=%s" % revision}
+
+    path = getattr(client, "%s_path" % a10_scaling_group.SCALING_POLICY)
+    return client.put(path % policy["id"], body=body, headers=headers)\
+        .get(a10_scaling_group.SCALING_POLICY)
+
+
+def _update_reactions(request, id, change):
+    """Applies change(reactions) -> reactions to the policy's current reactions"""
+    client = neutronclient(request)
+
+    for attempt in range(REACTION_UPDATE_RETRIES + 1):
+        # Always read afresh; a retry must see the change that beat us.
+        policy = client.show_a10_scaling_policy(id).get(a10_scaling_group.SCALING_POLICY)
+        reactions = change(_reaction_refs(policy.get("reactions", [])))
+        try:
+            rv = _put_reactions(client, policy, reactions)
+            break
+        except Exception as ex:
+            if not _is_conflict(ex):
+                raise
+            LOG.info("Scaling policy %s changed while updating its reactions, retrying (%d)",
+                     id, attempt + 1)
+    else:
+        raise ReactionConflict(id)
+
+    cache.forget(request, a10_scaling_group.SCALING_POLICY, id)
+    cache.invalidate(request, a10_scaling_group.SCALING_POLICIES)
+    return A10ScalingPolicy(rv)
+
+
+@metrics.instrumented
+@breaker.guarded_write
+def add_a10_scaling_reaction(request, id, alarm_id, action_id, position=None):
+    """Adds a reaction to the policy, at the end unless position is given"""
+    reaction = {"alarm_id": alarm_id, "action_id": action_id}
+
+    def change(reactions):
+        reactions.insert(len(reactions) if position is None else int(position), reaction)
+        return reactions
+
+    return _update_reactions(request, id, change)
+
+
+@metrics.instrumented
+@breaker.guarded_write
+def remove_a10_scaling_reactions(request, id, ids):
+    """Removes the reactions with the given reaction_ids() in one update"""
+    ids = set(ids)
+
+    def change(reactions):
+        return [x for x, rid in zip(reactions, reaction_ids(reactions)) if rid not in ids]
+
+    return _update_reactions(request, id, change)
+
+
+@metrics.instrumented
+@breaker.guarded_write
+def reorder_a10_scaling_reactions(request, id, order):
+    """Puts the reactions in the order of the reaction_ids() in ``order``, in one update.
+
+    Ids of reactions removed in the meantime are skipped, and reactions
+    added in the meantime keep their order after the ones listed.
+    """
+    def change(reactions):
+        ids = reaction_ids(reactions)
+        by_id = dict(zip(ids, reactions))
+        rv = [by_id.pop(x) for x in order if x in by_id]
+        return rv + [x for x, rid in zip(reactions, ids) if rid in by_id]
+
+    return _update_reactions(request, id, change)
+
+
 # Scaling Alarms
 
-def get_a10_scaling_alarms(request, **kwargs):
-    rv = neutronclient(request)\
-        .list_a10_scaling_alarms(**kwargs)\
-        .get(a10_scaling_group.SCALING_ALARMS)
+@metrics.instrumented
+@cache.cached(a10_scaling_group.SCALING_ALARMS)
+@breaker.guarded
+def get_a10_scaling_alarms(request, paginate=False, **kwargs):
+    client = neutronclient(request)
+    if paginate:
+        rv, has_more_data, has_prev_data = base.paged_list(
+            request, client.list_a10_scaling_alarms, a10_scaling_group.SCALING_ALARMS, **kwargs)
+        return map(A10ScalingAlarm, rv), has_more_data, has_prev_data
+
+    rv = client.list_a10_scaling_alarms(**kwargs).get(a10_scaling_group.SCALING_ALARMS)
     return map(A10ScalingAlarm, rv)
 
 
+@metrics.instrumented
+@cache.request_cached(a10_scaling_group.SCALING_ALARM)
+@breaker.guarded
 def get_a10_scaling_alarm(request, id, **kwargs):
     rv = neutronclient(request)\
         .show_a10_scaling_alarm(id)\
@@ -160,56 +383,88 @@ def get_a10_scaling_alarm(request, id, **kwargs):
     return A10ScalingAlarm(rv)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def delete_a10_scaling_alarm(request, id):
     neutronclient(request).delete_a10_scaling_alarm(id)
+    cache.forget(request, a10_scaling_group.SCALING_ALARM, id)
+    cache.invalidate(request, a10_scaling_group.SCALING_ALARMS, a10_scaling_group.SCALING_POLICIES)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def create_a10_scaling_alarm(request, **kwargs):
     body = {a10_scaling_group.SCALING_ALARM: kwargs}
     rv = neutronclient(request)\
         .create_a10_scaling_alarm(body=body)\
         .get(a10_scaling_group.SCALING_ALARM)
+    cache.invalidate(request, a10_scaling_group.SCALING_ALARMS, a10_scaling_group.SCALING_POLICIES)
     return A10ScalingAlarm(rv)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def update_a10_scaling_alarm(request, id, **kwargs):
     body = {a10_scaling_group.SCALING_ALARM: kwargs}
     rv = neutronclient(request)\
         .update_a10_scaling_alarm(id, body=body).get(a10_scaling_group.SCALING_ALARM)
+    cache.forget(request, a10_scaling_group.SCALING_ALARM, id)
+    cache.invalidate(request, a10_scaling_group.SCALING_ALARMS, a10_scaling_group.SCALING_POLICIES)
     return A10ScalingAlarm(rv)
 
 
 # Scaling Actions
 
-def get_a10_scaling_actions(request, **kwargs):
-    rv = neutronclient(request)\
-        .list_a10_scaling_actions(**kwargs)\
-        .get(a10_scaling_group.SCALING_ACTIONS)
+@metrics.instrumented
+@cache.cached(a10_scaling_group.SCALING_ACTIONS)
+@breaker.guarded
+def get_a10_scaling_actions(request, paginate=False, **kwargs):
+    client = neutronclient(request)
+    if paginate:
+        rv, has_more_data, has_prev_data = base.paged_list(
+            request, client.list_a10_scaling_actions, a10_scaling_group.SCALING_ACTIONS, **kwargs)
+        return map(A10ScalingAction, rv), has_more_data, has_prev_data
+
+    rv = client.list_a10_scaling_actions(**kwargs).get(a10_scaling_group.SCALING_ACTIONS)
     return map(A10ScalingAction, rv)
 
 
+@metrics.instrumented
+@cache.request_cached(a10_scaling_group.SCALING_ACTION)
+@breaker.guarded
 def get_a10_scaling_action(request, id, **kwargs):
     rv = neutronclient(request).show_a10_scaling_action(id).get(a10_scaling_group.SCALING_ACTION)
     return A10ScalingAction(rv)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def delete_a10_scaling_action(request, id):
     neutronclient(request).delete_a10_scaling_action(id)
+    cache.forget(request, a10_scaling_group.SCALING_ACTION, id)
+    cache.invalidate(request, a10_scaling_group.SCALING_ACTIONS, a10_scaling_group.SCALING_POLICIES)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def create_a10_scaling_action(request, **kwargs):
     body = {a10_scaling_group.SCALING_ACTION: kwargs}
     rv = neutronclient(request)\
         .create_a10_scaling_action(body=body)\
         .get(a10_scaling_group.SCALING_ACTION)
+    cache.invalidate(request, a10_scaling_group.SCALING_ACTIONS, a10_scaling_group.SCALING_POLICIES)
     return A10ScalingAction(rv)
 
 
+@metrics.instrumented
+@breaker.guarded_write
 def update_a10_scaling_action(request, id, **kwargs):
     body = {a10_scaling_group.SCALING_ACTION: kwargs}
     rv = neutronclient(request)\
         .update_a10_scaling_action(id, body=body)\
         .get(a10_scaling_group.SCALING_ACTION)
+    cache.forget(request, a10_scaling_group.SCALING_ACTION, id)
+    cache.invalidate(request, a10_scaling_group.SCALING_ACTIONS, a10_scaling_group.SCALING_POLICIES)
     return A10ScalingAction(rv)
 
 
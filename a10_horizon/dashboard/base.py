@@ -12,74 +12,83 @@ from django.utils.translation import ugettext_lazy as _
 LOG = logging.getLogger(__name__)
 
 
-def post_hack(self, request, *args, **kwargs):
+# Objects that reference others have to go first: bindings point at VIPs and
+# certificates, VIPs and members at pools, and pools at monitors.
+DELETE_ORDER = ("certificatebinding", "certificate", "vip", "member", "pool", "monitor")
+
+
+def _delete_actions():
     # These import statements break the pip install when they're global
     from a10_horizon.dashboard.api import certificates as cert_api
+    from openstack_dashboard import api
+
+    return {
+        "monitor": (api.lbaas.pool_health_monitor_delete, _("monitor"), _("monitors")),
+        "pool": (api.lbaas.pool_delete, _("pool"), _("pools")),
+        "member": (api.lbaas.member_delete, _("member"), _("members")),
+        "vip": (api.lbaas.vip_delete, _("VIP"), _("VIPs")),
+        "certificate": (cert_api.certificate_delete, _("certificate"), _("certificates")),
+        "certificatebinding": (cert_api.certificate_binding_delete,
+                               _("certificate association"), _("certificate associations")),
+    }
+
+
+def _resolve_vips(request, pool_ids):
+    """Maps the selected pools to their VIPs with a single list call"""
+    from openstack_dashboard import api
+
+    pools = api.neutron.neutronclient(request).list_pools(
+        id=pool_ids, fields=["id", "vip_id"]).get("pools", [])
+    vip_ids = dict((x["id"], x.get("vip_id")) for x in pools)
+
+    resolved = [vip_ids[x] for x in pool_ids if vip_ids.get(x)]
+    unresolved = [x for x in pool_ids if not vip_ids.get(x)]
+    return resolved, unresolved
+
+
+def plan_deletes(request, selected):
+    """Orders the selected objects into tiers that can each be deleted in parallel.
+
+    ``selected`` maps an object type to the ids chosen for it; VIPs are
+    selected by their pool's id and resolved here.  Returns a list of
+    (type, ids) tuples in DELETE_ORDER and the list of pool ids whose VIP
+    couldn't be found.
+    """
+    unresolved = []
+    if selected.get("vip"):
+        selected = dict(selected)
+        selected["vip"], unresolved = _resolve_vips(request, selected["vip"])
+
+    plan = [(m, selected[m]) for m in DELETE_ORDER if selected.get(m)]
+    return plan, unresolved
+
+
+def post_hack(self, request, *args, **kwargs):
+    # These import statements break the pip install when they're global
+    from a10_horizon.dashboard import bulk
     from horizon import exceptions
     from horizon import messages
-    from openstack_dashboard import api
 
     obj_ids = request.POST.getlist('object_ids')
     action = request.POST['action']
     m = re.search('.delete([a-z]+)', action).group(1)
     if obj_ids == []:
         obj_ids.append(re.search('([0-9a-z-]+)$', action).group(1))
-    if m == 'monitor':
-        for obj_id in obj_ids:
-            try:
-                api.lbaas.pool_health_monitor_delete(request, obj_id)
-                messages.success(request, _('Deleted monitor %s') % obj_id)
-            except Exception as e:
-                exceptions.handle(request,
-                                  _('Unable to delete monitor. %s') % e)
-    if m == 'pool':
-        for obj_id in obj_ids:
-            try:
-                api.lbaas.pool_delete(request, obj_id)
-                messages.success(request, _('Deleted pool %s') % obj_id)
-            except Exception as e:
-                exceptions.handle(request,
-                                  _('Unable to delete pool. %s') % e)
-    if m == 'member':
-        for obj_id in obj_ids:
-            try:
-                api.lbaas.member_delete(request, obj_id)
-                messages.success(request, _('Deleted member %s') % obj_id)
-            except Exception as e:
-                exceptions.handle(request,
-                                  _('Unable to delete member. %s') % e)
-    if m == 'vip':
-        for obj_id in obj_ids:
-            try:
-                vip_id = api.lbaas.pool_get(request, obj_id).vip_id
-            except Exception as e:
-                exceptions.handle(request,
-                                  _('Unable to locate VIP to delete. %s')
-                                  % e)
-            if vip_id is not None:
-                try:
-                    api.lbaas.vip_delete(request, vip_id)
-                    messages.success(request, _('Deleted VIP %s') % vip_id)
-                except Exception as e:
-                    exceptions.handle(request,
-                                      _('Unable to delete VIP. %s') % e)
-
-    if m == 'certificate':
-        for obj_id in obj_ids:
-            try:
-                cert_api.certificate_delete(request, obj_id)
-                messages.success(request, _("Deleted certificate. %s") % obj_id)
-            except Exception as e:
-                exceptions.handle(request, _('Unable to delete Certificate. %s') % e)
-
-    if m == 'certificatebinding':
-        for obj_id in obj_ids:
-            try:
-                cert_api.certificate_binding_delete(request, obj_id)
-                messages.success(request, _("Deleted certificate association. %s") % obj_id)
-            except Exception as e:
-                exceptions.handle(request, _("Unable to delete certificate association %s") %
-                                  obj_id)
+
+    try:
+        plan, unresolved = plan_deletes(request, {m: obj_ids})
+    except Exception as e:
+        exceptions.handle(request, _('Unable to plan deletion. %s') % e)
+        return self.get(request, *args, **kwargs)
+
+    if unresolved:
+        messages.error(request, _('Unable to locate VIP to delete for pool %s')
+                       % ", ".join(unresolved))
+
+    delete_actions = _delete_actions()
+    for obj_type, ids in plan:
+        delete_fn, noun, plural = delete_actions[obj_type]
+        bulk.delete_all(request, delete_fn, ids, noun, plural)
 
     return self.get(request, *args, **kwargs)
 
@@ -0,0 +1,49 @@
+# Copyright (C) 2014-2016, A10 Networks Inc. All rights reserved.
+
+import logging
+
+from django.conf import settings
+from django.utils.translation import ugettext_lazy as _
+from horizon import messages
+
+from a10_horizon.dashboard.api import executor
+
+LOG = logging.getLogger(__name__)
+
+BULK_DELETE_CONCURRENCY = getattr(settings, 'A10_BULK_DELETE_CONCURRENCY', 8)
+
+
+def delete_all(request, delete_fn, obj_ids, noun, plural, limit=None):
+    """Deletes every object in obj_ids concurrently.
+
+    ``delete_fn`` is one of the API delete functions, called as
+    ``delete_fn(request, obj_id)``.  At most ``limit`` deletes
+    (A10_BULK_DELETE_CONCURRENCY by default) run at once.  Rather than one
+    message per object, a single success and a single failure message
+    summarize the outcome.  Every delete is waited for, however long
+    Neutron takes, so each id is reported as deleted or failed by what
+    Neutron actually did.  Returns the lists of deleted ids and of
+    (id, exception) failures.
+    """
+    if limit is None:
+        limit = BULK_DELETE_CONCURRENCY
+
+    results = executor.run_each(lambda obj_id: delete_fn(request, obj_id), obj_ids, limit=limit,
+                                abandon=False)
+    deleted = [obj_id for obj_id, rv, ex in results if ex is None]
+    failed = [(obj_id, ex) for obj_id, rv, ex in results if ex is not None]
+
+    for obj_id, ex in failed:
+        LOG.error("Unable to delete %s %s: %s", noun, obj_id, ex)
+
+    if deleted:
+        msg = _("Deleted {0} {1}: {2}").format(len(deleted), noun if len(deleted) == 1 else plural,
+                                               ", ".join(deleted))
+        messages.success(request, msg)
+    if failed:
+        msg = _("Unable to delete {0} {1}: {2}").format(len(failed),
+                                                        noun if len(failed) == 1 else plural,
+                                                        ", ".join(x[0] for x in failed))
+        messages.error(request, msg)
+
+    return deleted, failed
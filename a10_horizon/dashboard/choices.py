@@ -0,0 +1,134 @@
+# Copyright (C) 2014-2016, A10 Networks Inc. All rights reserved.
+
+import functools
+import logging
+
+from django.conf import settings
+from django import http
+from django.utils.translation import ugettext_lazy as _
+from django.views import generic
+from horizon import forms
+
+from a10_horizon.dashboard.api import executor
+
+LOG = logging.getLogger(__name__)
+
+TYPEAHEAD_THRESHOLD = getattr(settings, 'A10_CHOICE_TYPEAHEAD_THRESHOLD', 200)
+TYPEAHEAD_LIMIT = getattr(settings, 'A10_CHOICE_TYPEAHEAD_LIMIT', 20)
+# Objects asked of Neutron at a time while looking for typeahead matches
+TYPEAHEAD_PAGE_SIZE = getattr(settings, 'A10_CHOICE_TYPEAHEAD_PAGE_SIZE', 100)
+# Most pages one lookup reads before answering with the matches it has
+TYPEAHEAD_MAX_PAGES = getattr(settings, 'A10_CHOICE_TYPEAHEAD_MAX_PAGES', 5)
+
+# Choices only ever show the name, so don't pull whole objects over the wire.
+CHOICE_FIELDS = ["id", "name"]
+
+
+def _list_call(request, list_fn):
+    return functools.partial(list_fn, request, tenant_id=request.user.tenant_id,
+                             fields=CHOICE_FIELDS)
+
+
+def load(request, providers):
+    """Loads the objects behind several choice fields concurrently.
+
+    ``providers`` maps a name to one of the cached API list functions.  Each
+    is called for the request's tenant with just id and name, so repeated
+    opens of the same form (and its POST) are served from the tenant cache
+    until a write to that resource invalidates it.  Returns a dict mapping
+    the same names to ``(objects, exception)`` tuples.
+    """
+    return executor.gather(dict((name, _list_call(request, list_fn))
+                                for name, list_fn in providers.items()))
+
+
+def search(objs, term, limit=None):
+    """Returns up to ``limit`` of objs whose name contains or id starts with term"""
+    term = (term or "").strip().lower()
+    matches = [x for x in objs
+               if term in (x.get("name") or "").lower() or x["id"].startswith(term)]
+    return [{"id": x["id"], "name": x.get("name")} for x in matches[:limit]]
+
+
+def search_pages(request, list_fn, term, limit, page_size=None, max_pages=None):
+    """Finds up to ``limit`` matches for term a page at a time.
+
+    ``list_fn`` is a cached API list function that accepts
+    ``paginate=True``.  Pages of ``page_size`` objects
+    (A10_CHOICE_TYPEAHEAD_PAGE_SIZE) are read from Neutron until enough
+    matches turn up, the collection ends or ``max_pages``
+    (A10_CHOICE_TYPEAHEAD_MAX_PAGES) have been read.  A name that matches
+    exactly is looked up with a Neutron filter first, so it is found
+    however far into the collection it is.
+    """
+    if page_size is None:
+        page_size = TYPEAHEAD_PAGE_SIZE
+    if max_pages is None:
+        max_pages = TYPEAHEAD_MAX_PAGES
+    list_page = functools.partial(_list_call(request, list_fn), paginate=True,
+                                  page_size=page_size)
+    term = (term or "").strip()
+
+    matches = []
+    if term:
+        objs, has_more, has_prev = list_page(name=term, page_size=limit)
+        matches.extend(search(objs, term))
+
+    marker = None
+    for i in range(max_pages):
+        if len(matches) >= limit:
+            break
+        objs, has_more, has_prev = list_page(marker=marker)
+        seen = set(x["id"] for x in matches)
+        matches.extend(x for x in search(objs, term) if x["id"] not in seen)
+        if not has_more or not objs:
+            break
+        marker = objs[-1]["id"]
+
+    return matches[:limit]
+
+
+def populate(field, objs, empty_label, typeahead_url=None):
+    """Fills in a ChoiceField from objs.
+
+    Up to A10_CHOICE_TYPEAHEAD_THRESHOLD objects are rendered as a plain
+    select.  Past that, if a ``typeahead_url`` is given, the field is
+    rendered as a text input that looks names up from it instead; the
+    choices are still set so the submitted id is validated as usual.
+    """
+    field.choices = [("", empty_label)] + [(x["id"], x.get("name") or x["id"]) for x in objs]
+
+    if typeahead_url and len(objs) > TYPEAHEAD_THRESHOLD:
+        field.widget = forms.TextInput(attrs={
+            "data-typeahead-url": typeahead_url,
+            "autocomplete": "off",
+            "placeholder": _("Type a name to search"),
+        })
+        field.widget.is_required = field.required
+
+
+class ChoicesView(generic.View):
+
+    """JSON typeahead endpoint for choice fields too long to render.
+
+    ``providers`` maps the ``resource`` URL argument to a cached API list
+    function that accepts ``paginate=True``.  ``GET ?q=<term>`` returns a
+    list of matching ``{"id", "name"}`` objects, at most
+    A10_CHOICE_TYPEAHEAD_LIMIT of them, found with search_pages() rather
+    than by listing the whole collection.
+    """
+
+    providers = {}
+
+    def get(self, request, resource):
+        list_fn = self.providers.get(resource)
+        if list_fn is None:
+            raise http.Http404()
+
+        try:
+            matches = search_pages(request, list_fn, request.GET.get("q"), TYPEAHEAD_LIMIT)
+        except Exception as ex:
+            LOG.exception(ex)
+            return http.JsonResponse({"error": "Unable to retrieve %s" % resource}, status=503)
+
+        return http.JsonResponse(matches, safe=False)
@@ -0,0 +1,174 @@
+# Copyright (C) 2014-2016, A10 Networks Inc. All rights reserved.
+
+import logging
+from multiprocessing.pool import ThreadPool
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django import http
+from django.views import generic
+
+from a10_horizon.dashboard.api import base
+from a10_horizon.dashboard.api import executor
+
+LOG = logging.getLogger(__name__)
+
+JOB_POOL_SIZE = getattr(settings, 'A10_JOB_POOL_SIZE', 4)
+JOB_STATE_TTL = getattr(settings, 'A10_JOB_STATE_TTL', 3600)
+# Jobs without an object kept track of per tenant and kind
+TENANT_JOBS = 20
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Statuses still worth polling for
+ACTIVE = (QUEUED, RUNNING)
+
+# Long-running jobs get their own pool so they can't starve the API fan-out
+# in executor.
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool, _pool_pid
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPool(JOB_POOL_SIZE)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+# Job state lives in the Django cache so it survives a page reload and,
+# with a shared cache backend, is visible to every dashboard process.
+
+def _job_key(job_id):
+    return "a10:job:%s" % job_id
+
+
+def _object_key(kind, object_id):
+    return "a10:job:%s:%s" % (kind, object_id)
+
+
+def _tenant_key(kind, tenant_id):
+    return "a10:job:%s:tenant:%s" % (kind, tenant_id)
+
+
+def _save(job):
+    job["updated_at"] = time.time()
+    django_cache.set(_job_key(job["id"]), job, JOB_STATE_TTL)
+
+
+def get(job_id):
+    """Returns the state of a job, or None once it is unknown or has aged out"""
+    return django_cache.get(_job_key(job_id))
+
+
+def for_request(request, job_id):
+    """Returns the state of a job if it was started by the request's tenant, else None"""
+    job = get(job_id)
+    if job is None or job["tenant_id"] != request.user.tenant_id:
+        return None
+    return job
+
+
+def for_tenant(kind, tenant_id):
+    """States of the tenant's latest jobs of ``kind`` started without an object_id"""
+    job_ids = django_cache.get(_tenant_key(kind, tenant_id)) or []
+    jobs = django_cache.get_many([_job_key(x) for x in job_ids])
+    return [jobs[_job_key(x)] for x in job_ids if _job_key(x) in jobs]
+
+
+def for_objects(kind, object_ids):
+    """Maps each of object_ids that has a job of ``kind`` to that job's state"""
+    object_ids = list(object_ids)
+    job_ids = django_cache.get_many([_object_key(kind, x) for x in object_ids])
+    jobs = django_cache.get_many([_job_key(x) for x in job_ids.values()])
+
+    rv = {}
+    for object_id in object_ids:
+        job_id = job_ids.get(_object_key(kind, object_id))
+        if job_id is not None and _job_key(job_id) in jobs:
+            rv[object_id] = jobs[_job_key(job_id)]
+    return rv
+
+
+def for_object(kind, object_id):
+    return for_objects(kind, [object_id]).get(object_id)
+
+
+def _run(job, fn, request):
+    # Pool threads are reused, so start each job without another's deadline
+    executor.context().clear()
+
+    def progress(step):
+        job["step"] = step
+        _save(job)
+        LOG.debug("Job %s (%s %s): %s", job["id"], job["kind"], job["object_id"], step)
+
+    job["status"] = RUNNING
+    _save(job)
+    try:
+        job["result"] = fn(request, progress)
+        job["status"] = DONE
+    except Exception as ex:
+        LOG.exception("Job %s (%s %s) failed", job["id"], job["kind"], job["object_id"])
+        job["status"] = FAILED
+        job["error"] = str(ex)
+    _save(job)
+
+
+def submit(request, kind, fn, object_id=None, label=None):
+    """Runs ``fn(request, progress)`` in the background and returns the new job's state.
+
+    ``fn`` is not given the request itself, which is finished with by the
+    time the job runs, but a DetachedRequest holding the user's token,
+    project and service catalog; it should build any client or session it
+    needs from that.  It reports what it is doing by calling
+    ``progress(step)`` with a short description; whatever it returns is
+    kept as the job's result and must be picklable.  A job is tied to the
+    request's tenant and, when ``object_id`` is given, can be found again
+    with for_object(); jobs without one, such as creates, are found with
+    for_tenant() and can be given a ``label`` to show meanwhile.
+    """
+    job = {
+        "id": str(uuid.uuid4()),
+        "kind": kind,
+        "object_id": object_id,
+        "label": label,
+        "tenant_id": request.user.tenant_id,
+        "status": QUEUED,
+        "step": None,
+        "result": None,
+        "error": None,
+        "started_at": time.time(),
+    }
+    _save(job)
+    if object_id is not None:
+        django_cache.set(_object_key(kind, object_id), job["id"], JOB_STATE_TTL)
+    else:
+        key = _tenant_key(kind, job["tenant_id"])
+        job_ids = (django_cache.get(key) or [])[-(TENANT_JOBS - 1):]
+        django_cache.set(key, job_ids + [job["id"]], JOB_STATE_TTL)
+
+    get_pool().apply_async(_run, (dict(job), fn, base.DetachedRequest(request)))
+    return job
+
+
+class JobView(generic.View):
+
+    """JSON progress of a job started by the request's tenant"""
+
+    def get(self, request, job_id):
+        job = for_request(request, job_id)
+        if job is None:
+            raise http.Http404()
+        return http.JsonResponse(job)
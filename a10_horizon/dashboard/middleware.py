@@ -0,0 +1,59 @@
+# Copyright (C) 2014-2016, A10 Networks Inc. All rights reserved.
+
+import logging
+
+from a10_horizon.dashboard.api import breaker
+from a10_horizon.dashboard.api import budget
+from a10_horizon.dashboard.api import executor
+
+try:
+    from django.utils.deprecation import MiddlewareMixin
+except ImportError:
+    MiddlewareMixin = object
+
+LOG = logging.getLogger(__name__)
+
+
+class ApiCallBudgetMiddleware(MiddlewareMixin):
+
+    """Counts the A10 API calls each request makes.
+
+    Identical calls made more than once in a request are logged as likely
+    N+1 patterns.  Views listed in A10_API_CALL_BUDGETS (or every view, with
+    A10_API_CALL_BUDGET_DEFAULT) that go over budget are logged.  The count
+    is sent back in the X-A10-API-Calls header, and the budget that was
+    exceeded in X-A10-API-Call-Budget, so CI can check them without
+    parsing logs.
+    """
+
+    def process_request(self, request):
+        budget.start(request)
+
+    def process_response(self, request, response):
+        match = getattr(request, "resolver_match", None)
+        if match is not None and hasattr(request, "_a10_api_calls"):
+            over = budget.check(request, match.view_name)
+            response["X-A10-API-Calls"] = str(len(budget.calls(request)))
+            if over is not None:
+                response["X-A10-API-Call-Budget"] = str(over)
+        return response
+
+
+class ApiDeadlineMiddleware(MiddlewareMixin):
+
+    """Gives each GET or HEAD request A10_API_REQUEST_DEADLINE seconds for all its A10 API calls.
+
+    Calls still running when the time is up are abandoned, and later ones
+    are refused, with NeutronUnavailable; the A10 tabs then render as
+    unavailable instead of holding the worker until Neutron answers.
+    Other requests, such as form posts and bulk actions, get no deadline:
+    abandoning their writes would leave the user not knowing what was done.
+    """
+
+    def process_request(self, request):
+        if request.method in ("GET", "HEAD"):
+            executor.set_deadline(breaker.API_REQUEST_DEADLINE)
+
+    def process_response(self, request, response):
+        executor.set_deadline(None)
+        return response
@@ -1,12 +1,100 @@
 # Copyright (C) 2014-2016, A10 Networks Inc. All rights reserved.
 
+import functools
 import horizon
 import logging
+import threading
+import time
 
+from django.conf import settings
+from openstack_dashboard.api import base
 from openstack_dashboard.api import neutron as neutron_api
 
+from a10_horizon.dashboard.api import base as a10_base
+from a10_horizon.dashboard.api import breaker
+from a10_horizon.dashboard.api import cache
+from a10_horizon.dashboard.api import executor
+
 LOG = logging.getLogger(__name__)
 
+EXTENSION_CACHE_TTL = getattr(settings, 'A10_EXTENSION_CACHE_TTL', 300)
+
+# endpoint -> (set of extension aliases, time fetched)
+_extension_cache = cache.LRUCache(maxsize=32)
+_refreshing = set()
+_refresh_lock = threading.Lock()
+# (endpoint, missing extensions) combinations we have already told the operator about
+_reported_missing = set()
+
+
+@breaker.guarded
+def _fetch_extensions(request):
+    # neutron_api.list_extensions is memoized per request, so go to the client
+    # directly or a background refresh would just hand back the first answer.
+    exts = neutron_api.neutronclient(request).list_extensions().get('extensions', [])
+    return set(x["alias"] for x in exts)
+
+
+def _refresh_extensions(request, endpoint):
+    try:
+        _extension_cache.set(endpoint, (_fetch_extensions(request), time.time()))
+    except Exception as ex:
+        LOG.warning("Unable to refresh the extension list for %s, serving the cached copy: %s",
+                    endpoint, ex)
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(endpoint)
+
+
+def _schedule_refresh(request, endpoint):
+    with _refresh_lock:
+        if endpoint in _refreshing:
+            return
+        _refreshing.add(endpoint)
+
+    executor.submit(functools.partial(_refresh_extensions,
+                                      a10_base.DetachedRequest(request), endpoint))
+
+
+def get_extensions(request):
+    """Returns the set of extension aliases advertised by the request's neutron endpoint.
+
+    The list is cached per endpoint.  Once it is older than
+    A10_EXTENSION_CACHE_TTL the cached copy is still returned while the
+    API executor pool refreshes it, using only the user's credentials
+    rather than the request; if the refresh fails the stale copy stays in
+    place.  With nothing cached, NeutronUnavailable is raised while
+    Neutron's breaker is open.
+    """
+    endpoint = base.url_for(request, 'network')
+    entry = _extension_cache.get(endpoint)
+
+    if entry is None:
+        exts = _fetch_extensions(request)
+        _extension_cache.set(endpoint, (exts, time.time()))
+        return exts
+
+    exts, fetched_at = entry
+    if time.time() - fetched_at > EXTENSION_CACHE_TTL:
+        _schedule_refresh(request, endpoint)
+    return exts
+
+
+def _report_missing(endpoint, missing_exts):
+    key = (endpoint, frozenset(missing_exts))
+    if key in _reported_missing:
+        LOG.debug("Required extensions %s still missing on %s", ", ".join(missing_exts), endpoint)
+        return
+    _reported_missing.add(key)
+
+    msg = "\n\n\n"
+    msg += "-------------- A10 NETWORKS SUPPORT INFORMATION --------------\n"
+    msg += "The following extensions are required to load this plugin:" + "\n\n"
+    msg += "\n".join(missing_exts)
+    msg += "\n\nPlease contact A10 Account Team to enable.\n"
+    msg += "--------------------------------------------------------------\n"
+    LOG.error(msg)
+
 
 class NeutronExtensionPanelBase(horizon.Panel):
 
@@ -16,26 +104,23 @@ class NeutronExtensionPanelBase(horizon.Panel):
     REQUIRED_EXTENSIONS = []
 
     def allowed(self, context):
-        exts = []
-
         if len(self.REQUIRED_EXTENSIONS) > 0:
             # Ensure all of the named extensions are present.  Else, return false.
             try:
-                exts = [x["alias"] for x in neutron_api.list_extensions(context.request)]
-                missing_exts = set(self.REQUIRED_EXTENSIONS) - set(exts)
+                exts = get_extensions(context.request)
+                missing_exts = sorted(set(self.REQUIRED_EXTENSIONS) - exts)
 
                 if len(missing_exts) > 0:
-                    msg = "\n\n\n"
-                    msg += "-------------- A10 NETWORKS SUPPORT INFORMATION --------------\n"
-                    msg += "The following extensions are required to load this plugin:" + "\n\n"
-                    msg += "\n".join(missing_exts)
-                    msg += "\n\nPlease contact A10 Account Team to enable.\n"
-                    msg += "--------------------------------------------------------------\n"
-                    LOG.error(msg)
+                    _report_missing(base.url_for(context.request, 'network'), missing_exts)
                     return False
                 else:
                     return True
 
+            except breaker.NeutronUnavailable as ex:
+                # Show the panel; its tabs say Neutron is unavailable
+                LOG.debug("Skipped the extension check: %s", ex)
+                return True
+
             except Exception as ex:
                 LOG.error("There was a problem retrieving the extension list.  See exception for details.")
                 LOG.exception(ex)
@@ -0,0 +1,126 @@
+# Copyright (C) 2014-2016, A10 Networks Inc. All rights reserved.
+
+import datetime
+import logging
+
+from django.utils.timesince import timesince
+from django.utils.translation import ugettext_lazy as _
+from horizon import messages
+from horizon import tabs
+
+from a10_horizon.dashboard.api import base
+from a10_horizon.dashboard.api import breaker
+from a10_horizon.dashboard.api import cache
+from a10_horizon.dashboard.api import executor
+
+LOG = logging.getLogger(__name__)
+
+
+class PagedTableTab(tabs.TableTab):
+
+    """TableTab whose table is loaded a page at a time.
+
+    Data methods call ``self.page(api_call, ...)`` with one of the API
+    list functions that accept ``paginate=True``; the marker is read from
+    the table's (prev_)pagination_param and the has_more/has_prev state is
+    handed back to Horizon for the table footer.  Unless the caller passes
+    ``fields``, only the attributes the table's columns show are requested.
+    """
+
+    _has_more_data = False
+    _has_prev_data = False
+
+    def _get_marker(self, table):
+        prev_marker = self.request.GET.get(table._meta.prev_pagination_param, None)
+        if prev_marker is not None:
+            return prev_marker, "asc"
+        return self.request.GET.get(table._meta.pagination_param, None), "desc"
+
+    def page(self, api_call, *args, **kwargs):
+        table = list(self._tables.values())[0]
+        marker, sort_dir = self._get_marker(table)
+        if "fields" not in kwargs:
+            fields = base.fields_for(table)
+            if fields:
+                kwargs["fields"] = fields
+        rv, self._has_more_data, self._has_prev_data = api_call(
+            self.tab_group.request, *args, paginate=True, marker=marker, sort_dir=sort_dir,
+            **kwargs)
+        return rv
+
+    def has_more_data(self, table):
+        return self._has_more_data
+
+    def has_prev_data(self, table):
+        return self._has_prev_data
+
+
+def mark_unavailable(tab, reason):
+    """Loads a table tab's tables empty, saying why instead of "No items" """
+    for table in tab._tables.values():
+        table.data = []
+        table._no_data_message = reason
+    tab._table_data_loaded = True
+
+
+class PrefetchTabGroup(tabs.TabGroup):
+
+    """TabGroup that loads the active tab and its cheap tabs concurrently.
+
+    Opt in with ``prefetch = True``.  On a full page load the active
+    tab's data calls are then issued in parallel on the shared executor
+    with those of any table tab that sets ``prefetch = True`` itself,
+    which is meant for tabs whose data is a single small or cached list.
+    Those cheap tabs are rendered inline so switching to them needs no
+    round trip; every other tab keeps ``preload = False`` and is loaded
+    over AJAX when it is opened.  AJAX requests for a single tab load
+    just that tab.
+
+    While Neutron's breaker is open, or once the request's deadline is
+    spent, calls are refused at once: tables the API cache has an older
+    copy for show it, with a warning saying how old it is, and the rest
+    render empty as unavailable.
+    """
+
+    prefetch = False
+
+    def _table_tabs(self):
+        return [tab for tab in self._tabs.values()
+                if isinstance(tab, tabs.TableTab) and tab._allowed and tab._enabled]
+
+    def _mark_unavailable(self, table_tabs):
+        reason = breaker.unavailable(self.request)
+        if reason is None:
+            return
+        empty = [tab for tab in table_tabs
+                 if tab._table_data_loaded and not any(t.data for t in tab._tables.values())]
+        for tab in empty:
+            mark_unavailable(tab, reason)
+        if empty:
+            messages.warning(self.request, reason)
+
+    def _warn_stale(self):
+        stale_since = cache.stale_since(self.request)
+        if stale_since is not None:
+            messages.warning(self.request,
+                             _("Neutron could not be reached; showing data from %s ago.")
+                             % timesince(datetime.datetime.fromtimestamp(stale_since)))
+
+    def load_tab_data(self):
+        table_tabs = self._table_tabs()
+        if self.prefetch and not self.request.is_ajax():
+            prefetched = [tab for tab in table_tabs
+                          if tab.is_active() or getattr(tab, "prefetch", False)]
+            for tab in prefetched:
+                if not tab.is_active():
+                    tab.preload = True
+
+            results = executor.gather(dict((tab.slug, tab.load_table_data) for tab in prefetched))
+            for slug, (rv, ex) in results.items():
+                if ex is not None:
+                    # Loading is retried serially when the tab renders.
+                    LOG.warning("Unable to prefetch tab %s: %s", slug, ex)
+
+        super(PrefetchTabGroup, self).load_tab_data()
+        self._mark_unavailable(table_tabs)
+        self._warn_stale()
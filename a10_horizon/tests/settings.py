@@ -0,0 +1,46 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# Just enough Django configuration to import and exercise the dashboard code.
+
+SECRET_KEY = "a10-horizon-tests"
+
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "horizon",
+    "openstack_auth",
+]
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Stands in for a cache shared by several Horizon processes
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "shared",
+    },
+}
+
+ROOT_URLCONF = "a10_horizon.tests.urls"
+
+SESSION_ENGINE = "django.contrib.sessions.backends.cache"
+
+HORIZON_CONFIG = {}
+
+API_RESULT_PAGE_SIZE = 20
+
+A10_API_CACHE_TTL = 60
@@ -0,0 +1,129 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+from importlib import import_module
+import os
+import sys
+import unittest
+
+import mock
+
+from django.conf import settings
+from django.contrib.messages.storage import default_storage
+from django.test import RequestFactory
+from django.utils import timezone
+
+from a10_horizon.dashboard.api import cache
+
+TOOLS = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))), "tools")
+
+SERVICE_CATALOG = [
+    {"type": "identity", "name": "keystone",
+     "endpoints": [{"region": "RegionOne", "interface": "public",
+                    "url": "http://keystone.test:5000/v3"}]},
+    {"type": "network", "name": "neutron",
+     "endpoints": [{"region": "RegionOne", "interface": "public",
+                    "url": "http://neutron.test:9696"}]},
+]
+
+
+def fake_request(tenant_id="tenant-1", user_id="user-1", is_superuser=False, **attrs):
+    """A request with just the user, token and catalog the API functions read"""
+    token = mock.Mock(id="token-%s" % user_id, unscoped_token="unscoped-%s" % user_id,
+                      project={"id": tenant_id, "name": "project-%s" % tenant_id},
+                      expires=timezone.now() + datetime.timedelta(hours=1))
+    user = mock.Mock(id=user_id, tenant_id=tenant_id, is_superuser=is_superuser,
+                     token=token, service_catalog=SERVICE_CATALOG,
+                     services_region="RegionOne")
+    request = mock.Mock(user=user, path="/test/", resolver_match=None, GET={}, POST={},
+                        META={}, spec=["user", "path", "resolver_match", "GET", "POST",
+                                       "META", "is_ajax"])
+    request.is_ajax.return_value = False
+    for k, v in attrs.items():
+        setattr(request, k, v)
+    return request
+
+
+class TestCase(unittest.TestCase):
+    """unittest.TestCase that undoes its patches after each test"""
+
+    def patch(self, *args, **kwargs):
+        patcher = mock.patch(*args, **kwargs)
+        rv = patcher.start()
+        self.addCleanup(patcher.stop)
+        return rv
+
+    def patch_object(self, *args, **kwargs):
+        patcher = mock.patch.object(*args, **kwargs)
+        rv = patcher.start()
+        self.addCleanup(patcher.stop)
+        return rv
+
+
+class FakeNeutronTestCase(TestCase):
+    """Runs views against tools/fake_neutron.py, seeded with ``rows`` of everything.
+
+    Another tenant's objects are seeded alongside, which no view should show.
+    """
+
+    rows = 30
+
+    @classmethod
+    def setUpClass(cls):
+        if TOOLS not in sys.path:
+            sys.path.insert(0, TOOLS)
+        import fake_neutron
+
+        cls.store = fake_neutron.Store()
+        cls.store.seed("tenant-1", cls.rows)
+        cls.store.seed("tenant-2", 5)
+        cls.neutron = fake_neutron.CountingApp(fake_neutron.FakeNeutron(
+            cls.store, default_tenant="tenant-2",
+            tokens={fake_request().user.token.id: "tenant-1"}))
+        cls.server, url = fake_neutron.serve(cls.neutron)
+        cls.catalog = [SERVICE_CATALOG[0],
+                       {"type": "network", "name": "neutron",
+                        "endpoints": [{"region": "RegionOne", "interface": "public",
+                                       "url": url}]}]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        self.patch_object(cache, "_results", cache.LocalStore())
+
+    def ids(self, collection, tenant_id="tenant-1"):
+        return sorted(x["id"] for x in self.store.list(collection) if x["tenant_id"] == tenant_id)
+
+    def first_id(self, collection):
+        return self.ids(collection)[0]
+
+    def view_request(self, path="/project/", method="get", data=None):
+        """A request for path from tenant-1's user, as the middleware would leave it"""
+        request = getattr(RequestFactory(), method)(path, data or {})
+        request.user = fake_request().user
+        request.user.service_catalog = self.catalog
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+        request._messages = default_storage(request)
+        request.horizon = {"async_messages": []}
+        return request
+
+    def get(self, view_class, **kwargs):
+        """Calls the view for a GET; returns its response and the HTTP requests Neutron got"""
+        before = self.neutron.requests
+        response = view_class.as_view()(self.view_request(), **kwargs)
+        return response, self.neutron.requests - before
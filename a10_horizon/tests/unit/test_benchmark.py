@@ -0,0 +1,50 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import imp
+import os
+
+from a10_horizon.tests import test_case
+
+panels = imp.load_source("a10_benchmark_panels",
+                         os.path.join(test_case.TOOLS, "benchmark", "panels.py"))
+
+
+def result(status=200, **metrics):
+    rv = {"case": "a10scaling.IndexView", "rows": 10, "faults": None, "status": status,
+          "cold_seconds": 1.0, "api_calls": 3}
+    rv.update(metrics)
+    return rv
+
+
+class TestCompare(test_case.TestCase):
+
+    def setUp(self):
+        self.baseline = {"a10scaling.IndexView@10": result()}
+
+    def test_within_baseline(self):
+        self.assertEqual([], panels.compare([result(cold_seconds=1.2)], self.baseline, 0.25))
+
+    def test_regressions(self):
+        failures = panels.compare([result(cold_seconds=2.0, api_calls=4)], self.baseline, 0.25)
+        self.assertEqual(2, len(failures))
+
+    def test_status_is_checked_without_a_baseline_entry(self):
+        failures = panels.compare([result(status=500)], {}, 0.25)
+        self.assertEqual(["a10scaling.IndexView@10 rendered with status 500",
+                          "a10scaling.IndexView@10 has no baseline; run with --update-baseline"],
+                         failures)
+
+    def test_missing_baseline_entry_fails(self):
+        self.assertEqual(1, len(panels.compare([result(rows=1000)], self.baseline, 0.25)))
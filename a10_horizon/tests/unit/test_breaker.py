@@ -0,0 +1,182 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+import mock
+from neutronclient.common import exceptions as neutron_exceptions
+
+from a10_horizon.dashboard.api import breaker
+from a10_horizon.dashboard.api import executor
+from a10_horizon.dashboard import middleware
+from a10_horizon.tests import test_case
+
+
+class TestCircuitBreaker(test_case.TestCase):
+
+    def setUp(self):
+        self.breaker = breaker.CircuitBreaker("http://neutron.test:9696", failures=2,
+                                              reset_timeout=30)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.failed()
+        self.breaker.succeeded()
+        self.breaker.failed()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.failed()
+        self.assertEqual(breaker.OPEN, self.breaker.state)
+        self.assertFalse(self.breaker.allow())
+        self.assertTrue(self.breaker.is_open())
+
+    def open_and_wait(self):
+        self.breaker.failed()
+        self.breaker.failed()
+        self.breaker.opened_at -= 31
+
+    def test_trial_call_after_reset_timeout(self):
+        self.open_and_wait()
+        self.assertFalse(self.breaker.is_open())
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(breaker.HALF_OPEN, self.breaker.state)
+        self.assertFalse(self.breaker.allow())
+
+    def test_trial_success_closes(self):
+        self.open_and_wait()
+        self.breaker.allow()
+        self.breaker.succeeded()
+        self.assertEqual(breaker.CLOSED, self.breaker.state)
+
+    def test_trial_failure_reopens(self):
+        self.open_and_wait()
+        self.breaker.allow()
+        self.breaker.failed()
+        self.assertFalse(self.breaker.allow())
+
+    def test_cancelled_trial_is_due_again(self):
+        self.open_and_wait()
+        self.breaker.allow()
+        self.breaker.cancelled()
+        self.assertTrue(self.breaker.allow())
+
+
+class GuardedTestCase(test_case.TestCase):
+
+    def setUp(self):
+        executor.context().clear()
+        self.addCleanup(executor.context().clear)
+        self.patch_object(breaker, "_breakers", {})
+        self.patch_object(executor, "CALL_POOL_SIZE", 1)
+        self.patch_object(executor, "_call_pool", None)
+        self.request = test_case.fake_request()
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        self.calls = []
+
+    @property
+    def breaker(self):
+        return breaker.breaker_for(breaker._endpoint(self.request))
+
+
+@breaker.guarded
+def get_thing(request, wait=None, fail=None):
+    if wait is not None:
+        wait.wait()
+    if fail is not None:
+        raise fail
+    return "thing"
+
+
+@breaker.guarded_write
+def delete_thing(request, calls, wait=None):
+    if wait is not None:
+        wait.wait(0.2)
+    calls.append("deleted")
+
+
+class TestGuarded(GuardedTestCase):
+
+    def test_success(self):
+        self.assertEqual("thing", get_thing(self.request))
+        self.assertEqual(breaker.CLOSED, self.breaker.state)
+
+    def test_outages_count_towards_the_breaker(self):
+        self.patch_object(breaker, "BREAKER_FAILURES", 2)
+        for i in range(2):
+            self.assertRaises(neutron_exceptions.ConnectionFailed, get_thing, self.request,
+                              fail=neutron_exceptions.ConnectionFailed())
+        self.assertRaises(breaker.NeutronUnavailable, get_thing, self.request)
+
+    def test_refusals_do_not_count(self):
+        self.assertRaises(neutron_exceptions.NotFound, get_thing, self.request,
+                          fail=neutron_exceptions.NotFound())
+        self.assertEqual(0, self.breaker.consecutive_failures)
+
+    def test_spent_deadline_refuses(self):
+        executor.set_deadline(-1)
+        self.assertRaises(breaker.NeutronUnavailable, get_thing, self.request)
+
+    def test_slow_read_is_abandoned_at_the_deadline(self):
+        executor.set_deadline(0.05)
+        self.assertRaises(breaker.NeutronUnavailable, get_thing, self.request,
+                          wait=self.release)
+        self.assertEqual(1, self.breaker.consecutive_failures)
+
+    def test_full_pool_fails_fast_without_counting(self):
+        executor.set_deadline(0.05)
+        self.assertRaises(breaker.NeutronUnavailable, get_thing, self.request,
+                          wait=self.release)
+        executor.set_deadline(5)
+        start = time.time()
+        with mock.patch.object(executor, "LOG"):
+            self.assertRaises(breaker.NeutronUnavailable, get_thing, self.request)
+        self.assertTrue(time.time() - start < 1)
+        self.assertEqual(1, self.breaker.consecutive_failures)
+
+    def test_writes_are_not_abandoned(self):
+        executor.set_deadline(0.05)
+        delete_thing(self.request, self.calls, wait=self.release)
+        self.assertEqual(["deleted"], self.calls)
+
+    def test_writes_ignore_a_spent_deadline(self):
+        executor.set_deadline(-1)
+        delete_thing(self.request, self.calls)
+        self.assertEqual(["deleted"], self.calls)
+
+    def test_writes_are_refused_while_open(self):
+        self.patch_object(breaker, "BREAKER_FAILURES", 1)
+        self.breaker.failed()
+        self.assertRaises(breaker.NeutronUnavailable, delete_thing, self.request, self.calls)
+        self.assertEqual([], self.calls)
+
+
+class TestApiDeadlineMiddleware(test_case.TestCase):
+
+    def setUp(self):
+        executor.context().clear()
+        self.addCleanup(executor.context().clear)
+        self.middleware = middleware.ApiDeadlineMiddleware()
+
+    def test_reads_get_a_deadline(self):
+        request = RequestFactory().get("/")
+        self.middleware.process_request(request)
+        self.assertIsNotNone(executor.time_left())
+        self.middleware.process_response(request, HttpResponse())
+        self.assertIsNone(executor.time_left())
+
+    def test_posts_do_not(self):
+        self.middleware.process_request(RequestFactory().post("/", {"action": "delete"}))
+        self.assertIsNone(executor.time_left())
@@ -0,0 +1,50 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+from a10_horizon.dashboard.api import executor
+from a10_horizon.dashboard import bulk
+from a10_horizon.tests import test_case
+
+
+class TestDeleteAll(test_case.TestCase):
+
+    def setUp(self):
+        self.messages = self.patch_object(bulk, "messages")
+        self.request = test_case.fake_request()
+
+    def test_summarizes_deletes_and_failures(self):
+        def delete(request, obj_id):
+            if obj_id == "b":
+                raise ValueError("in use")
+
+        deleted, failed = bulk.delete_all(self.request, delete, ["a", "b", "c"], "thing",
+                                          "things")
+        self.assertEqual(["a", "c"], deleted)
+        self.assertEqual(["b"], [x[0] for x in failed])
+        self.assertIn("a, c", self.messages.success.call_args[0][1])
+        self.assertIn("b", self.messages.error.call_args[0][1])
+
+    def test_slow_deletes_are_waited_for(self):
+        self.patch_object(executor, "CALL_TIMEOUT", 0.05)
+
+        def delete(request, obj_id):
+            time.sleep(0.1)
+
+        deleted, failed = bulk.delete_all(self.request, delete, ["a", "b", "c", "d"], "thing",
+                                          "things", limit=2)
+        self.assertEqual(["a", "b", "c", "d"], deleted)
+        self.assertEqual([], failed)
+        self.assertFalse(self.messages.error.called)
@@ -0,0 +1,527 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+
+from django.core.cache import caches
+import mock
+from openstack_dashboard.api import neutron
+
+from neutronclient.common import exceptions as neutron_exceptions
+
+from a10_horizon.dashboard.api import base
+from a10_horizon.dashboard.api import breaker
+from a10_horizon.dashboard.api import cache
+from a10_horizon.dashboard.api import executor
+from a10_horizon.tests import test_case
+
+
+class Wrapper(neutron.NeutronAPIDictWrapper):
+    pass
+
+
+class TestLRUCache(test_case.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        lru = cache.LRUCache(maxsize=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertEqual(1, lru.get("a"))
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(3, lru.get("c"))
+
+    def test_entries_expire(self):
+        lru = cache.LRUCache(ttl=10)
+        lru.set("a", 1)
+        lru.set("b", 2, ttl=100)
+        with mock.patch("time.time", return_value=time.time() + 50):
+            self.assertNotIn("a", lru)
+            self.assertEqual(2, lru.get("b"))
+
+    def test_pop(self):
+        lru = cache.LRUCache()
+        lru.set("a", 1)
+        self.assertEqual(1, lru.pop("a"))
+        self.assertEqual(0, len(lru))
+
+
+class CacheTestCase(test_case.TestCase):
+
+    def setUp(self):
+        self.patch_object(cache, "_results", cache.LocalStore())
+        self.request = test_case.fake_request()
+        self.calls = []
+
+        @cache.cached("things")
+        def list_things(request, **kwargs):
+            self.calls.append(kwargs)
+            return [Wrapper({"id": "1", "name": "one"}), Wrapper({"id": "2", "name": "two"})]
+        self.list_things = list_things
+
+
+class TestCached(CacheTestCase):
+
+    def test_second_call_is_served_from_cache(self):
+        self.list_things(self.request)
+        rv = self.list_things(self.request)
+        self.assertEqual(1, len(self.calls))
+        self.assertEqual(["one", "two"], [x.name for x in rv])
+
+    def test_keyed_on_arguments_and_tenant(self):
+        self.list_things(self.request)
+        self.list_things(self.request, name="one")
+        self.list_things(test_case.fake_request(tenant_id="tenant-2"))
+        self.assertEqual(3, len(self.calls))
+
+    def test_admin_results_are_not_shared(self):
+        self.list_things(self.request)
+        self.list_things(test_case.fake_request(is_superuser=True))
+        self.assertEqual(2, len(self.calls))
+
+    def test_invalidate_refetches(self):
+        self.list_things(self.request)
+        cache.invalidate(self.request, "things")
+        self.list_things(self.request)
+        self.assertEqual(2, len(self.calls))
+
+    def test_invalidate_is_per_tenant(self):
+        other = test_case.fake_request(tenant_id="tenant-2")
+        self.list_things(self.request)
+        self.list_things(other)
+        cache.invalidate(other, "things")
+        self.list_things(self.request)
+        self.assertEqual(2, len(self.calls))
+
+    def test_callers_get_their_own_copy(self):
+        rv = self.list_things(self.request)
+        rv.pop()
+        rv[0].to_dict()["name"] = "changed"
+        rv[0].to_dict()["extra"] = "added"
+
+        again = self.list_things(self.request)
+        self.assertEqual(["one", "two"], [x.name for x in again])
+        self.assertNotIn("extra", again[0].to_dict())
+        self.assertIsInstance(again[0], Wrapper)
+
+    def test_result_returned_on_miss_is_a_copy(self):
+        self.list_things(self.request)[0].to_dict()["name"] = "changed"
+        self.assertEqual("one", self.list_things(self.request)[0].name)
+
+    def test_paged_results_are_copied(self):
+        @cache.cached("pages")
+        def list_page(request, **kwargs):
+            return [{"id": "1", "tags": ["a"]}], True, False
+
+        items, has_more, has_prev = list_page(self.request)
+        items[0]["tags"].append("b")
+        self.assertEqual(([{"id": "1", "tags": ["a"]}], True, False), list_page(self.request))
+
+
+class TestRefresh(CacheTestCase):
+
+    def setUp(self):
+        super(TestRefresh, self).setUp()
+        self.patch_object(cache, "_refreshing", set())
+        self.seen = []
+        self.refreshed = threading.Event()
+
+        @cache.cached("things")
+        def list_things(request, **kwargs):
+            self.seen.append((request, threading.current_thread(), executor.time_left()))
+            if len(self.seen) > 1:
+                self.refreshed.set()
+            return [{"id": str(len(self.seen))}]
+        self.list_things = list_things
+
+        self.list_things(self.request)
+        self.patch("time.time", return_value=time.time() + cache.API_CACHE_TTL + 1)
+
+    def test_expired_result_is_served_while_refreshed(self):
+        self.assertEqual([{"id": "1"}], self.list_things(self.request))
+        self.assertTrue(self.refreshed.wait(5))
+        for i in range(50):
+            if self.list_things(self.request) == [{"id": "2"}]:
+                break
+            time.sleep(0.01)
+        self.assertEqual([{"id": "2"}], self.list_things(self.request))
+
+    def test_refresh_runs_on_its_own_pool_without_the_request(self):
+        self.list_things(self.request)
+        self.assertTrue(self.refreshed.wait(5))
+        request, thread, time_left = self.seen[1]
+        self.assertIsNot(self.request, request)
+        self.assertIsInstance(request, base.DetachedRequest)
+        self.assertEqual("tenant-1", request.user.tenant_id)
+        self.assertNotEqual(threading.current_thread(), thread)
+        self.assertNotIn(thread, executor.get_pool()._pool)
+
+    def test_refresh_has_a_deadline(self):
+        self.list_things(self.request)
+        self.assertTrue(self.refreshed.wait(5))
+        time_left = self.seen[1][2]
+        self.assertIsNotNone(time_left)
+        self.assertLessEqual(time_left, cache.API_CACHE_REFRESH_TIMEOUT)
+
+    def test_only_one_refresh_at_a_time(self):
+        with mock.patch.object(cache, "_get_refresh_pool") as get_pool:
+            self.list_things(self.request)
+            self.list_things(self.request)
+        self.assertEqual(1, get_pool.return_value.apply_async.call_count)
+
+    def test_no_refresh_while_the_refresh_pool_is_busy(self):
+        self.patch_object(cache, "_refreshing", set(range(cache.API_CACHE_REFRESH_POOL_SIZE)))
+        with mock.patch.object(cache, "_get_refresh_pool") as get_pool:
+            self.assertEqual([{"id": "1"}], self.list_things(self.request))
+        self.assertFalse(get_pool.called)
+
+
+class TestOutage(CacheTestCase):
+
+    def setUp(self):
+        super(TestOutage, self).setUp()
+        self.patch_object(cache, "_refreshing", set())
+        self.error = None
+
+        @cache.cached("things")
+        def list_things(request, **kwargs):
+            self.calls.append(kwargs)
+            if self.error is not None:
+                raise self.error
+            return [{"id": str(len(self.calls))}]
+        self.list_things = list_things
+
+        self.list_things(self.request)
+
+    def _fail(self, ex):
+        self.error = ex
+        cache.invalidate(self.request, "things")
+        return self.list_things(self.request)
+
+    def test_outage_serves_the_last_good_copy(self):
+        rv = self._fail(neutron_exceptions.ConnectionFailed())
+        self.assertEqual([{"id": "1"}], rv)
+        self.assertIsInstance(rv, cache.StaleList)
+        self.assertIsNotNone(cache.stale_since(self.request))
+        self.assertEqual(rv.stale_since, cache.stale_since(self.request))
+
+    def test_open_breaker_serves_the_last_good_copy(self):
+        self.assertEqual([{"id": "1"}], self._fail(breaker.NeutronUnavailable()))
+        self.assertIsNotNone(cache.stale_since(self.request))
+
+    def test_other_errors_are_raised(self):
+        for ex in (neutron_exceptions.NotFound(), ValueError("bad")):
+            self.assertRaises(type(ex), self._fail, ex)
+        self.assertIsNone(cache.stale_since(self.request))
+
+    def test_outage_without_a_copy_is_raised(self):
+        self.error = neutron_exceptions.ConnectionFailed()
+        self.assertRaises(neutron_exceptions.ConnectionFailed,
+                          self.list_things, self.request, name="other")
+
+
+class TestRefreshBackoff(CacheTestCase):
+
+    def setUp(self):
+        super(TestRefreshBackoff, self).setUp()
+        self.patch_object(cache, "_refreshing", set())
+        self.list_things(self.request)
+        self.now = time.time() + cache.API_CACHE_TTL + 1
+        self.patch("time.time", side_effect=lambda: self.now)
+        self.get_pool = self.patch_object(cache, "_get_refresh_pool")
+
+    def _refresh_fails(self):
+        self.list_things(self.request)
+        refresh, args = self.get_pool.return_value.apply_async.call_args[0]
+        self.get_pool.reset_mock()
+        with mock.patch.object(cache, "LOG"):
+            refresh(mock.Mock(side_effect=neutron_exceptions.ConnectionFailed(),
+                              __name__="list_things"), *args[1:])
+
+    def test_failed_refresh_is_not_retried_until_the_backoff_passes(self):
+        self._refresh_fails()
+        self.list_things(self.request)
+        self.assertFalse(self.get_pool.called)
+
+        self.now += cache.API_CACHE_REFRESH_BACKOFF + 1
+        self.list_things(self.request)
+        self.assertEqual(1, self.get_pool.return_value.apply_async.call_count)
+
+    def test_copy_served_after_a_failed_refresh_is_stale(self):
+        request = test_case.fake_request()
+        self.list_things(request)
+        self.assertIsNone(cache.stale_since(request))
+        self._refresh_fails()
+        rv = self.list_things(request)
+        self.assertEqual(["one", "two"], [x.name for x in rv])
+        self.assertEqual(rv.stale_since, cache.stale_since(request))
+
+
+class TestDjangoStore(CacheTestCase):
+    """Two stores on one cache alias, as two Horizon processes would have"""
+
+    def setUp(self):
+        super(TestDjangoStore, self).setUp()
+        caches["shared"].clear()
+        self.workers = (cache.DjangoStore("shared"), cache.DjangoStore("shared"))
+
+    def _in(self, worker, fn, *args, **kwargs):
+        with mock.patch.object(cache, "_results", self.workers[worker]):
+            return fn(*args, **kwargs)
+
+    def test_results_are_shared(self):
+        self._in(0, self.list_things, self.request)
+        rv = self._in(1, self.list_things, self.request)
+        self.assertEqual(1, len(self.calls))
+        self.assertEqual(["one", "two"], [x.name for x in rv])
+
+    def test_write_in_one_worker_invalidates_all(self):
+        self._in(0, self.list_things, self.request)
+        self._in(1, self.list_things, self.request)
+        self._in(1, cache.invalidate, self.request, "things")
+        self._in(0, self.list_things, self.request)
+        self._in(1, self.list_things, self.request)
+        self.assertEqual(2, len(self.calls))
+
+    def _round_trip(self, value):
+        entry = cache._Entry(value, 1)
+        self.workers[0].set(("key",), entry)
+        return self.workers[1].get(("key",)).value
+
+    def test_wrappers_round_trip(self):
+        rv = self._round_trip([Wrapper({"id": "1", "name": "one"})])
+        self.assertIsInstance(rv[0], Wrapper)
+        self.assertEqual({"id": "1", "name": "one"}, rv[0].to_dict())
+        self.assertEqual("json", cache._dump([Wrapper({"id": "1"})])[0])
+
+    def test_paged_results_round_trip(self):
+        rv = self._round_trip(([Wrapper({"id": "1"})], True, False))
+        self.assertIsInstance(rv, tuple)
+        items, has_more, has_prev = rv
+        self.assertEqual([{"id": "1"}], [x.to_dict() for x in items])
+        self.assertEqual((True, False), (has_more, has_prev))
+        self.assertEqual(([{"id": "1"}], False, True),
+                         self._round_trip(([{"id": "1"}], False, True)))
+
+    def test_other_results_are_stored_raw(self):
+        for value in (["a", "b"],
+                      [{"id": "1"}, Wrapper({"id": "2"})],
+                      [{"id": "1", "when": object}]):
+            self.assertEqual("raw", cache._dump(value)[0])
+        self.assertEqual(["a", "b"], self._round_trip(["a", "b"]))
+
+    def test_empty_results_round_trip(self):
+        self.assertEqual([], self._round_trip([]))
+        self.assertEqual(([], False, False), self._round_trip(([], False, False)))
+
+    def test_evicted_version_is_reseeded_past_old_results(self):
+        first = self.workers[0].version("tenant-1", "things")
+        self.workers[0].bump("tenant-1", "things")
+        self.workers[0].bump("tenant-1", "things")
+        seen = set(range(first, first + 3))
+
+        caches["shared"].delete(self.workers[0]._version_key("tenant-1", "things"))
+        with mock.patch("time.time", return_value=time.time() + 1):
+            version = self.workers[1].version("tenant-1", "things")
+        self.assertNotIn(version, seen)
+        self.assertEqual(version, self.workers[0].version("tenant-1", "things"))
+
+    def test_bump_after_eviction_reseeds(self):
+        first = self.workers[0].version("tenant-1", "things")
+        caches["shared"].delete(self.workers[0]._version_key("tenant-1", "things"))
+        with mock.patch("time.time", return_value=time.time() + 1):
+            self.workers[1].bump("tenant-1", "things")
+        self.assertGreater(self.workers[0].version("tenant-1", "things"), first)
+
+    def test_results_from_before_an_eviction_are_not_served(self):
+        self._in(0, self.list_things, self.request)
+        caches["shared"].delete(self.workers[0]._version_key("tenant-1", "things"))
+        with mock.patch("time.time", return_value=time.time() + 1):
+            self._in(1, self.list_things, self.request)
+        self.assertEqual(2, len(self.calls))
+
+
+class TestSingleFlight(CacheTestCase):
+
+    key = ("tenant-1", False, "things", "list_things", ())
+
+    def setUp(self):
+        super(TestSingleFlight, self).setUp()
+        self.patch_object(cache, "_flights", {})
+        self.fn = mock.Mock(return_value=[{"id": "1"}], __name__="list_things")
+
+    def _in_flight(self, value=None, error=None):
+        flight = cache._Flight()
+        flight.value = value
+        flight.error = error
+        flight.done.set()
+        cache._flights[(self.key, 0)] = flight
+        return flight
+
+    def _call(self):
+        return cache._call_once(self.fn, self.request, {}, self.key, 0)
+
+    def test_identical_calls_share_one(self):
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def slow(request):
+            started.set()
+            release.wait(5)
+            return [{"id": "1"}]
+        self.fn.side_effect = slow
+
+        def call():
+            results.append(self._call())
+
+        threads = [threading.Thread(target=call) for i in range(4)]
+        threads[0].start()
+        self.assertTrue(started.wait(5))
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(1, self.fn.call_count)
+        self.assertEqual([[{"id": "1"}]] * 4, results)
+        self.assertEqual({}, cache._flights)
+
+    def test_follower_shares_the_result(self):
+        self._in_flight(value=[{"id": "2"}])
+        self.assertEqual([{"id": "2"}], self._call())
+        self.assertFalse(self.fn.called)
+
+    def test_follower_shares_the_error(self):
+        error = neutron_exceptions.ConnectionFailed()
+        self._in_flight(error=error)
+        with self.assertRaises(neutron_exceptions.ConnectionFailed) as raised:
+            self._call()
+        self.assertIs(error, raised.exception)
+        self.assertFalse(self.fn.called)
+
+    def test_follower_retries_a_refused_call(self):
+        flight = self._in_flight(error=breaker.NeutronUnavailable())
+        # The leader is done with the flight by the time its followers wake
+        with mock.patch.object(flight.done, "wait",
+                               side_effect=lambda timeout: cache._flights.clear() or True):
+            self.assertEqual([{"id": "1"}], self._call())
+        self.assertEqual(1, self.fn.call_count)
+
+    def test_follower_that_times_out_calls_itself(self):
+        flight = self._in_flight()
+        flight.done.clear()
+        self.patch_object(cache, "API_CACHE_WAIT", 0.01)
+        self.assertEqual([{"id": "1"}], self._call())
+        self.assertEqual(1, self.fn.call_count)
+
+
+class LockedStore(cache.LocalStore):
+    """A LocalStore whose lock another process holds for ``held`` checks"""
+
+    def __init__(self, held):
+        super(LockedStore, self).__init__()
+        self.held = held
+
+    def lock(self, key, version):
+        return False
+
+    def locked(self, key, version):
+        self.held -= 1
+        return self.held >= 0
+
+
+class TestCrossProcessLock(CacheTestCase):
+
+    key = ("tenant-1", False, "things", "list_things", ())
+
+    def setUp(self):
+        super(TestCrossProcessLock, self).setUp()
+        self.patch_object(cache, "API_CACHE_LOCK", True)
+        self.patch("time.sleep")
+        self.fn = mock.Mock(return_value=[{"id": "1"}], __name__="list_things")
+
+    def _fetch(self):
+        return cache._fetch(self.fn, self.request, {}, self.key, 0)
+
+    def test_lock_is_released_after_the_call(self):
+        store = self.patch_object(cache, "_results", mock.Mock(wraps=cache.LocalStore()))
+        self.assertEqual([{"id": "1"}], self._fetch())
+        store.lock.assert_called_once_with(self.key, 0)
+        store.unlock.assert_called_once_with(self.key, 0)
+
+    def test_lock_is_released_after_a_failure(self):
+        store = self.patch_object(cache, "_results", mock.Mock(wraps=cache.LocalStore()))
+        self.fn.side_effect = ValueError()
+        self.assertRaises(ValueError, self._fetch)
+        store.unlock.assert_called_once_with(self.key, 0)
+
+    def test_waits_for_the_other_process(self):
+        store = self.patch_object(cache, "_results", LockedStore(held=3))
+
+        def other_process(key, version):
+            if store.held == 0:
+                cache._save(key, version, [{"id": "2"}])
+            return LockedStore.locked(store, key, version)
+        self.patch_object(store, "locked", side_effect=other_process)
+
+        self.assertEqual([{"id": "2"}], self._fetch())
+        self.assertFalse(self.fn.called)
+
+    def test_calls_itself_when_the_other_process_fails(self):
+        self.patch_object(cache, "_results", LockedStore(held=3))
+        self.assertEqual([{"id": "1"}], self._fetch())
+        self.assertEqual(1, self.fn.call_count)
+
+    def test_calls_itself_when_the_wait_runs_out(self):
+        self.patch_object(cache, "_results", LockedStore(held=10 ** 6))
+        self.patch_object(cache, "API_CACHE_WAIT", 0.05)
+        self.assertEqual([{"id": "1"}], self._fetch())
+        self.assertEqual(1, self.fn.call_count)
+
+    def test_ignores_a_failed_result_from_the_other_process(self):
+        store = self.patch_object(cache, "_results", LockedStore(held=1))
+        cache._save(self.key, 0, [{"id": "2"}])
+        store.mark_failed(self.key)
+        self.assertEqual([{"id": "1"}], self._fetch())
+
+
+class TestRequestCached(test_case.TestCase):
+
+    def setUp(self):
+        self.request = test_case.fake_request()
+        self.calls = []
+
+        @cache.request_cached("thing")
+        def get_thing(request, id, **kwargs):
+            self.calls.append(id)
+            return {"id": id}
+        self.get_thing = get_thing
+
+    def test_get_is_memoized_for_the_request(self):
+        self.get_thing(self.request, "1")
+        self.get_thing(self.request, "1")
+        self.get_thing(self.request, "2")
+        self.get_thing(test_case.fake_request(), "1")
+        self.assertEqual(["1", "2", "1"], self.calls)
+
+    def test_forget(self):
+        self.get_thing(self.request, "1")
+        cache.forget(self.request, "thing", "1")
+        self.get_thing(self.request, "1")
+        self.assertEqual(["1", "1"], self.calls)
@@ -0,0 +1,114 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+from django import http
+from django.test import client
+
+from a10_horizon.dashboard.api import base
+from a10_horizon.dashboard import choices
+from a10_horizon.tests import test_case
+
+
+class FakeCollection(object):
+    """A neutron list call over ``count`` objects, honouring limit/marker and filters"""
+
+    def __init__(self, count):
+        self.objs = [{"id": "%04d" % i, "name": "alarm-%d" % i} for i in range(count)]
+        self.calls = []
+
+    def list(self, request, paginate=False, **kwargs):
+        self.calls.append(kwargs)
+        return base.paged_list(request, self._list_call, "alarms", **kwargs)
+
+    def _list_call(self, retrieve_all=True, limit=None, marker=None, sort_key=None,
+                   sort_dir="desc", fields=None, tenant_id=None, name=None):
+        objs = sorted(self.objs, key=lambda x: x["id"], reverse=(sort_dir == "desc"))
+        if name is not None:
+            objs = [x for x in objs if x["name"] == name]
+        if marker is not None:
+            ids = [x["id"] for x in objs]
+            objs = objs[ids.index(marker) + 1:]
+        yield {"alarms": objs[:limit]}
+
+
+class TestSearchPages(test_case.TestCase):
+
+    def setUp(self):
+        self.request = test_case.fake_request()
+        self.collection = FakeCollection(50)
+
+    def _search(self, term, limit=5, page_size=10, max_pages=3):
+        return choices.search_pages(self.request, self.collection.list, term, limit,
+                                    page_size=page_size, max_pages=max_pages)
+
+    def test_stops_once_there_are_enough_matches(self):
+        rv = self._search("alarm")
+        self.assertEqual(5, len(rv))
+        self.assertEqual(2, len(self.collection.calls))
+        self.assertEqual(5, self.collection.calls[0]["page_size"])
+
+    def test_pages_are_limited(self):
+        self._search("alarm", limit=100)
+        pages = [x for x in self.collection.calls if "name" not in x]
+        self.assertEqual(3, len(pages))
+        self.assertTrue(all(x["page_size"] == 10 for x in pages))
+
+    def test_exact_name_found_past_the_pages_read(self):
+        rv = self._search("alarm-1", max_pages=1)
+        self.assertEqual({"id": "0001", "name": "alarm-1"}, rv[0])
+        self.assertEqual(1, len([x for x in rv if x["id"] == "0001"]))
+
+    def test_walks_pages_by_marker(self):
+        rv = self._search("alarm-2", limit=20, max_pages=5)
+        self.assertEqual(["0002", "0029", "0028", "0027", "0026", "0025", "0024", "0023",
+                          "0022", "0021", "0020"], [x["id"] for x in rv])
+        markers = [x.get("marker") for x in self.collection.calls if "name" not in x]
+        self.assertEqual([None, "0040", "0030", "0020", "0010"], markers)
+
+    def test_empty_term_lists_first_page(self):
+        rv = self._search("")
+        self.assertEqual(["0049", "0048", "0047", "0046", "0045"], [x["id"] for x in rv])
+        self.assertEqual(1, len(self.collection.calls))
+
+    def test_only_id_and_name_are_asked_for(self):
+        self._search("alarm")
+        for call in self.collection.calls:
+            self.assertEqual(choices.CHOICE_FIELDS, call["fields"])
+            self.assertEqual("tenant-1", call["tenant_id"])
+
+
+class TestChoicesView(test_case.TestCase):
+
+    def setUp(self):
+        self.collection = FakeCollection(50)
+
+        class View(choices.ChoicesView):
+            providers = {"alarm": self.collection.list}
+        self.view = View.as_view()
+
+    def _get(self, resource, **params):
+        request = client.RequestFactory().get("/", params)
+        request.user = test_case.fake_request().user
+        return self.view(request, resource=resource)
+
+    def test_matches(self):
+        rv = self._get("alarm", q="alarm-3")
+        self.assertEqual(200, rv.status_code)
+        ids = [x["id"] for x in json.loads(rv.content.decode("utf-8"))]
+        self.assertEqual(["0003"] + ["%04d" % i for i in range(39, 29, -1)], ids)
+
+    def test_unknown_resource(self):
+        self.assertRaises(http.Http404, self._get, "nope", q="x")
@@ -0,0 +1,199 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+
+from a10_horizon.dashboard.api import executor
+from a10_horizon.tests import test_case
+
+
+class ExecutorTestCase(test_case.TestCase):
+
+    def setUp(self):
+        executor.context().clear()
+        self.addCleanup(executor.context().clear)
+
+
+class TestDeadline(ExecutorTestCase):
+
+    def test_no_deadline(self):
+        self.assertIsNone(executor.time_left())
+
+    def test_time_left(self):
+        executor.set_deadline(5)
+        self.assertTrue(4 < executor.time_left() <= 5)
+
+    def test_spent_deadline_is_zero(self):
+        executor.set_deadline(-1)
+        self.assertEqual(0, executor.time_left())
+
+    def test_deadline_is_per_thread(self):
+        executor.set_deadline(5)
+        seen = []
+        t = threading.Thread(target=lambda: seen.append(executor.time_left()))
+        t.start()
+        t.join()
+        self.assertEqual([None], seen)
+
+
+class TestGather(ExecutorTestCase):
+
+    def test_results_and_errors(self):
+        def fail():
+            raise ValueError("boom")
+
+        rv = executor.gather({"a": lambda: 1, "b": fail})
+        self.assertEqual((1, None), rv["a"])
+        self.assertIsNone(rv["b"][0])
+        self.assertIsInstance(rv["b"][1], ValueError)
+
+    def test_runs_concurrently(self):
+        barrier = threading.Event()
+
+        def first():
+            return barrier.wait(5)
+
+        def second():
+            barrier.set()
+            return True
+
+        rv = executor.gather({"first": first, "second": second})
+        self.assertEqual((True, None), rv["first"])
+
+    def test_slow_call_times_out(self):
+        rv = executor.gather({"slow": lambda: time.sleep(1), "fast": lambda: 1}, timeout=0.1)
+        self.assertIsInstance(rv["slow"][1], executor.CallTimeout)
+        self.assertEqual((1, None), rv["fast"])
+
+    def test_pool_threads_see_the_deadline(self):
+        executor.set_deadline(5)
+        rv = executor.gather({"a": executor.time_left, "b": executor.time_left})
+        self.assertTrue(rv["a"][0] > 4)
+
+    def test_nested_gather_runs_inline(self):
+        def outer():
+            inner = executor.gather({"x": threading.current_thread,
+                                     "y": threading.current_thread})
+            return threading.current_thread(), inner
+
+        rv = executor.gather({"a": outer, "b": lambda: 1})
+        me, inner = rv["a"][0]
+        self.assertIs(me, inner["x"][0])
+        self.assertIs(me, inner["y"][0])
+
+
+class TestRunEach(ExecutorTestCase):
+
+    def test_results_in_order(self):
+        rv = executor.run_each(lambda x: x * 2, [1, 2, 3], limit=2)
+        self.assertEqual([(1, 2, None), (2, 4, None), (3, 6, None)], rv)
+
+    def test_limit_bounds_calls_in_flight(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def fn(item):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+
+        executor.run_each(fn, range(8), limit=2)
+        self.assertEqual(2, state["peak"])
+
+    def test_items_without_a_slot_in_time_are_not_called(self):
+        called = []
+
+        def fn(item):
+            called.append(item)
+            time.sleep(0.5)
+
+        rv = executor.run_each(fn, ["a", "b", "c", "d"], limit=2, timeout=0.1)
+        self.assertEqual(["a", "b", "c", "d"], [x[0] for x in rv])
+        for item, result, ex in rv:
+            self.assertIsInstance(ex, executor.CallTimeout)
+        self.assertEqual(["a", "b"], sorted(called))
+
+    def test_items_are_not_started_past_the_deadline(self):
+        executor.set_deadline(0.1)
+        called = []
+
+        def fn(item):
+            called.append(item)
+            time.sleep(0.3)
+
+        rv = executor.run_each(fn, range(6), limit=2)
+        self.assertEqual(6, len(rv))
+        self.assertEqual(2, len(called))
+        self.assertTrue(all(isinstance(x[2], executor.CallTimeout) for x in rv))
+
+    def test_without_abandon_every_item_is_waited_for(self):
+        executor.set_deadline(0.05)
+
+        def fn(item):
+            time.sleep(0.1)
+            return item
+
+        rv = executor.run_each(fn, range(4), limit=2, timeout=0.05, abandon=False)
+        self.assertEqual([(i, i, None) for i in range(4)], rv)
+
+
+class TestSubmit(ExecutorTestCase):
+
+    def test_runs_outside_the_callers_context(self):
+        executor.set_deadline(5)
+        executor.context()["marker"] = True
+        rv = executor.submit(lambda: (executor.time_left(), "marker" in executor.context()))
+        self.assertEqual(((None, False), None), rv.get(5))
+
+
+class TestCall(ExecutorTestCase):
+
+    def setUp(self):
+        super(TestCall, self).setUp()
+        self.patch_object(executor, "CALL_POOL_SIZE", 1)
+        self.patch_object(executor, "_call_pool", None)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def test_runs_inline_without_a_timeout(self):
+        rv = executor.call(threading.current_thread)
+        self.assertEqual((threading.current_thread(), None), rv)
+
+    def test_result_and_context(self):
+        executor.context()["a"] = 1
+        rv = executor.call(lambda: executor.context().get("a"), timeout=5)
+        self.assertEqual((1, None), rv)
+
+    def test_slow_call_is_abandoned(self):
+        rv, ex = executor.call(self.release.wait, timeout=0.05, name="slow")
+        self.assertIsInstance(ex, executor.CallTimeout)
+
+    def test_full_pool_fails_fast(self):
+        executor.call(self.release.wait, timeout=0.05)
+        start = time.time()
+        calls = []
+        rv, ex = executor.call(lambda: calls.append(1), timeout=5)
+        self.assertIsInstance(ex, executor.PoolExhausted)
+        self.assertEqual([], calls)
+        self.assertTrue(time.time() - start < 1)
+
+    def test_abandoned_call_frees_its_thread_when_done(self):
+        executor.call(self.release.wait, timeout=0.05)
+        self.release.set()
+        time.sleep(0.05)
+        self.assertEqual((2, None), executor.call(lambda: 2, timeout=5))
@@ -0,0 +1,231 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import imp
+import io
+import json
+import os
+import shutil
+import tempfile
+
+import mock
+
+from a10_horizon.tests import test_case
+
+fake_neutron = imp.load_source("fake_neutron", os.path.join(test_case.TOOLS, "fake_neutron.py"))
+
+
+def plan(seed=42, **rule):
+    return fake_neutron.FaultPlan({"default": rule}, seed=seed)
+
+
+class TestLatency(test_case.TestCase):
+
+    def _samples(self, spec, n=2000):
+        p = plan()
+        return sorted(p._latency(spec) for i in range(n))
+
+    def test_fixed(self):
+        self.assertEqual(0.0, plan()._latency(None))
+        self.assertEqual(0.25, plan()._latency(0.25))
+        self.assertEqual(0.5, plan()._latency({"dist": "fixed", "value": 0.5}))
+
+    def test_uniform(self):
+        samples = self._samples({"dist": "uniform", "min": 0.1, "max": 0.3})
+        self.assertGreaterEqual(samples[0], 0.1)
+        self.assertLessEqual(samples[-1], 0.3)
+        self.assertAlmostEqual(0.2, sum(samples) / len(samples), delta=0.01)
+
+    def test_lognormal(self):
+        samples = self._samples({"dist": "lognormal", "median": 0.2, "sigma": 0.8})
+        self.assertAlmostEqual(0.2, samples[len(samples) // 2], delta=0.02)
+        # A long tail: the slowest are several times the median
+        self.assertGreater(samples[-1], 1.0)
+
+    def test_exponential(self):
+        samples = self._samples({"dist": "exponential", "mean": 0.05})
+        self.assertAlmostEqual(0.05, sum(samples) / len(samples), delta=0.005)
+
+    def test_max_caps_the_tail(self):
+        samples = self._samples({"dist": "lognormal", "median": 0.2, "sigma": 2.0, "max": 1.0})
+        self.assertEqual(1.0, samples[-1])
+
+    def test_seed_repeats_the_run(self):
+        spec = {"dist": "exponential", "mean": 0.05}
+        self.assertEqual(self._samples(spec, 20), self._samples(spec, 20))
+
+    def test_unknown_distribution(self):
+        self.assertRaises(ValueError, plan()._latency, {"dist": "pareto"})
+
+
+class TestFaults(test_case.TestCase):
+
+    def setUp(self):
+        self.sleep = self.patch("time.sleep")
+
+    def _statuses(self, p, n, resource="vips"):
+        rv = []
+        for i in range(n):
+            try:
+                p.before(resource)
+                rv.append(200)
+            except fake_neutron.Fault as ex:
+                rv.append(ex.status)
+        return rv
+
+    def test_latency_is_slept(self):
+        plan(latency=0.25).before("vips")
+        self.sleep.assert_called_once_with(0.25)
+
+    def test_burst_fails_length_requests_in_a_row(self):
+        p = plan(burst={"rate": 1.0, "length": 3, "status": 502})
+        self.assertEqual([502], self._statuses(p, 1))
+        p.default["burst"]["rate"] = 0
+        self.assertEqual([502, 502, 200, 200], self._statuses(p, 4))
+
+    def test_bursts_are_per_resource(self):
+        p = plan(burst={"rate": 1.0, "length": 3})
+        self._statuses(p, 1)
+        p.default["burst"]["rate"] = 0
+        self.assertEqual([200], self._statuses(p, 1, resource="certificates"))
+        self.assertEqual([503, 503], self._statuses(p, 2))
+
+    def test_burst_rate(self):
+        p = plan(burst={"rate": 0.1, "length": 1})
+        failed = self._statuses(p, 2000).count(503)
+        self.assertAlmostEqual(200, failed, delta=40)
+
+    def test_timeout_hangs_then_answers_504(self):
+        p = plan(timeout={"rate": 1.0, "seconds": 30})
+        self.assertEqual([504], self._statuses(p, 1))
+        self.sleep.assert_called_once_with(30)
+
+    def test_error_rate(self):
+        p = plan(error_rate=0.25, error_status=500)
+        statuses = self._statuses(p, 2000)
+        self.assertEqual(set([200, 500]), set(statuses))
+        self.assertAlmostEqual(500, statuses.count(500), delta=60)
+
+    def test_resource_rules_override_the_default(self):
+        p = fake_neutron.FaultPlan({"default": {"error_rate": 1.0, "error_status": 503},
+                                    "resources": {"extensions": {"error_rate": 0.0}}}, seed=1)
+        self.assertEqual([200], self._statuses(p, 1, resource="extensions"))
+        self.assertEqual([503], self._statuses(p, 1))
+
+    def test_timeout_through_the_app(self):
+        app = fake_neutron.FakeNeutron(faults=plan(timeout={"rate": 1.0, "seconds": 30}))
+        start_response = mock.Mock()
+        body = b"".join(app({"REQUEST_METHOD": "GET", "PATH_INFO": "/v2.0/vips"},
+                            start_response))
+        self.assertEqual("504 Gateway Timeout", start_response.call_args[0][0])
+        self.assertEqual("Injected timeout",
+                         json.loads(body.decode("utf-8"))["NeutronError"]["message"])
+
+
+class TestDrip(test_case.TestCase):
+
+    def setUp(self):
+        self.sleep = self.patch("time.sleep")
+
+    def test_body_is_sent_in_chunks(self):
+        p = plan(drip={"rate": 1.0, "chunk": 4, "interval": 0.1})
+        self.assertEqual([b"abcd", b"efgh", b"ij"], list(p.deliver("vips", b"abcdefghij")))
+        self.assertEqual([mock.call(0.1)] * 2, self.sleep.call_args_list)
+
+    def test_without_drip_the_body_is_sent_whole(self):
+        self.assertEqual([b"abc"], plan().deliver("vips", b"abc"))
+        self.assertEqual([b"abc"], plan(drip={"rate": 0.0}).deliver("vips", b"abc"))
+        self.assertEqual([b""], plan(drip={"rate": 1.0}).deliver("vips", b""))
+
+
+class TestLoadFaults(test_case.TestCase):
+
+    def test_no_profile(self):
+        self.assertIsNone(fake_neutron.load_faults(None))
+        self.assertIsNone(fake_neutron.load_faults("none"))
+
+    def test_named_profile(self):
+        p = fake_neutron.load_faults("flaky", seed=0)
+        self.assertIsInstance(p, fake_neutron.FaultPlan)
+        self.assertEqual(0.05, p.rule_for("vips")["error_rate"])
+
+    def test_profile_from_a_file(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, "faults.json")
+        with open(path, "w") as f:
+            json.dump({"default": {"latency": 0.1},
+                       "resources": {"vips": {"error_rate": 1.0}}}, f)
+        p = fake_neutron.load_faults(path)
+        self.assertEqual({"latency": 0.1, "error_rate": 1.0}, p.rule_for("vips"))
+        self.assertEqual({"latency": 0.1}, p.rule_for("certificates"))
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError) as raised:
+            fake_neutron.load_faults("no-such-profile")
+        self.assertIn("degraded", str(raised.exception))
+
+    def test_profile_from_the_environment(self):
+        with mock.patch.dict(os.environ, {fake_neutron.ENV_FAULTS: "outage"}):
+            p = fake_neutron.faults_from_env()
+        self.assertEqual(503, p.rule_for("vips")["error_status"])
+
+
+class TestTenants(test_case.TestCase):
+
+    def setUp(self):
+        store = fake_neutron.Store()
+        store.seed("tenant-1", 2)
+        store.seed("tenant-2", 3)
+        self.app = fake_neutron.FakeNeutron(store, default_tenant="tenant-2",
+                                            tokens={"token-1": "tenant-1"})
+        self.other_id = [x["id"] for x in store.list("vips") if x["tenant_id"] == "tenant-2"][0]
+
+    def _call(self, method, path, token="token-1", body=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        environ = {"REQUEST_METHOD": method, "PATH_INFO": "/v2.0/" + path,
+                   "CONTENT_LENGTH": str(len(payload)), "wsgi.input": io.BytesIO(payload)}
+        if token is not None:
+            environ["HTTP_X_AUTH_TOKEN"] = token
+        start_response = mock.Mock()
+        rv = b"".join(self.app(environ, start_response))
+        status = int(start_response.call_args[0][0].split()[0])
+        return status, json.loads(rv.decode("utf-8")) if rv else None
+
+    def test_lists_show_the_tokens_project(self):
+        status, body = self._call("GET", "vips")
+        self.assertEqual(200, status)
+        self.assertEqual(["tenant-1"] * 2, [x["tenant_id"] for x in body["vips"]])
+
+    def test_without_a_token_the_default_tenant(self):
+        status, body = self._call("GET", "vips", token=None)
+        self.assertEqual(["tenant-2"] * 3, [x["tenant_id"] for x in body["vips"]])
+
+    def test_added_token(self):
+        self.app.add_token("token-2", "tenant-1")
+        status, body = self._call("GET", "vips", token="token-2")
+        self.assertEqual(2, len(body["vips"]))
+
+    def test_other_projects_objects_are_not_found(self):
+        self.assertEqual(200, self._call("GET", "vips/" + self.other_id, token=None)[0])
+        self.assertEqual(404, self._call("GET", "vips/" + self.other_id)[0])
+        self.assertEqual(404, self._call("PUT", "vips/" + self.other_id,
+                                         body={"vip": {"name": "mine"}})[0])
+        self.assertEqual(404, self._call("DELETE", "vips/" + self.other_id)[0])
+        self.assertEqual(200, self._call("GET", "vips/" + self.other_id, token=None)[0])
+
+    def test_create_is_in_the_tokens_project(self):
+        status, body = self._call("POST", "vips", body={"vip": {"name": "new"}})
+        self.assertEqual(201, status)
+        self.assertEqual("tenant-1", body["vip"]["tenant_id"])
@@ -0,0 +1,174 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import time
+
+from django import http
+from django.test import RequestFactory
+
+from a10_horizon.dashboard.a10networks.a10appliances import appliance_jobs
+from a10_horizon.dashboard.a10networks.a10appliances import workflows
+from a10_horizon.dashboard.api import base
+from a10_horizon.dashboard.api import executor
+from a10_horizon.dashboard import jobs
+from a10_horizon.tests import test_case
+
+
+def _wait(job_id):
+    for i in range(500):
+        job = jobs.get(job_id)
+        if job["status"] not in jobs.ACTIVE:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("Job %s did not finish" % job_id)
+
+
+class TestSubmit(test_case.TestCase):
+
+    def setUp(self):
+        self.request = test_case.fake_request()
+
+    def test_runs_with_a_detached_request(self):
+        seen = []
+
+        def fn(request, progress):
+            progress("working")
+            seen.append(request)
+            return "result"
+
+        job = jobs.submit(self.request, "thing", fn, object_id="t1")
+        self.assertEqual(jobs.QUEUED, job["status"])
+
+        job = _wait(job["id"])
+        self.assertEqual(jobs.DONE, job["status"])
+        self.assertEqual("working", job["step"])
+        self.assertEqual("result", job["result"])
+        self.assertIsInstance(seen[0], base.DetachedRequest)
+        self.assertEqual(self.request.user.token, seen[0].user.token)
+        self.assertEqual("tenant-1", seen[0].user.tenant_id)
+        self.assertEqual(job, jobs.for_object("thing", "t1"))
+
+    def test_failure_is_recorded(self):
+        def fn(request, progress):
+            raise ValueError("boom")
+
+        job = _wait(jobs.submit(self.request, "thing", fn)["id"])
+        self.assertEqual(jobs.FAILED, job["status"])
+        self.assertEqual("boom", job["error"])
+
+    def test_jobs_start_without_a_deadline(self):
+        def set_deadline(request, progress):
+            executor.set_deadline(0)
+
+        def time_left(request, progress):
+            return executor.time_left()
+
+        for i in range(jobs.JOB_POOL_SIZE):
+            _wait(jobs.submit(self.request, "thing", set_deadline)["id"])
+        job = _wait(jobs.submit(self.request, "thing", time_left)["id"])
+        self.assertIsNone(job["result"])
+
+
+class TestApplianceDelete(test_case.TestCase):
+
+    def setUp(self):
+        self.request = test_case.fake_request()
+        self.get = self.patch("a10_horizon.dashboard.api.a10devices.get_a10_appliance",
+                              return_value={"id": "a1", "nova_instance_id": "i1"})
+        self.delete = self.patch("a10_horizon.dashboard.api.a10devices.delete_a10_appliance")
+        self.manager = self.patch("a10_neutron_lbaas.vthunder.instance_manager.InstanceManager")
+        self.session = self.patch("a10_horizon.dashboard.api.base.session_for")
+
+    def test_deletes_instance_then_record_without_the_request(self):
+        job = _wait(appliance_jobs.start_delete(self.request, "a1")["id"])
+        self.assertEqual(jobs.DONE, job["status"])
+
+        self.manager.return_value.delete_instance.assert_called_once_with("i1")
+        self.assertEqual("a1", self.delete.call_args[0][1])
+        self.assertEqual("tenant-1", self.manager.call_args[0][0])
+        for call in (self.get, self.delete, self.session):
+            self.assertIsInstance(call.call_args[0][0], base.DetachedRequest)
+
+
+class TestJobView(test_case.TestCase):
+
+    def setUp(self):
+        self.job = _wait(jobs.submit(test_case.fake_request(), "thing",
+                                     lambda request, progress: "done")["id"])
+
+    def _get(self, tenant_id):
+        request = RequestFactory().get("/")
+        request.user = test_case.fake_request(tenant_id=tenant_id).user
+        return jobs.JobView.as_view()(request, job_id=self.job["id"])
+
+    def test_progress_as_json(self):
+        response = self._get("tenant-1")
+        self.assertEqual("application/json", response["Content-Type"])
+        body = json.loads(response.content.decode("utf-8"))
+        self.assertEqual(jobs.DONE, body["status"])
+        self.assertEqual("done", body["result"])
+
+    def test_other_tenants_jobs_are_not_found(self):
+        self.assertRaises(http.Http404, self._get, "tenant-2")
+
+
+class TestApplianceCreate(test_case.TestCase):
+
+    def setUp(self):
+        self.request = test_case.fake_request(tenant_id="tenant-create")
+        self.create = self.patch("a10_horizon.dashboard.api.a10devices.create_a10_appliance",
+                                 return_value={"id": "a1"})
+        self.manager = self.patch("a10_neutron_lbaas.vthunder.instance_manager.InstanceManager")
+        self.manager.return_value.create_instance.return_value = {
+            "name": "vth", "ip_address": "10.0.0.5", "nova_instance_id": "i1"}
+        self.patch("a10_horizon.dashboard.api.base.session_for")
+        self.context = {"name": "vth", "image": "img", "flavor": "f", "networks": ["n1"]}
+
+    def test_launches_then_registers_without_the_request(self):
+        job = _wait(appliance_jobs.start_create(self.request, self.context)["id"])
+        self.assertEqual(jobs.DONE, job["status"])
+        self.assertEqual("a1", job["result"])
+
+        self.manager.return_value.create_instance.assert_called_once_with(self.context)
+        request = self.create.call_args[0][0]
+        self.assertIsInstance(request, base.DetachedRequest)
+        self.assertEqual({"name": "vth", "host": "10.0.0.5", "nova_instance_id": "i1"},
+                         self.create.call_args[1])
+
+    def test_pending_rows_until_registered(self):
+        self.manager.return_value.create_instance.side_effect = ValueError("no capacity")
+        job = _wait(appliance_jobs.start_create(self.request, self.context)["id"])
+
+        rows = appliance_jobs.pending(self.request)
+        self.assertEqual(["job-" + job["id"]], [x.id for x in rows])
+        self.assertEqual(jobs.FAILED, rows[0]["job_status"])
+        self.assertEqual("no capacity", rows[0]["job_step"])
+        self.assertEqual("vth", appliance_jobs.row(self.request, rows[0].id)["name"])
+        self.assertEqual([], appliance_jobs.pending(test_case.fake_request(tenant_id="other")))
+        self.assertRaises(http.Http404, appliance_jobs.row,
+                          test_case.fake_request(tenant_id="other"), rows[0].id)
+
+    def test_finished_creates_are_not_pending(self):
+        _wait(appliance_jobs.start_create(self.request, self.context)["id"])
+        self.assertEqual([], appliance_jobs.pending(self.request))
+
+    def test_workflow_puts_the_management_network_first(self):
+        start = self.patch_object(appliance_jobs, "start_create")
+        workflow = workflows.AddApplianceWorkflow.__new__(workflows.AddApplianceWorkflow)
+        self.assertTrue(workflow.handle(self.request, {
+            "name": "", "image": "img", "flavor": "f", "management_network": "mgmt",
+            "networks": ["n1", "mgmt", "n2"]}))
+        start.assert_called_once_with(self.request, {
+            "name": None, "image": "img", "flavor": "f", "networks": ["mgmt", "n1", "n2"]})
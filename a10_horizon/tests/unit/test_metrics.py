@@ -0,0 +1,127 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+from a10_horizon.dashboard.api import cache
+from a10_horizon.dashboard.api import metrics
+from a10_horizon.tests import test_case
+
+
+class TestPayloadBytes(test_case.TestCase):
+
+    def setUp(self):
+        self.patch_object(metrics, "METRICS_PAYLOAD_BYTES", True)
+        self.patch_object(metrics, "METRICS_PAYLOAD_SAMPLE_ROWS", 2)
+
+    def test_off_by_default(self):
+        self.patch_object(metrics, "METRICS_PAYLOAD_BYTES", False)
+        self.assertIsNone(metrics._payload_bytes([{"id": "1"}]))
+
+    def test_estimated_from_sampled_rows(self):
+        rows = [{"id": "%04d" % i} for i in range(10)]
+        sampled = len(json.dumps(rows[:2]))
+        self.assertEqual(sampled * 5, metrics._payload_bytes(rows))
+
+    def test_paged_and_single_results(self):
+        self.assertEqual(len(json.dumps([{"id": "1"}])),
+                         metrics._payload_bytes(([{"id": "1"}], True, False)))
+        self.assertEqual(len(json.dumps([{"id": "1"}])), metrics._payload_bytes({"id": "1"}))
+        self.assertIsNone(metrics._payload_bytes(None))
+
+
+class TestInstrumented(test_case.TestCase):
+
+    def setUp(self):
+        self.patch_object(metrics, "METRICS_PAYLOAD_BYTES", True)
+        self.patch_object(cache, "_results", cache.LocalStore())
+        self.samples = []
+        self.patch_object(metrics, "record", self.samples.append)
+        self.request = test_case.fake_request()
+
+    def test_records_call(self):
+        @metrics.instrumented
+        def list_things(request):
+            return [{"id": "1"}, {"id": "2"}]
+
+        list_things(self.request)
+        sample, = self.samples
+        self.assertEqual("test_metrics.list_things", sample.name)
+        self.assertEqual(2, sample.count)
+        self.assertTrue(sample.payload_bytes > 0)
+        self.assertIsNone(sample.error)
+
+    def test_records_errors(self):
+        @metrics.instrumented
+        def fail(request):
+            raise ValueError()
+
+        self.assertRaises(ValueError, fail, self.request)
+        self.assertEqual("ValueError", self.samples[0].error)
+
+    def test_cache_hits_have_no_payload_size(self):
+        @metrics.instrumented
+        @cache.cached("things")
+        def list_things(request):
+            return [{"id": "1"}]
+
+        list_things(self.request)
+        list_things(self.request)
+        miss, hit = self.samples
+        self.assertTrue(miss.payload_bytes > 0)
+        self.assertIsNone(hit.payload_bytes)
+        self.assertEqual(1, hit.count)
+
+    def test_identity_map_hits_have_no_payload_size(self):
+        @metrics.instrumented
+        @cache.request_cached("thing")
+        def get_thing(request, id):
+            return {"id": id}
+
+        get_thing(self.request, "1")
+        get_thing(self.request, "1")
+        self.assertIsNone(self.samples[1].payload_bytes)
+
+    def test_inner_hit_does_not_mark_the_outer_call(self):
+        @metrics.instrumented
+        @cache.cached("things")
+        def list_things(request):
+            return [{"id": "1"}]
+
+        @metrics.instrumented
+        def list_with_names(request):
+            return list_things(request)
+
+        list_things(self.request)
+        list_with_names(self.request)
+        inner, outer = self.samples[1:]
+        self.assertIsNone(inner.payload_bytes)
+        self.assertTrue(outer.payload_bytes > 0)
+
+
+class TestRegistry(test_case.TestCase):
+
+    def test_prometheus_histograms(self):
+        registry = metrics.Registry()
+        self.patch_object(metrics, "registry", registry)
+        registry.record(metrics.Sample("scaling.list", "index", 0.02, 300, 3, None))
+        registry.record(metrics.Sample("scaling.list", "index", 0.2, None, 0, None))
+
+        text = metrics.render_prometheus()
+        self.assertIn('a10_horizon_api_latency_seconds_count{call="scaling.list",error="",'
+                      'view="index"} 2', text)
+        self.assertIn('a10_horizon_api_payload_bytes_count{call="scaling.list",error="",'
+                      'view="index"} 1', text)
+        self.assertIn('a10_horizon_api_result_count_bucket{call="scaling.list",error="",'
+                      'le="+Inf",view="index"} 2', text)
@@ -0,0 +1,57 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from django.http import HttpResponse
+
+from a10_horizon.dashboard.api import budget
+from a10_horizon.dashboard import middleware
+from a10_horizon.tests import test_case
+
+
+class TestApiCallBudgetMiddleware(test_case.TestCase):
+
+    def setUp(self):
+        self.middleware = middleware.ApiCallBudgetMiddleware()
+        self.request = test_case.fake_request(
+            resolver_match=mock.Mock(view_name="horizon:project:a10scaling:index"))
+        self.middleware.process_request(self.request)
+        for i in range(3):
+            budget.note(self.request, "scaling.get_a10_scaling_policies", (), {"page": i})
+
+    def test_counts_calls_in_a_header(self):
+        response = self.middleware.process_response(self.request, HttpResponse())
+        self.assertEqual("3", response["X-A10-API-Calls"])
+        self.assertFalse(response.has_header("X-A10-API-Call-Budget"))
+
+    def test_over_budget_is_reported_not_raised(self):
+        self.patch_object(budget, "API_CALL_BUDGETS", {"horizon:project:a10scaling:index": 2})
+        log = self.patch_object(budget, "LOG")
+        response = self.middleware.process_response(self.request, HttpResponse("page"))
+        self.assertEqual(b"page", response.content)
+        self.assertEqual("3", response["X-A10-API-Calls"])
+        self.assertEqual("2", response["X-A10-API-Call-Budget"])
+        self.assertTrue(log.warning.called)
+
+    def test_repeated_calls_are_logged(self):
+        budget.note(self.request, "scaling.get_a10_scaling_policies", (), {"page": 0})
+        log = self.patch_object(budget, "LOG")
+        self.middleware.process_response(self.request, HttpResponse())
+        self.assertIn("possible N+1", log.warning.call_args[0][0])
+
+    def test_unresolved_requests_are_left_alone(self):
+        self.request.resolver_match = None
+        response = self.middleware.process_response(self.request, HttpResponse())
+        self.assertFalse(response.has_header("X-A10-API-Calls"))
@@ -0,0 +1,81 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+import mock
+
+from a10_horizon.dashboard.api import base
+from a10_horizon.dashboard import panel_base
+from a10_horizon.tests import test_case
+
+ENDPOINT = "http://neutron.test:9696"
+
+
+def _extensions(*aliases):
+    return {"extensions": [{"alias": x} for x in aliases]}
+
+
+class TestGetExtensions(test_case.TestCase):
+
+    def setUp(self):
+        panel_base._extension_cache.clear()
+        panel_base._refreshing.clear()
+        self.client = mock.Mock()
+        self.neutronclient = self.patch("openstack_dashboard.api.neutron.neutronclient",
+                                        return_value=self.client)
+        self.submit = self.patch("a10_horizon.dashboard.api.executor.submit")
+        self.request = test_case.fake_request()
+
+    def test_fetches_when_nothing_cached(self):
+        self.client.list_extensions.return_value = _extensions("a10-scaling-group")
+        self.assertEqual(set(["a10-scaling-group"]), panel_base.get_extensions(self.request))
+        self.assertFalse(self.submit.called)
+
+    def test_serves_fresh_copy_without_calling(self):
+        panel_base._extension_cache.set(ENDPOINT, (set(["x"]), time.time()))
+        self.assertEqual(set(["x"]), panel_base.get_extensions(self.request))
+        self.assertFalse(self.client.list_extensions.called)
+        self.assertFalse(self.submit.called)
+
+    def test_stale_copy_refreshes_with_detached_request(self):
+        panel_base._extension_cache.set(ENDPOINT, (set(["old"]), 0))
+        self.client.list_extensions.return_value = _extensions("new")
+
+        self.assertEqual(set(["old"]), panel_base.get_extensions(self.request))
+        self.assertEqual(1, self.submit.call_count)
+
+        refresh = self.submit.call_args[0][0]
+        detached = refresh.args[0]
+        self.assertIsInstance(detached, base.DetachedRequest)
+        self.assertNotIn(self.request, refresh.args)
+        self.assertEqual(self.request.user.token, detached.user.token)
+
+        refresh()
+        self.assertIs(detached, self.neutronclient.call_args[0][0])
+        self.assertEqual(set(["new"]), panel_base.get_extensions(self.request))
+
+    def test_one_refresh_per_endpoint(self):
+        panel_base._extension_cache.set(ENDPOINT, (set(["old"]), 0))
+        panel_base.get_extensions(self.request)
+        panel_base.get_extensions(self.request)
+        self.assertEqual(1, self.submit.call_count)
+
+    def test_failed_refresh_keeps_stale_copy(self):
+        panel_base._extension_cache.set(ENDPOINT, (set(["old"]), 0))
+        self.client.list_extensions.side_effect = Exception("boom")
+        panel_base.get_extensions(self.request)
+        self.submit.call_args[0][0]()
+        self.assertEqual(set(["old"]), panel_base._extension_cache.get(ENDPOINT)[0])
+        self.assertNotIn(ENDPOINT, panel_base._refreshing)
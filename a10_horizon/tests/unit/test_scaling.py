@@ -0,0 +1,154 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from a10_horizon.dashboard.a10networks.a10scaling import tables
+from a10_horizon.dashboard.api import scaling
+from a10_horizon.tests import test_case
+
+
+class Conflict(Exception):
+    status_code = 412
+
+
+def _policy(reactions, revision=None):
+    policy = {"id": "p1", "reactions": [{"alarm_id": a, "action_id": b} for a, b in reactions]}
+    if revision is not None:
+        policy["revision_number"] = revision
+    return {"a10_scaling_policy": policy}
+
+
+class TestReactions(test_case.TestCase):
+
+    def setUp(self):
+        self.client = mock.Mock(a10_scaling_policy_path="/a10_scaling_policies/%s")
+        self.client.put.return_value = _policy([])
+        self.patch("a10_horizon.dashboard.api.scaling.neutronclient", return_value=self.client)
+        self.request = test_case.fake_request()
+
+    def _put_reactions(self, call=0):
+        path, = self.client.put.call_args_list[call][0]
+        kwargs = self.client.put.call_args_list[call][1]
+        return path, kwargs["body"]["a10_scaling_policy"]["reactions"], kwargs["headers"]
+
+    def test_add_puts_to_the_clients_resource_path(self):
+        self.client.show_a10_scaling_policy.return_value = _policy([("a1", "b1")], revision=4)
+        scaling.add_a10_scaling_reaction(self.request, "p1", "a2", "b2")
+
+        path, reactions, headers = self._put_reactions()
+        self.assertEqual("/a10_scaling_policies/p1", path)
+        self.assertEqual([{"alarm_id": "a1", "action_id": "b1"},
+                          {"alarm_id": "a2", "action_id": "b2"}], reactions)
+        self.assertEqual({"If-Match": "revision_number=4"}, headers)
+
+    def test_reaction_ids(self):
+        reactions = _policy([("a1", "b1"), ("a2", "b2"), ("a1", "b1")])["a10_scaling_policy"]
+        self.assertEqual(["a1:b1:0", "a2:b2:0", "a1:b1:1"],
+                         scaling.reaction_ids(reactions["reactions"]))
+
+    def test_remove_in_one_put(self):
+        self.client.show_a10_scaling_policy.return_value = _policy(
+            [("a1", "b1"), ("a2", "b2"), ("a3", "b3")], revision=1)
+        scaling.remove_a10_scaling_reactions(self.request, "p1", ["a1:b1:0", "a3:b3:0"])
+
+        self.assertEqual(1, self.client.put.call_count)
+        self.assertEqual([{"alarm_id": "a2", "action_id": "b2"}], self._put_reactions()[1])
+
+    def test_remove_retry_keeps_to_the_chosen_reactions(self):
+        self.client.show_a10_scaling_policy.side_effect = [
+            _policy([("a1", "b1"), ("a2", "b2")], revision=1),
+            _policy([("a9", "b9"), ("a1", "b1"), ("a2", "b2")], revision=2),
+        ]
+        self.client.put.side_effect = [Conflict(), _policy([])]
+        scaling.remove_a10_scaling_reactions(self.request, "p1", ["a2:b2:0"])
+
+        self.assertEqual([{"alarm_id": "a9", "action_id": "b9"},
+                          {"alarm_id": "a1", "action_id": "b1"}], self._put_reactions(1)[1])
+
+    def test_reorder(self):
+        self.client.show_a10_scaling_policy.return_value = _policy(
+            [("a1", "b1"), ("a2", "b2"), ("a3", "b3")], revision=1)
+        scaling.reorder_a10_scaling_reactions(self.request, "p1",
+                                              ["a3:b3:0", "a1:b1:0", "a2:b2:0"])
+
+        self.assertEqual(1, self.client.put.call_count)
+        self.assertEqual(["a3", "a1", "a2"], [x["alarm_id"] for x in self._put_reactions()[1]])
+
+    def test_reorder_retry_keeps_concurrent_changes(self):
+        self.client.show_a10_scaling_policy.side_effect = [
+            _policy([("a1", "b1"), ("a2", "b2"), ("a3", "b3")], revision=1),
+            _policy([("a2", "b2"), ("a3", "b3"), ("a9", "b9")], revision=2),
+        ]
+        self.client.put.side_effect = [Conflict(), _policy([])]
+        scaling.reorder_a10_scaling_reactions(self.request, "p1",
+                                              ["a3:b3:0", "a1:b1:0", "a2:b2:0"])
+
+        self.assertEqual(["a3", "a2", "a9"], [x["alarm_id"] for x in self._put_reactions(1)[1]])
+
+    def test_conflict_reapplies_the_change_to_a_fresh_read(self):
+        self.client.show_a10_scaling_policy.side_effect = [
+            _policy([("a1", "b1")], revision=1),
+            _policy([("a1", "b1"), ("a9", "b9")], revision=2),
+        ]
+        self.client.put.side_effect = [Conflict(), _policy([])]
+        scaling.add_a10_scaling_reaction(self.request, "p1", "a2", "b2")
+
+        path, reactions, headers = self._put_reactions(1)
+        self.assertEqual(3, len(reactions))
+        self.assertEqual({"If-Match": "revision_number=2"}, headers)
+
+    def test_without_revision_the_last_writer_wins(self):
+        self.client.show_a10_scaling_policy.return_value = _policy([("a1", "b1")])
+        scaling.add_a10_scaling_reaction(self.request, "p1", "a2", "b2")
+
+        self.assertEqual(1, self.client.show_a10_scaling_policy.call_count)
+        path, reactions, headers = self._put_reactions()
+        self.assertIsNone(headers)
+        self.assertEqual(2, len(reactions))
+
+    def test_gives_up_after_retries(self):
+        self.client.show_a10_scaling_policy.return_value = _policy([("a1", "b1")], revision=1)
+        self.client.put.side_effect = Conflict()
+        self.assertRaises(scaling.ReactionConflict,
+                          scaling.add_a10_scaling_reaction, self.request, "p1", "a2", "b2")
+        self.assertEqual(scaling.REACTION_UPDATE_RETRIES + 1, self.client.put.call_count)
+
+    def test_other_errors_are_not_retried(self):
+        self.client.show_a10_scaling_policy.return_value = _policy([("a1", "b1")], revision=1)
+        self.client.put.side_effect = ValueError()
+        self.assertRaises(ValueError,
+                          scaling.add_a10_scaling_reaction, self.request, "p1", "a2", "b2")
+        self.assertEqual(1, self.client.put.call_count)
+
+
+class TestMoveReactionUp(test_case.TestCase):
+
+    def test_swaps_with_the_reaction_above(self):
+        reorder = self.patch("a10_horizon.dashboard.api.scaling.reorder_a10_scaling_reactions")
+        self.patch("a10_horizon.dashboard.a10networks.a10scaling.tables.reverse",
+                   return_value="/policy/")
+        table = mock.Mock(kwargs={"scaling_policy_id": "p1"},
+                          data=[{"reaction_id": "a1:b1:0"}, {"reaction_id": "a2:b2:0"},
+                                {"reaction_id": "a3:b3:0"}])
+        table.get_object_id.side_effect = lambda x: x["reaction_id"]
+        request = test_case.fake_request()
+
+        tables.MoveReactionUpAction().single(table, request, "a3:b3:0")
+        reorder.assert_called_once_with(request, "p1", ["a1:b1:0", "a3:b3:0", "a2:b2:0"])
+
+    def test_not_allowed_on_the_first_row(self):
+        action = tables.MoveReactionUpAction()
+        self.assertFalse(action.allowed(None, {"position": 0}))
+        self.assertTrue(action.allowed(None, {"position": 1}))
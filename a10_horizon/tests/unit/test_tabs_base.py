@@ -0,0 +1,118 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from django.test import client
+from horizon import tables
+from horizon import tabs
+from neutronclient.common import exceptions as neutron_exceptions
+
+from a10_horizon.dashboard.api import cache
+from a10_horizon.dashboard import tabs_base
+from a10_horizon.tests import test_case
+
+
+class ThingTable(tables.DataTable):
+    name = tables.Column("name")
+
+    class Meta(object):
+        name = "things"
+
+
+def _tab(slug, cheap=False):
+    class Tab(tabs.TableTab):
+        table_classes = (ThingTable,)
+        name = slug
+        template_name = "horizon/common/_detail_table.html"
+        preload = False
+        prefetch = cheap
+
+        def get_things_data(self):
+            self.tab_group.loaded.append(self.slug)
+            return self.tab_group.list_things(self.request)
+
+    Tab.slug = slug
+    return Tab
+
+
+class Tabs(tabs_base.PrefetchTabGroup):
+    slug = "tabs"
+    tabs = (_tab("first"), _tab("expensive"), _tab("cheap", cheap=True))
+    prefetch = True
+
+    def __init__(self, *args, **kwargs):
+        self.loaded = []
+        self.list_things = lambda request: []
+        super(Tabs, self).__init__(*args, **kwargs)
+
+
+class TestPrefetchTabGroup(test_case.TestCase):
+
+    def setUp(self):
+        self.patch("a10_horizon.dashboard.api.breaker.unavailable", return_value=None)
+
+    def _request(self, ajax=False, **params):
+        kwargs = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"} if ajax else {}
+        request = client.RequestFactory().get("/", params, **kwargs)
+        request.user = test_case.fake_request().user
+        return request
+
+    def test_loads_active_and_cheap_tabs(self):
+        group = Tabs(self._request())
+        group.load_tab_data()
+        self.assertEqual(["cheap", "first"], sorted(group.loaded))
+        self.assertTrue(group.get_tab("cheap").preload)
+        self.assertFalse(group.get_tab("expensive").preload)
+
+    def test_active_tab_from_the_query(self):
+        group = Tabs(self._request(tab="tabs__expensive"))
+        group.load_tab_data()
+        self.assertEqual(["cheap", "expensive"], sorted(group.loaded))
+        self.assertFalse(group.get_tab("first").preload)
+
+    def test_ajax_loads_only_the_requested_tab(self):
+        group = Tabs(self._request(ajax=True, tab="tabs__expensive"))
+        group.load_tab_data()
+        self.assertEqual(["expensive"], group.loaded)
+
+    def test_without_prefetch_only_the_active_tab_loads(self):
+        group = Tabs(self._request())
+        group.prefetch = False
+        group.load_tab_data()
+        self.assertEqual(["first"], group.loaded)
+
+    def test_warns_when_showing_stale_data(self):
+        self.patch_object(cache, "_results", cache.LocalStore())
+        warning = self.patch("horizon.messages.warning")
+        failing = []
+
+        @cache.cached("things")
+        def list_things(request):
+            if failing:
+                raise neutron_exceptions.ConnectionFailed()
+            return [{"id": "1", "name": "one"}]
+
+        group = Tabs(self._request())
+        group.list_things = list_things
+        group.load_tab_data()
+        self.assertFalse(warning.called)
+
+        failing.append(True)
+        cache.invalidate(group.request, "things")
+        group = Tabs(self._request())
+        group.list_things = list_things
+        group.load_tab_data()
+        rows = group.get_tab("first")._tables["things"].data
+        self.assertEqual(["one"], [row["name"] for row in rows])
+        self.assertEqual(1, warning.call_count)
+        self.assertIn("Neutron could not be reached", warning.call_args[0][1])
@@ -0,0 +1,114 @@
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import unittest
+
+from a10_horizon.dashboard.a10networks.a10appliances import appliance_jobs
+from a10_horizon.dashboard.a10networks.a10appliances import views as appliance_views
+from a10_horizon.dashboard.a10networks.a10scaling import views as scaling_views
+from a10_horizon.dashboard.api import budget
+from a10_horizon.dashboard.api import scaling as api
+from a10_horizon.dashboard import jobs
+from a10_horizon.tests import test_case
+
+try:
+    from a10_horizon.dashboard.a10networks.a10ssl import views as ssl_views
+except ImportError:
+    # Horizon releases without LBaaS v1 have no openstack_dashboard.api.lbaas
+    ssl_views = None
+
+
+class TestScalingViews(test_case.FakeNeutronTestCase):
+
+    def test_index(self):
+        # The active policies tab and the cheap action and alarm tabs
+        with budget.assert_max_api_calls(3, "scaling index"):
+            response, http = self.get(scaling_views.IndexView)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, http)
+
+    def test_policy_detail(self):
+        policy_id = self.first_id("a10_scaling_policies")
+        with budget.assert_max_api_calls(2, "scaling policy detail"):
+            response, http = self.get(scaling_views.PolicyDetailView,
+                                      scaling_policy_id=policy_id)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(policy_id, response.context_data["scaling_policy"]["id"])
+        table = response.context_data["updatepolicyreactiontable_table"]
+        self.assertEqual(api.reaction_ids(self.store.get("a10_scaling_policies",
+                                                         policy_id)["reactions"]),
+                         [table.get_object_id(x) for x in table.data])
+        # The table and the page share one fetch
+        self.assertEqual(1, http)
+
+    def test_group_detail(self):
+        group_id = self.first_id("a10_scaling_groups")
+        with budget.assert_max_api_calls(2, "scaling group detail"):
+            response, http = self.get(scaling_views.GroupDetailView,
+                                      scaling_group_id=group_id)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(group_id, response.context_data["scaling_group"]["id"])
+        # The group, its workers and its policy, fetched once for table and page
+        self.assertEqual(3, http)
+
+
+class TestApplianceViews(test_case.FakeNeutronTestCase):
+
+    def test_index(self):
+        with budget.assert_max_api_calls(1, "appliances index"):
+            response, http = self.get(appliance_views.IndexView)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, http)
+        tab = response.context_data["tab_group"].get_tab("a10appliancestab")
+        shown = [x.id for x in tab._tables["a10appliancestable"].data]
+        self.assertTrue(shown)
+        self.assertEqual([], sorted(set(shown) - set(self.ids("a10_device_instances"))))
+
+    def test_index_lists_appliances_being_created_first(self):
+        self.patch_object(jobs, "get_pool")
+        job = jobs.submit(test_case.fake_request(), appliance_jobs.KIND,
+                          lambda request, progress: None, label="new-vthunder")
+        response, http = self.get(appliance_views.IndexView)
+        tab = response.context_data["tab_group"].get_tab("a10appliancestab")
+        table = tab._tables["a10appliancestable"]
+        self.assertEqual("job-" + job["id"], table.data[0].id)
+        self.assertEqual("new-vthunder", table.data[0]["name"])
+        self.assertEqual(jobs.QUEUED, table.data[0]["job_status"])
+        self.assertEqual(["job-" + job["id"]],
+                         [x.id for x in table.data if x.id.startswith("job-")])
+
+    def test_index_budget_catches_extra_calls(self):
+        with self.assertRaises(AssertionError):
+            with budget.assert_max_api_calls(0, "appliances index"):
+                self.get(appliance_views.IndexView)
+
+
+@unittest.skipIf(ssl_views is None, "openstack_dashboard.api.lbaas is not available")
+class TestSSLViews(test_case.FakeNeutronTestCase):
+
+    def test_index(self):
+        # The certificates page and the bindings, both tabs being prefetched
+        with budget.assert_max_api_calls(2, "ssl index"):
+            response, http = self.get(ssl_views.IndexView)
+        self.assertEqual(200, response.status_code)
+        group = response.context_data["tab_group"]
+        certificates = group.get_tab("certificates")._tables["certificatestable"]
+        bindings = group.get_tab("certificatebindings")._tables["certificatebindingtable"]
+        self.assertTrue(certificates.data)
+        self.assertEqual([], sorted(set(x.id for x in certificates.data) -
+                                    set(self.ids("certificates"))))
+        self.assertEqual(sorted(self.ids("certificate_bindings")),
+                         sorted(x.id for x in bindings.data))
+        # Bindings get their certificate and VIP names from two more lists
+        self.assertEqual(4, http)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Renders the A10 panels against tools/fake_neutron.py at several row counts.
+
+Each (view, row count) case runs in its own process, against a fake
+Neutron seeded with that many objects of every resource, so peak RSS and
+allocations belong to that case alone.  Every case renders the view
+``--repeat`` times: the first render is cold (empty caches), the rest are
+warm.  Recorded per case:
+
+* wall time of the cold render and median of the warm ones, in seconds
+* API calls the page code made and HTTP requests that reached Neutron
+* peak RSS of the process, in kB
+* peak traced allocation size and live allocation count (Python 3 only)
+
+Needs a Horizon install with the a10 panels enabled; settings come from
+DJANGO_SETTINGS_MODULE (openstack_dashboard.settings by default)::
+
+    python tools/benchmark/panels.py --output results.json
+    python tools/benchmark/panels.py --update-baseline   # after a deliberate change
+
+With ``--faults <profile>`` (or FAKE_NEUTRON_FAULTS set) the fake Neutron
+runs degraded, to measure how the panels cope; those results are kept
+apart from the healthy ones in the baseline.
+
+Results are compared with tools/benchmark/baseline.json.  A case that
+does not render with status 200, has no baseline entry, or is more than
+``--tolerance`` slower or bigger than its baseline, or making more API
+calls, fails the run with exit status 1.  Timings depend on the machine,
+so no baseline is shipped: the first run on a machine must be made with
+``--update-baseline`` to create one.
+"""
+
+from __future__ import print_function
+
+import argparse
+import datetime
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import uuid
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import fake_neutron  # noqa
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+BASELINE = os.path.join(HERE, "baseline.json")
+ROW_COUNTS = (10, 1000, 10000)
+TENANT_ID = "bench-tenant"
+REGION = "RegionOne"
+
+# name -> (views module, view class, panel slug, url name, seeded collection for the id kwarg)
+CASES = {
+    "a10scaling.IndexView": ("a10scaling", "IndexView", "a10scaling", "index", None),
+    "a10scaling.PolicyDetailView": ("a10scaling", "PolicyDetailView", "a10scaling",
+                                    "scalingpolicydetail",
+                                    ("scaling_policy_id", "a10_scaling_policies")),
+    "a10scaling.GroupDetailView": ("a10scaling", "GroupDetailView", "a10scaling",
+                                   "scalinggroupdetail",
+                                   ("scaling_group_id", "a10_scaling_groups")),
+    "a10ssl.IndexView": ("a10ssl", "IndexView", "a10ssl", "index", None),
+    "a10appliances.IndexView": ("a10appliances", "IndexView", "a10appliances", "index", None),
+}
+
+# Results compared with the baseline: name -> whether it is allowed the tolerance
+METRICS = {
+    "cold_seconds": True,
+    "warm_seconds": True,
+    "api_calls": False,
+    "http_requests": False,
+    "peak_rss_kb": True,
+    "alloc_peak_bytes": True,
+}
+
+
+class BenchToken(object):
+    """Just enough of an openstack_auth token for the dashboard API modules"""
+
+    def __init__(self, catalog):
+        from django.utils import timezone
+
+        self.id = uuid.uuid4().hex
+        self.unscoped_token = self.id
+        self.expires = timezone.now() + datetime.timedelta(days=1)
+        self.project = {"id": TENANT_ID, "name": "bench"}
+        self.tenant = self.project
+        self.user = {"id": "bench-user", "name": "bench"}
+        self.user_domain_id = "default"
+        self.domain = {}
+        self.roles = [{"name": "member"}]
+        self.serviceCatalog = catalog
+
+
+def _setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "openstack_dashboard.settings")
+    import django
+    django.setup()
+
+
+def _make_request(path, panel_slug, neutron_url):
+    from django.conf import settings
+    from django.contrib.messages.storage import default_storage
+    from django.core.urlresolvers import resolve
+    from django.test import RequestFactory
+    import horizon
+    from importlib import import_module
+    from openstack_auth import user
+
+    endpoint = {"region": REGION, "publicURL": neutron_url, "internalURL": neutron_url,
+                "adminURL": neutron_url}
+    catalog = [{"type": "network", "name": "neutron", "endpoints": [endpoint]}]
+
+    request = RequestFactory().get(path)
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+    request._messages = default_storage(request)
+    request.resolver_match = resolve(path)
+    request.user = user.User(id="bench-user", token=BenchToken(catalog), user="bench",
+                             tenant_id=TENANT_ID, tenant_name="bench", service_catalog=catalog,
+                             roles=[{"name": "member"}], enabled=True, authorized_tenants=[],
+                             endpoint=settings.OPENSTACK_KEYSTONE_URL, services_region=REGION)
+    dashboard = horizon.get_dashboard("project")
+    request.horizon = {"dashboard": dashboard, "panel": dashboard.get_panel(panel_slug),
+                       "async_messages": []}
+    return request
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else None
+
+
+def run_case(name, rows, repeat):
+    """Runs one case in this process and returns its results"""
+    store = fake_neutron.Store()
+    store.seed(TENANT_ID, rows)
+    faults = os.environ.get(fake_neutron.ENV_FAULTS) or None
+    app = fake_neutron.CountingApp(fake_neutron.FakeNeutron(
+        store, default_tenant=TENANT_ID, faults=fake_neutron.load_faults(faults, seed=0)))
+    server, neutron_url = fake_neutron.serve(app)
+
+    _setup_django()
+    from django.core.urlresolvers import reverse
+    from importlib import import_module
+    from a10_horizon.dashboard.api import budget
+
+    module, class_name, panel_slug, url_name, id_kwarg = CASES[name]
+    view_class = getattr(import_module("a10_horizon.dashboard.a10networks.%s.views" % module),
+                         class_name)
+    kwargs = {}
+    if id_kwarg is not None:
+        kwarg_name, collection = id_kwarg
+        kwargs[kwarg_name] = sorted(x["id"] for x in store.list(collection))[0]
+    path = reverse("horizon:project:%s:%s" % (panel_slug, url_name), kwargs=kwargs)
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+
+    timings = []
+    api_calls = []
+    http_requests = []
+    status = None
+    for i in range(repeat):
+        request = _make_request(path, panel_slug, neutron_url)
+        http_before = app.requests
+        with budget.collect() as calls:
+            start = time.time()
+            response = view_class.as_view()(request, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+            timings.append(time.time() - start)
+        api_calls.append(len(calls))
+        http_requests.append(app.requests - http_before)
+        status = response.status_code
+
+    rv = {
+        "case": name,
+        "rows": rows,
+        "faults": faults,
+        "status": status,
+        "cold_seconds": timings[0],
+        "warm_seconds": _median(timings[1:]),
+        "api_calls": api_calls[0],
+        "http_requests": http_requests[0],
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "alloc_peak_bytes": None,
+        "alloc_blocks": None,
+    }
+    if tracemalloc is not None:
+        rv["alloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot()
+        rv["alloc_blocks"] = sum(x.count for x in snapshot.statistics("filename"))
+        tracemalloc.stop()
+
+    server.shutdown()
+    return rv
+
+
+def _run_child(name, rows, repeat):
+    out = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--child",
+                                   "--case", name, "--rows", str(rows),
+                                   "--repeat", str(repeat)])
+    return json.loads(out.decode("utf-8").strip().splitlines()[-1])
+
+
+def _key(result):
+    key = "%s@%d" % (result["case"], result["rows"])
+    if result.get("faults"):
+        key += "/%s" % result["faults"]
+    return key
+
+
+def compare(results, baseline, tolerance):
+    """Returns a message for every result that regressed against the baseline"""
+    failures = []
+    for result in results:
+        if result["status"] != 200:
+            failures.append("%s rendered with status %s" % (_key(result), result["status"]))
+        base = baseline.get(_key(result))
+        if base is None:
+            failures.append("%s has no baseline; run with --update-baseline" % _key(result))
+            continue
+        for metric, tolerant in METRICS.items():
+            value, expected = result.get(metric), base.get(metric)
+            if value is None or expected is None:
+                continue
+            limit = expected * (1 + tolerance) if tolerant else expected
+            if value > limit:
+                failures.append("%s %s is %s, baseline %s (limit %s)" % (
+                    _key(result), metric, value, expected, limit))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--case", action="append", choices=sorted(CASES),
+                        help="Case to run; may be repeated.  Default: all")
+    parser.add_argument("--rows", type=int, action="append",
+                        help="Row count to run; may be repeated.  Default: %s" % (ROW_COUNTS,))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown or growth over the baseline, as a fraction")
+    parser.add_argument("--faults", choices=sorted(fake_neutron.PROFILES),
+                        help="Run the fake Neutron with this fault profile")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_case(args.case[0], args.rows[0], args.repeat)))
+        return 0
+
+    if args.faults:
+        os.environ[fake_neutron.ENV_FAULTS] = args.faults
+
+    results = []
+    for name in args.case or sorted(CASES):
+        for rows in args.rows or ROW_COUNTS:
+            result = _run_child(name, rows, args.repeat)
+            results.append(result)
+            print("%-32s %6d rows  cold %7.3fs  warm %7.3fs  %4d calls  %4d http  %8d kB" % (
+                name, rows, result["cold_seconds"], result["warm_seconds"] or 0,
+                result["api_calls"], result["http_requests"], result["peak_rss_kb"]))
+
+    report = {"python": sys.version.split()[0], "time": time.time(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(dict((_key(x), x) for x in results), f, indent=2, sort_keys=True)
+        print("Baseline written to %s" % args.baseline)
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    else:
+        print("No baseline at %s; run with --update-baseline to create one" % args.baseline)
+        baseline = {}
+
+    failures = compare(results, baseline, args.tolerance)
+    for failure in failures:
+        print("REGRESSION: %s" % failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,612 @@
+#!/usr/bin/env python
+# Copyright (C) 2016 A10 Networks Inc. All rights reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Stand-in Neutron serving the A10 extension resources the dashboard uses.
+
+Implements list/show/create/update/delete for scaling groups, workers,
+policies, alarms and actions, certificates, certificate bindings, device
+instances and LBaaS v1 VIPs, along with the extension list the panels
+check.  Lists honour Neutron's attribute filters, ``fields``, ``limit``,
+``marker``, ``sort_key`` and ``sort_dir``.  Every request can be delayed
+and a share of them failed, to stand in for a loaded Neutron.
+
+As in Neutron, requests only see their own project's objects.  The fake
+doesn't ask keystone whose a token is: tokens given with ``--token`` (or
+add_token()) act for their project, and requests with no token, or one
+it wasn't given, act for the default tenant.
+
+For a degraded one, name a fault profile in FAKE_NEUTRON_FAULTS (or pass
+``--faults``): one of PROFILES below, or the path of a JSON file of the
+same shape.  A profile gives a default rule and per-resource overrides,
+each combining:
+
+* ``latency``: seconds, or a distribution such as
+  ``{"dist": "lognormal", "median": 0.2, "sigma": 0.8, "max": 10}``
+  (``fixed``/``value``, ``uniform``/``min``/``max``, ``lognormal``,
+  ``exponential``/``mean``)
+* ``error_rate`` and ``error_status``: independent failures
+* ``burst``: ``{"rate", "length", "status"}``; a started burst fails the
+  next ``length`` requests for that resource in a row
+* ``timeout``: ``{"rate", "seconds"}``; hangs that long, then answers 504
+  as a proxy in front of Neutron would
+* ``drip``: ``{"rate", "chunk", "interval"}``; sends the body ``chunk``
+  bytes at a time, ``interval`` seconds apart
+
+Only the standard library is needed::
+
+    python tools/fake_neutron.py --port 9696 --tenant <tenant id> --count 1000
+
+then point the ``network`` endpoint of a test keystone catalog at
+``http://<host>:9696``.  Benchmarks can also run it in-process with
+serve().
+"""
+
+from __future__ import print_function
+
+import argparse
+import copy
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from wsgiref import simple_server
+
+try:
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs
+except ImportError:
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs
+
+LOG = logging.getLogger("fake_neutron")
+
+API_PREFIX = "/v2.0"
+
+ENV_FAULTS = "FAKE_NEUTRON_FAULTS"
+
+# collection -> member name, as the neutronclient paths use them
+RESOURCES = {
+    "a10_scaling_groups": "a10_scaling_group",
+    "a10_scaling_group_workers": "a10_scaling_group_worker",
+    "a10_scaling_policies": "a10_scaling_policy",
+    "a10_scaling_alarms": "a10_scaling_alarm",
+    "a10_scaling_actions": "a10_scaling_action",
+    "certificates": "certificate",
+    "certificate_bindings": "certificate_binding",
+    "a10_device_instances": "a10_device_instance",
+    "vips": "vip",
+}
+
+EXTENSIONS = ["a10-scaling-group", "a10-device-instance", "a10-certificates", "lbaas"]
+
+STATUS_TEXT = {
+    200: "200 OK",
+    201: "201 Created",
+    204: "204 No Content",
+    400: "400 Bad Request",
+    404: "404 Not Found",
+    409: "409 Conflict",
+    412: "412 Precondition Failed",
+    500: "500 Internal Server Error",
+    502: "502 Bad Gateway",
+    503: "503 Service Unavailable",
+    504: "504 Gateway Timeout",
+}
+
+# Named fault profiles for FAKE_NEUTRON_FAULTS / --faults.  Rules under
+# "resources" are keyed by collection ("extensions" for the extension
+# list) and override the "default" rule key by key.
+PROFILES = {
+    "none": {},
+    # Slow with a long tail, the odd outage, and slow policy and binding lists
+    "degraded": {
+        "default": {"latency": {"dist": "lognormal", "median": 0.15, "sigma": 0.8, "max": 10},
+                    "burst": {"rate": 0.005, "length": 10, "status": 503}},
+        "resources": {
+            "a10_scaling_policies": {"latency": {"dist": "lognormal", "median": 0.6,
+                                                 "sigma": 1.0, "max": 20}},
+            "certificate_bindings": {"drip": {"rate": 0.25, "chunk": 1024, "interval": 0.05}},
+        },
+    },
+    "flaky": {
+        "default": {"latency": {"dist": "exponential", "mean": 0.05},
+                    "error_rate": 0.05, "error_status": 500,
+                    "burst": {"rate": 0.02, "length": 5, "status": 503}},
+    },
+    "timeouts": {
+        "default": {"latency": 0.05, "timeout": {"rate": 0.1, "seconds": 30}},
+    },
+    "slow-drip": {
+        "default": {"drip": {"rate": 1.0, "chunk": 256, "interval": 0.1}},
+    },
+    "outage": {
+        "default": {"error_rate": 1.0, "error_status": 503},
+        "resources": {"extensions": {"error_rate": 0.0}},
+    },
+}
+
+
+class Fault(Exception):
+    def __init__(self, status, message):
+        super(Fault, self).__init__(message)
+        self.status = status
+
+
+class Store(object):
+    """In-memory collections of resource dicts, keyed by id"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._data = dict((x, {}) for x in RESOURCES)
+
+    def list(self, collection):
+        with self._lock:
+            return [copy.deepcopy(x) for x in self._data[collection].values()]
+
+    def get(self, collection, id):
+        with self._lock:
+            obj = self._data[collection].get(id)
+            if obj is None:
+                raise Fault(404, "%s %s could not be found" % (RESOURCES[collection], id))
+            return copy.deepcopy(obj)
+
+    def create(self, collection, attrs):
+        obj = dict(attrs)
+        obj.setdefault("id", str(uuid.uuid4()))
+        obj.setdefault("name", "")
+        obj.setdefault("description", "")
+        obj["revision_number"] = 1
+        with self._lock:
+            self._data[collection][obj["id"]] = obj
+        return copy.deepcopy(obj)
+
+    def update(self, collection, id, attrs, if_match=None):
+        with self._lock:
+            obj = self._data[collection].get(id)
+            if obj is None:
+                raise Fault(404, "%s %s could not be found" % (RESOURCES[collection], id))
+            revision = "revision_number=%s" % obj["revision_number"]
+            if if_match is not None and if_match != revision:
+                raise Fault(412, "%s does not match %s" % (revision, if_match))
+            attrs = dict((k, v) for k, v in attrs.items() if k not in ("id", "tenant_id"))
+            obj.update(attrs)
+            obj["revision_number"] += 1
+            return copy.deepcopy(obj)
+
+    def delete(self, collection, id):
+        with self._lock:
+            if self._data[collection].pop(id, None) is None:
+                raise Fault(404, "%s %s could not be found" % (RESOURCES[collection], id))
+
+    def seed(self, tenant_id, count, workers_per_group=3):
+        """Creates ``count`` objects of every resource for tenant_id.
+
+        References between them (policies in groups, alarms and actions in
+        reactions, certificates and VIPs in bindings) point at objects of
+        the same tenant; half the VIPs are HTTPS.
+        """
+        def make(collection, i, **attrs):
+            attrs.update(tenant_id=tenant_id, name="%s-%d" % (RESOURCES[collection], i),
+                         description="Seeded %s %d" % (RESOURCES[collection], i))
+            return self.create(collection, attrs)["id"]
+
+        alarms = [make("a10_scaling_alarms", i, aggregation="avg", measurement="cpu",
+                       operator=">=", threshold=80.0, unit="percentage", period=5,
+                       period_unit="minute")
+                  for i in range(count)]
+        actions = [make("a10_scaling_actions", i, action="scale-out", amount=1)
+                   for i in range(count)]
+        policies = [make("a10_scaling_policies", i, cooldown=300, min_instances=1,
+                         max_instances=10,
+                         reactions=[{"alarm_id": alarms[i], "action_id": actions[i]}])
+                    for i in range(count)]
+        counter = itertools.count()
+        for i in range(count):
+            group_id = make("a10_scaling_groups", i, scaling_policy_id=policies[i])
+            for j in range(workers_per_group):
+                make("a10_scaling_group_workers", next(counter), scaling_group_id=group_id,
+                     host="10.0.%d.%d" % (i % 250, j + 1), username="admin", password="",
+                     api_version="3.0", protocol="https", port=443,
+                     nova_instance_id=str(uuid.uuid4()))
+
+        certificates = [make("certificates", i, cert_data="", key_data="", password="",
+                             intermediate_data="")
+                        for i in range(count)]
+        vips = [make("vips", i, protocol="HTTPS" if i % 2 == 0 else "HTTP", protocol_port=443,
+                     address="192.168.%d.%d" % (i // 250 % 250, i % 250 + 1),
+                     pool_id=str(uuid.uuid4()), subnet_id=str(uuid.uuid4()),
+                     status="ACTIVE", admin_state_up=True)
+                for i in range(count)]
+        for i in range(count):
+            make("certificate_bindings", i, certificate_id=certificates[i], vip_id=vips[i])
+            make("a10_device_instances", i, host="10.1.%d.%d" % (i // 250 % 250, i % 250 + 1),
+                 username="admin", password="", api_version="3.0", protocol="https", port=443,
+                 nova_instance_id=str(uuid.uuid4()))
+
+
+class FaultPlan(object):
+    """Decides, per request, how a fault profile degrades it"""
+
+    def __init__(self, profile, seed=None):
+        self.default = profile.get("default", {})
+        self.resources = profile.get("resources", {})
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # resource -> failures left in its current burst
+        self._bursts = {}
+
+    def rule_for(self, resource):
+        rule = dict(self.default)
+        rule.update(self.resources.get(resource, {}))
+        return rule
+
+    def _chance(self, rate):
+        with self._lock:
+            return bool(rate) and self._random.random() < rate
+
+    def _latency(self, spec):
+        if not spec:
+            return 0.0
+        if not isinstance(spec, dict):
+            return float(spec)
+        dist = spec.get("dist", "fixed")
+        with self._lock:
+            if dist == "fixed":
+                value = spec.get("value", 0.0)
+            elif dist == "uniform":
+                value = self._random.uniform(spec.get("min", 0.0), spec["max"])
+            elif dist == "lognormal":
+                value = self._random.lognormvariate(math.log(spec["median"]),
+                                                    spec.get("sigma", 0.5))
+            elif dist == "exponential":
+                value = self._random.expovariate(1.0 / spec["mean"])
+            else:
+                raise ValueError("Unknown latency distribution %s" % dist)
+        return min(value, spec.get("max", value))
+
+    def _burst(self, resource, burst):
+        with self._lock:
+            left = self._bursts.get(resource, 0)
+            if left:
+                self._bursts[resource] = left - 1
+                return True
+            if burst and self._random.random() < burst.get("rate", 0):
+                self._bursts[resource] = burst.get("length", 1) - 1
+                LOG.debug("Starting a %d request failure burst on %s",
+                          burst.get("length", 1), resource)
+                return True
+        return False
+
+    def before(self, resource):
+        """Delays the request and raises Fault if it is to fail"""
+        rule = self.rule_for(resource)
+
+        delay = self._latency(rule.get("latency"))
+        if delay:
+            time.sleep(delay)
+
+        burst = rule.get("burst")
+        if self._burst(resource, burst):
+            raise Fault(burst.get("status", 503) if burst else 503, "Injected failure burst")
+
+        timeout = rule.get("timeout")
+        if timeout and self._chance(timeout.get("rate", 0)):
+            time.sleep(timeout.get("seconds", 60))
+            raise Fault(504, "Injected timeout")
+
+        if self._chance(rule.get("error_rate", 0)):
+            raise Fault(rule.get("error_status", 500), "Injected failure")
+
+    def deliver(self, resource, payload):
+        """The response body as the WSGI server should write it"""
+        drip = self.rule_for(resource).get("drip")
+        if not drip or not payload or not self._chance(drip.get("rate", 1.0)):
+            return [payload]
+        return _drip(payload, drip.get("chunk", 512), drip.get("interval", 0.1))
+
+
+def _drip(payload, chunk, interval):
+    for i in range(0, len(payload), chunk):
+        if i:
+            time.sleep(interval)
+        yield payload[i:i + chunk]
+
+
+def load_faults(name, seed=None):
+    """FaultPlan for a PROFILES name or JSON file path; None for no faults"""
+    if not name or name == "none":
+        return None
+    if name in PROFILES:
+        return FaultPlan(PROFILES[name], seed)
+    if os.path.exists(name):
+        with open(name) as f:
+            return FaultPlan(json.load(f), seed)
+    raise ValueError("%s is neither a fault profile (%s) nor a file" % (
+        name, ", ".join(sorted(PROFILES))))
+
+
+def faults_from_env(seed=None):
+    return load_faults(os.environ.get(ENV_FAULTS), seed)
+
+
+def _parts(path):
+    if path.startswith(API_PREFIX):
+        path = path[len(API_PREFIX):]
+    if path.endswith(".json"):
+        path = path[:-len(".json")]
+    parts = [x for x in path.split("/") if x]
+    # lb/vips for the LBaaS v1 client, everything else at the top level
+    if parts[:1] == ["lb"]:
+        parts = parts[1:]
+    return parts
+
+
+def _filter(objs, query):
+    for key, values in query.items():
+        if key in ("fields", "limit", "marker", "sort_key", "sort_dir", "page_reverse"):
+            continue
+        objs = [x for x in objs if str(x.get(key)) in values]
+    return objs
+
+
+def _page(objs, query, collection, url):
+    sort_key = query.get("sort_key", ["id"])[0]
+    reverse = query.get("sort_dir", ["asc"])[0] == "desc"
+    objs.sort(key=lambda x: (x.get(sort_key) is None, x.get(sort_key)), reverse=reverse)
+
+    marker = query.get("marker", [None])[0]
+    if marker is not None:
+        ids = [x["id"] for x in objs]
+        objs = objs[ids.index(marker) + 1:] if marker in ids else []
+
+    links = []
+    limit = query.get("limit", [None])[0]
+    if limit is not None and int(limit) < len(objs):
+        objs = objs[:int(limit)]
+        next_query = dict(query, marker=[objs[-1]["id"]])
+        links.append({"rel": "next", "href": "%s?%s" % (url, "&".join(
+            "%s=%s" % (k, v) for k, values in sorted(next_query.items()) for v in values))})
+    return objs, links
+
+
+def _fields(obj, query):
+    fields = query.get("fields")
+    if not fields:
+        return obj
+    return dict((k, v) for k, v in obj.items() if k in fields)
+
+
+class FakeNeutron(object):
+    """WSGI application over a Store.
+
+    ``latency`` seconds (plus up to ``jitter`` more) are spent on each
+    request, and ``error_rate`` of them fail with ``error_status``.
+    ``faults``, a FaultPlan, degrades requests further per resource.
+    ``tokens`` maps the tokens it should know to their project ids.
+    """
+
+    def __init__(self, store=None, latency=0.0, jitter=0.0, error_rate=0.0, error_status=500,
+                 default_tenant="fake-tenant", faults=None, tokens=None):
+        self.store = store or Store()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.default_tenant = default_tenant
+        self.faults = faults
+        self.tokens = dict(tokens or {})
+        self._random = random.Random()
+
+    def add_token(self, token, tenant_id):
+        """Has requests made with token act for tenant_id"""
+        self.tokens[token] = tenant_id
+
+    def _tenant(self, environ):
+        return self.tokens.get(environ.get("HTTP_X_AUTH_TOKEN"), self.default_tenant)
+
+    def _get(self, collection, id, tenant_id):
+        # Other projects' objects are as good as missing, as they are in Neutron
+        obj = self.store.get(collection, id)
+        if obj.get("tenant_id") != tenant_id:
+            raise Fault(404, "%s %s could not be found" % (RESOURCES[collection], id))
+        return obj
+
+    def _respond(self, start_response, status, body=None, resource=None):
+        payload = b"" if body is None else json.dumps(body).encode("utf-8")
+        start_response(STATUS_TEXT.get(status, "%d Error" % status),
+                       [("Content-Type", "application/json"),
+                        ("Content-Length", str(len(payload)))])
+        if self.faults is not None:
+            return self.faults.deliver(resource, payload)
+        return [payload]
+
+    def _inject(self, resource):
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise Fault(self.error_status, "Injected failure")
+        if self.faults is not None:
+            self.faults.before(resource)
+
+    def _expand_reactions(self, policy):
+        # Neutron embeds the alarm and action in each of a policy's reactions
+        for reaction in policy.get("reactions") or []:
+            for kind in ("alarm", "action"):
+                try:
+                    reaction[kind] = self.store.get("a10_scaling_%ss" % kind,
+                                                    reaction["%s_id" % kind])
+                except Fault:
+                    reaction[kind] = None
+        return policy
+
+    def _show(self, collection, obj):
+        if collection == "a10_scaling_policies":
+            return self._expand_reactions(obj)
+        return obj
+
+    def _read_body(self, environ):
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+        raw = environ["wsgi.input"].read(length) if length else b""
+        try:
+            return json.loads(raw.decode("utf-8")) if raw else {}
+        except ValueError:
+            raise Fault(400, "Request body is not valid JSON")
+
+    def dispatch(self, environ):
+        method = environ["REQUEST_METHOD"]
+        path = environ.get("PATH_INFO", "")
+        query = parse_qs(environ.get("QUERY_STRING", ""))
+        parts = _parts(path)
+
+        if parts == ["extensions"] and method == "GET":
+            return 200, {"extensions": [{"alias": x, "name": x} for x in EXTENSIONS]}
+
+        if not parts or parts[0] not in RESOURCES:
+            raise Fault(404, "No resource at %s" % path)
+
+        collection = parts[0]
+        member = RESOURCES[collection]
+        tenant_id = self._tenant(environ)
+
+        if len(parts) == 1:
+            if method == "GET":
+                objs = [x for x in self.store.list(collection) if x.get("tenant_id") == tenant_id]
+                objs, links = _page(_filter(objs, query), query,
+                                    collection, environ.get("PATH_INFO", ""))
+                body = {collection: [_fields(self._show(collection, x), query) for x in objs]}
+                if links:
+                    body["%s_links" % collection] = links
+                return 200, body
+            if method == "POST":
+                attrs = self._read_body(environ).get(member, {})
+                attrs.setdefault("tenant_id", tenant_id)
+                return 201, {member: self._show(collection, self.store.create(collection, attrs))}
+
+        elif len(parts) == 2:
+            id = parts[1]
+            obj = self._get(collection, id, tenant_id)
+            if method == "GET":
+                return 200, {member: _fields(self._show(collection, obj), query)}
+            if method == "PUT":
+                attrs = self._read_body(environ).get(member, {})
+                obj = self.store.update(collection, id, attrs, environ.get("HTTP_IF_MATCH"))
+                return 200, {member: self._show(collection, obj)}
+            if method == "DELETE":
+                self.store.delete(collection, id)
+                return 204, None
+
+        raise Fault(400, "Unsupported request %s %s" % (method, path))
+
+    def __call__(self, environ, start_response):
+        resource = (_parts(environ.get("PATH_INFO", "")) or [None])[0]
+        try:
+            self._inject(resource)
+            status, body = self.dispatch(environ)
+        except Fault as ex:
+            status, body = ex.status, {"NeutronError": {"type": "Fault", "message": str(ex),
+                                                        "detail": ""}}
+        return self._respond(start_response, status, body, resource)
+
+
+class CountingApp(object):
+    """Counts the requests that reach the wrapped WSGI app"""
+
+    def __init__(self, app):
+        self.app = app
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        # Requests are served on threads of their own
+        with self._lock:
+            self.requests += 1
+        return self.app(environ, start_response)
+
+
+class _ThreadingServer(ThreadingMixIn, simple_server.WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(simple_server.WSGIRequestHandler):
+    def log_message(self, format, *args):
+        LOG.debug(format, *args)
+
+
+def serve(app, host="127.0.0.1", port=0):
+    """Starts app on a background thread; returns (server, base url)"""
+    server = simple_server.make_server(host, port, app, server_class=_ThreadingServer,
+                                       handler_class=_QuietHandler)
+    t = threading.Thread(target=server.serve_forever, name="fake-neutron")
+    t.daemon = True
+    t.start()
+    return server, "http://%s:%d" % (host, server.server_port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9696)
+    parser.add_argument("--tenant", action="append", default=[],
+                        help="Tenant to seed; may be repeated")
+    parser.add_argument("--count", type=int, default=0,
+                        help="Objects of each resource to seed per tenant")
+    parser.add_argument("--token", action="append", default=[], metavar="TOKEN:TENANT",
+                        help="Token to act for a tenant other than the first; may be repeated")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Up to this many more seconds, at random")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Share of requests (0-1) that fail")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--faults", default=os.environ.get(ENV_FAULTS),
+                        help="Fault profile (%s) or JSON file; default $%s" % (
+                            ", ".join(sorted(PROFILES)), ENV_FAULTS))
+    parser.add_argument("--seed", type=int, help="Seed for the fault profile's randomness")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    store = Store()
+    for tenant_id in args.tenant:
+        store.seed(tenant_id, args.count)
+    app = FakeNeutron(store, latency=args.latency, jitter=args.jitter,
+                      error_rate=args.error_rate, error_status=args.error_status,
+                      default_tenant=(args.tenant or ["fake-tenant"])[0],
+                      faults=load_faults(args.faults, args.seed),
+                      tokens=dict(x.split(":", 1) for x in args.token))
+
+    server = simple_server.make_server(args.host, args.port, app, server_class=_ThreadingServer,
+                                       handler_class=_QuietHandler)
+    LOG.info("Fake Neutron listening on http://%s:%d%s%s", args.host, args.port, API_PREFIX,
+             " with fault profile %s" % args.faults if args.faults else "")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()